@@ -6,6 +6,7 @@ These endpoints require admin or editor role and provide:
 - Product media management (upload, reorder, delete)
 
 Security measures:
+- Streaming ingestion (uploads are spooled to disk and hashed chunk by chunk)
 - Magic bytes validation (file signature verification)
 - Content type validation
 - File size limits
@@ -14,11 +15,11 @@ Security measures:
 - Rate limiting
 """
 
-import hashlib
 import io
 import logging
 import os
 import re
+from datetime import timedelta
 from typing import Optional, Tuple
 
 from django.conf import settings
@@ -32,9 +33,12 @@ from rest_framework.views import APIView
 
 from apps.api.permissions import IsAdminOrEditor
 from apps.common.logging import SecurityLogger
+from .media_ingest import IngestedUpload, StreamingUploadMixin
+from .media_variants import build_srcset, schedule_variants
 from .models import Media, Product, ProductMedia
 from .serializers import MediaMetadataSerializer
 from .services.json_import_service import JsonImportService
+from .services.media_gc import DEFAULT_BATCH_SIZE as DEFAULT_GC_BATCH_SIZE, MediaGarbageCollector
 from apps.ops.models import ImportJob
 
 logger = logging.getLogger(__name__)
@@ -71,6 +75,19 @@ ALLOWED_CONTENT_TYPES = {
     Media.Kind.VIDEO: {"video/mp4", "video/webm", "video/quicktime"},
 }
 
+# Potentially dangerous PDF patterns (JavaScript, auto-actions, etc.)
+PDF_DANGEROUS_PATTERNS = [
+    b"/JavaScript",
+    b"/JS",
+    b"/OpenAction",
+    b"/AA",  # Additional Actions
+    b"/Launch",
+    b"/EmbeddedFile",
+]
+
+# Upper bound for image pixel count (decompression bomb guard)
+MAX_IMAGE_PIXELS = 100_000_000  # 100 megapixels
+
 # Extension to content type mapping
 EXTENSION_TO_CONTENT_TYPE = {
     ".jpg": "image/jpeg",
@@ -193,7 +210,7 @@ def validate_image_content(content: bytes) -> Tuple[bool, Optional[int], Optiona
         from PIL import Image
 
         # Set size limits to prevent decompression bombs
-        Image.MAX_IMAGE_PIXELS = 100_000_000  # 100 megapixels
+        Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
 
         img = Image.open(io.BytesIO(content))
 
@@ -211,6 +228,49 @@ def validate_image_content(content: bytes) -> Tuple[bool, Optional[int], Optiona
         return False, None, None
 
 
+def validate_image_header(fh) -> Tuple[bool, Optional[int], Optional[int]]:
+    """
+    Validate an image from its header only, without decoding pixel data.
+
+    Pillow reads just enough of the file to identify the format and size, so
+    memory use does not depend on the file or image size.
+
+    Returns (is_valid, width, height).
+    """
+    try:
+        from PIL import Image
+
+        with Image.open(fh) as img:
+            width, height = img.size
+
+        # Reject decompression bombs before anything decodes them
+        if width > 25000 or height > 25000 or width * height > MAX_IMAGE_PIXELS:
+            return False, None, None
+        if width < 1 or height < 1:
+            return False, None, None
+
+        return True, width, height
+
+    except Exception as e:
+        logger.warning(f"Image header validation failed: {e}")
+        return False, None, None
+
+
+def validate_pdf_upload(upload: IngestedUpload) -> bool:
+    """
+    Streaming variant of validate_pdf_content for spooled uploads.
+    """
+    if not upload.head.startswith(b"%PDF"):
+        return False
+
+    pattern = upload.scan_for(PDF_DANGEROUS_PATTERNS)
+    if pattern:
+        logger.warning(f"PDF contains potentially dangerous pattern: {pattern}")
+        # Don't reject, just log - many legitimate PDFs have these
+
+    return True
+
+
 def validate_pdf_content(content: bytes) -> bool:
     """
     Basic PDF validation.
@@ -220,19 +280,8 @@ def validate_pdf_content(content: bytes) -> bool:
     if not content.startswith(b"%PDF"):
         return False
 
-    # Check for potentially dangerous patterns
-    # (JavaScript, auto-actions, etc.)
-    dangerous_patterns = [
-        b"/JavaScript",
-        b"/JS",
-        b"/OpenAction",
-        b"/AA",  # Additional Actions
-        b"/Launch",
-        b"/EmbeddedFile",
-    ]
-
     content_lower = content.lower()
-    for pattern in dangerous_patterns:
+    for pattern in PDF_DANGEROUS_PATTERNS:
         if pattern.lower() in content_lower:
             logger.warning(f"PDF contains potentially dangerous pattern: {pattern}")
             # Don't reject, just log - many legitimate PDFs have these
@@ -240,7 +289,7 @@ def validate_pdf_content(content: bytes) -> bool:
     return True
 
 
-class MediaUploadView(APIView):
+class MediaUploadView(StreamingUploadMixin, APIView):
     """
     Upload media file directly.
 
@@ -315,9 +364,9 @@ class MediaUploadView(APIView):
         # 2. Sanitize filename
         safe_filename = sanitize_filename(file.name)
 
-        # 3. Read file content
+        # 3. Checksum and leading bytes (computed while the upload was spooled)
         try:
-            file_content = file.read()
+            upload = IngestedUpload(file)
         except Exception as e:
             logger.error(f"Failed to read file content: {e}", exc_info=True)
             return Response(
@@ -327,7 +376,7 @@ class MediaUploadView(APIView):
 
         # 4. Detect and validate content type
         declared_type = file.content_type or ""
-        detected_type = detect_content_type(file_content, safe_filename)
+        detected_type = detect_content_type(upload.head, safe_filename)
 
         if not detected_type:
             security_log.upload_rejected(file.name, "Unknown file type", client_ip)
@@ -341,7 +390,7 @@ class MediaUploadView(APIView):
             )
 
         # 5. Validate magic bytes match detected type
-        if not validate_magic_bytes(file_content, detected_type):
+        if not validate_magic_bytes(upload.head, detected_type):
             security_log.upload_rejected(
                 file.name,
                 f"Magic bytes mismatch (declared: {declared_type}, detected: {detected_type})",
@@ -383,7 +432,7 @@ class MediaUploadView(APIView):
         height = None
 
         if kind == Media.Kind.IMAGE:
-            is_valid, width, height = validate_image_content(file_content)
+            is_valid, width, height = validate_image_header(upload.open())
             if not is_valid:
                 security_log.upload_rejected(file.name, "Image decode validation failed", client_ip)
                 return Response(
@@ -395,7 +444,7 @@ class MediaUploadView(APIView):
                 )
 
         elif kind == Media.Kind.PDF:
-            if not validate_pdf_content(file_content):
+            if not validate_pdf_upload(upload):
                 security_log.upload_rejected(file.name, "PDF validation failed", client_ip)
                 return Response(
                     {
@@ -405,21 +454,21 @@ class MediaUploadView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-        # 9. Create media object
+        # 9. Create media object (or reuse one with identical content)
         try:
-            media = Media.objects.create(
+            media, created = Media.get_or_create_by_file(
+                upload.open(),
+                upload.checksum,
+                upload.size,
                 kind=kind,
                 filename=safe_filename,
                 content_type=detected_type,
-                bytes=file_content,
-                size_bytes=len(file_content),
                 width=width,
                 height=height,
-                checksum_sha256=hashlib.sha256(file_content).hexdigest(),
             )
         except Exception as e:
             logger.error(
-                f"Failed to save media to database: {e} (file: {safe_filename}, size: {len(file_content)} bytes)",
+                f"Failed to save media to database: {e} (file: {safe_filename}, size: {upload.size} bytes)",
                 exc_info=True,
             )
             return Response(
@@ -427,16 +476,24 @@ class MediaUploadView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+        # Responsive variants are rendered in the background (idempotent per checksum)
+        schedule_variants(media)
+
         logger.info(
-            f"Media uploaded successfully: {media.id} ({safe_filename}, {detected_type}, {len(file_content)} bytes)",
+            f"Media uploaded successfully: {media.id} ({safe_filename}, {detected_type}, "
+            f"{upload.size} bytes, deduplicated={not created})",
             extra={"media_id": str(media.id), "client_ip": client_ip},
         )
 
-        serializer = MediaMetadataSerializer(media, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        data = MediaMetadataSerializer(media, context={"request": request}).data
+        data["deduplicated"] = not created
+        return Response(
+            data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
 
 
-class ProductMediaUploadView(APIView):
+class ProductMediaUploadView(StreamingUploadMixin, APIView):
     """
     Upload media and attach to product.
 
@@ -498,11 +555,11 @@ class ProductMediaUploadView(APIView):
         # 2. Sanitize filename
         safe_filename = sanitize_filename(file.name)
 
-        # 3. Read file content
-        file_content = file.read()
+        # 3. Checksum and leading bytes (computed while the upload was spooled)
+        upload = IngestedUpload(file)
 
         # 4. Detect and validate content type
-        detected_type = detect_content_type(file_content, safe_filename)
+        detected_type = detect_content_type(upload.head, safe_filename)
 
         if not detected_type:
             security_log.upload_rejected(file.name, "Unknown file type", client_ip)
@@ -515,7 +572,7 @@ class ProductMediaUploadView(APIView):
             )
 
         # 5. Validate magic bytes
-        if not validate_magic_bytes(file_content, detected_type):
+        if not validate_magic_bytes(upload.head, detected_type):
             security_log.upload_rejected(file.name, "Magic bytes mismatch", client_ip)
             return Response(
                 {
@@ -552,7 +609,7 @@ class ProductMediaUploadView(APIView):
         height = None
 
         if kind == Media.Kind.IMAGE:
-            is_valid, width, height = validate_image_content(file_content)
+            is_valid, width, height = validate_image_header(upload.open())
             if not is_valid:
                 security_log.upload_rejected(file.name, "Image decode failed", client_ip)
                 return Response(
@@ -563,18 +620,34 @@ class ProductMediaUploadView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-        # 9. Create media
-        media = Media.objects.create(
+        # 9. Create media (or reuse one with identical content)
+        media, created = Media.get_or_create_by_file(
+            upload.open(),
+            upload.checksum,
+            upload.size,
             kind=kind,
             filename=safe_filename,
             content_type=detected_type,
-            bytes=file_content,
-            size_bytes=len(file_content),
             width=width,
             height=height,
-            checksum_sha256=hashlib.sha256(file_content).hexdigest(),
         )
 
+        # Responsive variants are rendered in the background (idempotent per checksum)
+        schedule_variants(media)
+
+        # The same file is already attached to this product: nothing to add
+        existing_pm = product.product_media.filter(media=media).first()
+        if existing_pm:
+            return Response({
+                "id": str(existing_pm.id),
+                "media_id": str(media.id),
+                "file_url": f"/api/v1/media/{media.id}/file",
+                "alt": existing_pm.alt,
+                "sort_order": existing_pm.sort_order,
+                "is_primary": existing_pm.is_primary,
+                "deduplicated": True,
+            }, status=status.HTTP_200_OK)
+
         # 10. Parse optional fields
         alt = request.data.get("alt", "")
         sort_order = request.data.get("sort_order")
@@ -619,6 +692,8 @@ class ProductMediaUploadView(APIView):
             "alt": pm.alt,
             "sort_order": pm.sort_order,
             "is_primary": pm.is_primary,
+            "srcset": build_srcset(media.id, media.kind, media.width),
+            "deduplicated": not created,
         }, status=status.HTTP_201_CREATED)
 
 
@@ -739,6 +814,62 @@ class ProductMediaDeleteView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def _gc_int(value, default: int, minimum: int = 0) -> int:
+    try:
+        return max(minimum, int(value))
+    except (TypeError, ValueError):
+        return default
+
+
+class MediaGarbageCollectView(APIView):
+    """
+    Garbage-collect media nothing refers to.
+
+    GET  /api/v1/admin/media/gc/   - dry run: candidates and reclaimable bytes
+    POST /api/v1/admin/media/gc/   - delete candidates (admin role only)
+
+    Query/body parameters: grace_hours (default 24), batch_size (default 100),
+    max_delete (default 0 = no limit).
+    """
+
+    permission_classes = [IsAdminOrEditor]
+
+    def _collector(self, request, params):
+        return MediaGarbageCollector(
+            grace_period=timedelta(hours=_gc_int(params.get("grace_hours"), 24)),
+            batch_size=_gc_int(params.get("batch_size"), DEFAULT_GC_BATCH_SIZE, minimum=1),
+            max_delete=_gc_int(params.get("max_delete"), 0),
+            actor=request.user,
+            request=request,
+        )
+
+    @extend_schema(
+        summary="Media garbage collection report",
+        description="Dry run: list unreferenced media older than the grace period.",
+        responses={200: {"description": "GC report"}},
+        tags=["Admin - Media"],
+    )
+    def get(self, request):
+        return Response(self._collector(request, request.query_params).collect(dry_run=True))
+
+    @extend_schema(
+        summary="Run media garbage collection",
+        description="Delete unreferenced media older than the grace period. Admin role only.",
+        responses={
+            200: {"description": "GC report"},
+            403: {"description": "Admin role required"},
+        },
+        tags=["Admin - Media"],
+    )
+    def post(self, request):
+        if getattr(request.user, "role", None) != "admin":
+            return Response(
+                {"error": "Only admins can delete media", "code": "admin_required"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return Response(self._collector(request, request.data).collect(dry_run=False))
+
+
 class JsonImportPreviewView(APIView):
     """
     Validate JSON import data.
@@ -284,11 +284,33 @@ class AdminSpecKeySerializer(serializers.ModelSerializer):
             "value_type",
             "sort_order",
             "icon_media",
+            "is_facetable",
+            "facet_buckets",
             "created_at",
             "updated_at",
         ]
         read_only_fields = ["id", "created_at", "updated_at"]
 
+    def validate_facet_buckets(self, value):
+        """Bucket boundaries must be a strictly ascending list of numbers."""
+        if not value:
+            return []
+        if not isinstance(value, list) or any(
+            isinstance(bound, bool) or not isinstance(bound, (int, float)) for bound in value
+        ):
+            raise serializers.ValidationError("facet_buckets must be a list of numbers")
+        if any(low >= high for low, high in zip(value, value[1:])):
+            raise serializers.ValidationError("facet_buckets must be strictly ascending")
+        return value
+
+    def validate(self, attrs):
+        value_type = attrs.get("value_type", getattr(self.instance, "value_type", SpecKey.ValueType.TEXT))
+        if attrs.get("facet_buckets") and value_type not in (SpecKey.ValueType.INT, SpecKey.ValueType.DECIMAL):
+            raise serializers.ValidationError(
+                {"facet_buckets": "Buckets are only supported for numeric spec keys"}
+            )
+        return attrs
+
 
 # =============================================================================
 # SpecTemplate Admin Serializers
@@ -9,6 +9,7 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .admin_api import (
+    MediaGarbageCollectView,
     MediaUploadView,
     ProductMediaDeleteView,
     ProductMediaReorderView,
@@ -81,6 +82,13 @@ urlpatterns = [
         MediaUploadView.as_view(),
         name="media-upload",
     ),
+
+    # Unreferenced media garbage collection
+    path(
+        "media/gc/",
+        MediaGarbageCollectView.as_view(),
+        name="media-gc",
+    ),
     
     # Product media management (nested under products but outside router)
     path(
@@ -2,67 +2,338 @@
 Cache key functions for catalog views.
 
 Provides consistent cache key generation for all cached endpoints.
+
+Cached catalog data lives in namespaces (nav, category tree, taxonomy
+trees, spec keys, suggestions, product detail documents). Each namespace has a generation counter
+that is part of its keys, so invalidating a namespace is a single counter
+increment, whatever keys it holds (every series' taxonomy tree, say). Old
+entries are never read again and expire with their TTL. Workers also keep
+in-process data per namespace generation (see catalog_snapshot.py and
+suggest.py).
+
+Invalidation runs immediately and again after commit, so data cached from
+the old state while the writer's transaction was open is dropped as well.
+Bulk writers wrap their work in ``deferred_invalidation()``, which
+collects invalidations and runs each distinct one once at the end.
 """
 
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
 # Cache TTL constants (in seconds)
 NAV_CACHE_TTL = 300  # 5 minutes
 TREE_CACHE_TTL = 300  # 5 minutes
 SPEC_KEYS_CACHE_TTL = 300  # 5 minutes
+MEDIA_HOT_CACHE_TTL = 86400  # 1 day (invalidated on Media save/delete)
+PLP_CACHE_TTL = 600  # 10 minutes (invalidated by category/brand tags)
+SUGGEST_SNAPSHOT_TTL = 86400  # 1 day (superseded by generation changes)
+PRODUCT_DETAIL_CACHE_TTL = 3600  # 1 hour (superseded by generation and updated_at)
+STALE_GRACE_TTL = 300  # 5 minutes a soft-expired tree stays readable
+STALE_COPY_TTL = 86400  # 1 day (last built tree, served during rebuilds)
+REBUILD_LOCK_TTL = 30  # 30 seconds (lock of the request rebuilding a tree)
+MEDIA_UNREFERENCED_COUNT_TTL = 300  # 5 minutes (dashboard count, needs a full GC mark)
+
+# Generation namespaces
+NAV = "nav"
+CATEGORIES_TREE = "categories_tree"
+TAXONOMY = "taxonomy"
+SPEC_KEYS = "spec_keys"
+SUGGEST = "suggest"
+PRODUCT_DETAIL = "product_detail"
+NAMESPACES = (NAV, CATEGORIES_TREE, TAXONOMY, SPEC_KEYS, SUGGEST, PRODUCT_DETAIL)
+
+
+# =============================================================================
+# Generation counters
+# =============================================================================
+
+
+def generation_key(namespace: str) -> str:
+    """Cache key holding the generation counter of a namespace."""
+    return f"catalog:generation:{namespace}:v1"
+
+
+def get_generations(namespaces: Iterable[str]) -> dict:
+    """
+    Current generation per namespace, in one round-trip when all exist.
+
+    A missing counter restarts from the current time in microseconds, so
+    it never returns to a value a worker may still hold. Returns an empty
+    dict if the cache is unavailable.
+    """
+    from django.core.cache import cache
+
+    keys = {generation_key(namespace): namespace for namespace in namespaces}
+    try:
+        found = cache.get_many(list(keys))
+        missing = [key for key in keys if key not in found]
+        if missing:
+            start = int(time.time() * 1_000_000)
+            for key in missing:
+                cache.add(key, start, timeout=None)
+            # Re-read: a concurrent request may have added the keys first
+            found = cache.get_many(list(keys))
+        return {keys[key]: generation for key, generation in found.items()}
+    except Exception as e:
+        logger.warning(f"Catalog generation read failed: {e}")
+        return {}
+
+
+def get_generation(namespace: str) -> Optional[int]:
+    """Current generation of a namespace (None if the cache is unavailable)."""
+    return get_generations([namespace]).get(namespace)
+
+
+def _generation(namespace: str, generation: Optional[int]) -> Optional[int]:
+    return get_generation(namespace) if generation is None else generation
+
 
+# =============================================================================
+# Keys
+# =============================================================================
+# Keys of generation namespaces take the generation the caller already read;
+# without it the current one is looked up.
 
-def nav_key() -> str:
+
+def nav_key(generation: Optional[int] = None) -> str:
     """Cache key for navigation (categories with series)."""
-    return "catalog:nav:v1"
+    return f"catalog:nav:{_generation(NAV, generation)}:v2"
 
 
-def categories_tree_key() -> str:
+def categories_tree_key(generation: Optional[int] = None) -> str:
     """Cache key for categories tree."""
-    return "catalog:categories_tree:v1"
+    return f"catalog:categories_tree:{_generation(CATEGORIES_TREE, generation)}:v2"
 
 
-def series_tree_key(category_slug: str) -> str:
+def series_tree_key(category_slug: str, generation: Optional[int] = None) -> str:
     """Cache key for series list by category."""
-    return f"catalog:series_tree:{category_slug}:v1"
+    return f"catalog:series_tree:{_generation(NAV, generation)}:{category_slug}:v2"
 
 
-def taxonomy_tree_key(series_slug: str) -> str:
+def taxonomy_tree_key(series_slug: str, generation: Optional[int] = None) -> str:
     """Cache key for taxonomy tree by series."""
-    return f"catalog:taxonomy_tree:{series_slug}:v1"
+    return f"catalog:taxonomy_tree:{_generation(TAXONOMY, generation)}:{series_slug}:v2"
 
 
-def spec_keys_key() -> str:
+def spec_keys_key(generation: Optional[int] = None) -> str:
     """Cache key for spec keys list."""
-    return "catalog:spec_keys:v1"
+    return f"catalog:spec_keys:{_generation(SPEC_KEYS, generation)}:v2"
+
+
+def suggest_snapshot_key(generation: Optional[int] = None) -> str:
+    """Cache key for the suggestion snapshot."""
+    return f"catalog:suggest_snapshot:{_generation(SUGGEST, generation)}:v2"
+
+
+def product_detail_version_key(product_id) -> str:
+    """Cache key holding the current version of one product's detail documents."""
+    return f"catalog:product_detail_version:{product_id}:v1"
+
+
+def get_product_detail_version(product_id) -> Optional[tuple[int, str]]:
+    """
+    ``(generation, version)`` of a product's detail documents.
+
+    The namespace generation retires every document; the per-product
+    version only that product's. A missing version is created. Returns
+    None if the cache is unavailable.
+    """
+    from django.core.cache import cache
+
+    generation = get_generation(PRODUCT_DETAIL)
+    if generation is None:
+        return None
+    key = product_detail_version_key(product_id)
+    try:
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            # Re-read: a concurrent request may have added the key first
+            version = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Product detail version read of {product_id} failed: {e}")
+        return None
+    return (generation, version) if version is not None else None
+
+
+def product_detail_key(
+    product_id, updated_at, show_prices: bool, generation: int, version: str
+) -> str:
+    """Cache key for a public product detail document."""
+    updated = int(updated_at.timestamp() * 1_000_000)
+    return (
+        f"catalog:product_detail:{generation}:{product_id}:{version}:"
+        f"{updated}:{int(show_prices)}:v2"
+    )
+
+
+def stale_copy_key(family: str, item: str = "") -> str:
+    """Cache key for the last built value of a key family (any generation)."""
+    return f"catalog:stale:{family}:{item}:v1"
+
+
+def rebuild_lock_key(key: str) -> str:
+    """Cache key of the lock held while rebuilding ``key``."""
+    return f"{key}:rebuild_lock"
+
+
+def cache_stats_key(family: str, counter: str) -> str:
+    """Cache key for a hit/miss/rebuild counter of a key family."""
+    return f"catalog:cache_stats:{family}:{counter}:v1"
+
+
+def media_hot_key(media_id) -> str:
+    """Cache key for hot media metadata by media id."""
+    return f"catalog:media_hot:{media_id}:v1"
+
+
+def media_hot_content_key(checksum: str) -> str:
+    """Cache key for hot media content by checksum (immutable)."""
+    return f"catalog:media_hot_content:{checksum}:v1"
+
+
+def media_unreferenced_count_key() -> str:
+    """Cache key for the dashboard count of unreferenced media."""
+    return "catalog:media_unreferenced_count:v1"
+
+
+def plp_response_key(params_digest: str) -> str:
+    """Cache key for a PLP response by canonical parameter digest."""
+    return f"catalog:plp:{params_digest}:v1"
+
+
+def plp_tag_key(tag: str) -> str:
+    """Cache key holding the current version of a PLP cache tag."""
+    return f"catalog:plp_tag:{tag}:v1"
+
+
+# =============================================================================
+# Invalidation
+# =============================================================================
+
+_deferred = threading.local()
+
+
+@contextmanager
+def deferred_invalidation():
+    """
+    Collect cache invalidations and run each distinct one once when the
+    block exits (also when it raises: the cache may already hold data
+    read during the block).
+
+    Nested blocks flush with the outermost one.
+    """
+    if getattr(_deferred, "pending", None) is not None:
+        yield
+        return
+
+    _deferred.pending = {}
+    try:
+        yield
+    finally:
+        pending, _deferred.pending = _deferred.pending, None
+        for invalidate, items in pending.items():
+            invalidate(items)
+
+
+def defer_invalidation(invalidate: Callable[[set], None], items: Iterable) -> bool:
+    """
+    Queue ``invalidate(items)`` when inside ``deferred_invalidation()``.
+
+    Items queued for the same function are merged. Returns False outside a
+    deferred block, when the caller should invalidate right away.
+    """
+    pending = getattr(_deferred, "pending", None)
+    if pending is None:
+        return False
+    pending.setdefault(invalidate, set()).update(items)
+    return True
+
+
+def bump_generations(namespaces: Iterable[str]) -> None:
+    """Invalidate everything cached in ``namespaces``."""
+    namespaces = set(namespaces)
+    if not namespaces or defer_invalidation(bump_generations, namespaces):
+        return
+
+    from django.core.cache import cache
+    from django.db import transaction
+
+    def _bump():
+        for namespace in namespaces:
+            try:
+                cache.incr(generation_key(namespace))
+            except ValueError:
+                # Missing counter: the next reader starts a new one
+                pass
+            except Exception as e:
+                logger.warning(f"Catalog cache invalidation of {namespace} failed: {e}")
+
+    _bump()
+    transaction.on_commit(_bump)
 
 
 def clear_nav_cache():
     """Clear navigation-related caches."""
-    from django.core.cache import cache
-    cache.delete(nav_key())
-    cache.delete(categories_tree_key())
+    bump_generations([NAV, CATEGORIES_TREE])
 
 
 def clear_taxonomy_cache(series_slug: str = None):
-    """Clear taxonomy tree cache for a specific series or all."""
-    from django.core.cache import cache
-    if series_slug:
-        cache.delete(taxonomy_tree_key(series_slug))
-    # Also clear nav as taxonomy changes may affect navigation
-    cache.delete(nav_key())
+    """
+    Clear taxonomy tree caches.
+
+    All series share one generation; ``series_slug`` is accepted for
+    callers that know the changed series.
+    """
+    # Also clear nav as taxonomy changes may affect navigation, and product
+    # details as they show the primary node
+    bump_generations([TAXONOMY, NAV, PRODUCT_DETAIL])
 
 
 def clear_spec_keys_cache():
-    """Clear spec keys cache."""
+    """Clear spec keys cache (product details resolve their spec keys)."""
+    bump_generations([SPEC_KEYS, PRODUCT_DETAIL])
+
+
+def clear_product_detail_cache():
+    """
+    Clear every product detail document (coalesced inside
+    ``deferred_invalidation()``). For changes of specific products use
+    ``clear_product_details``.
+    """
+    bump_generations([PRODUCT_DETAIL])
+
+
+def clear_product_details(product_ids: Iterable) -> None:
+    """Clear the detail documents of ``product_ids`` only."""
+    product_ids = {product_id for product_id in product_ids if product_id is not None}
+    if not product_ids or defer_invalidation(clear_product_details, product_ids):
+        return
+
     from django.core.cache import cache
-    cache.delete(spec_keys_key())
+    from django.db import transaction
+
+    keys = [product_detail_version_key(product_id) for product_id in product_ids]
+
+    def _delete():
+        try:
+            cache.delete_many(keys)
+        except Exception as e:
+            logger.warning(f"Product detail invalidation failed: {e}")
+
+    _delete()
+    transaction.on_commit(_delete)
 
 
 def clear_all_catalog_cache():
-    """Clear all catalog-related caches."""
-    from django.core.cache import cache
-    # Clear known keys
-    cache.delete(nav_key())
-    cache.delete(categories_tree_key())
-    cache.delete(spec_keys_key())
-    # Note: Taxonomy keys are per-series, so we can't easily clear all of them
-    # without knowing all series slugs. This is handled in signals.
+    """Clear all catalog-related caches, including every PLP response."""
+    from .plp_cache import ALL_TAG, invalidate_plp_tags
+
+    bump_generations(NAMESPACES)
+    invalidate_plp_tags([ALL_TAG])
@@ -0,0 +1,183 @@
+"""
+Prefill catalog caches after a deploy or an import.
+
+Imports move every catalog namespace to a new generation and drop all PLP
+responses, and a deploy may start with an empty cache; either way the
+first visitors would pay for cold builds. ``warm_catalog_cache`` walks the
+catalog and builds, through the same code paths as the views:
+
+- navigation, the category tree and the spec key list,
+- the taxonomy tree of every series,
+- the first PLP page of every category, and of every category filtered by
+  each brand with listed products in it.
+
+Trees go through the stale-while-revalidate cache (stale_cache.py) and PLP
+pages through the tagged response cache (plp_cache.py); entries that are
+already cached are left alone. Taxonomy trees and PLP pages are built by a
+bounded pool of threads. The result reports, per endpoint, how many
+payloads were warmed and how long that took.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from django.db import close_old_connections, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+
+ENDPOINTS = ("nav", "categories_tree", "spec_keys", "taxonomy_tree", "plp", "plp_brand")
+
+
+class WarmReport:
+    """Build counts and timings per endpoint, shared by the worker threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {
+            endpoint: {"warmed": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+            for endpoint in ENDPOINTS
+        }
+
+    def run(self, endpoint: str, build: Callable[[], None]) -> None:
+        started = time.monotonic()
+        try:
+            build()
+        except Exception as e:
+            logger.warning(f"Cache warm of {endpoint} failed: {e}")
+            with self._lock:
+                self.endpoints[endpoint]["errors"] += 1
+            return
+        elapsed_ms = (time.monotonic() - started) * 1000
+        with self._lock:
+            stats = self.endpoints[endpoint]
+            stats["warmed"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                endpoint: {
+                    **stats,
+                    "total_ms": round(stats["total_ms"], 1),
+                    "max_ms": round(stats["max_ms"], 1),
+                    "avg_ms": round(stats["total_ms"] / stats["warmed"], 1) if stats["warmed"] else 0.0,
+                }
+                for endpoint, stats in self.endpoints.items()
+            }
+
+
+def _warm_plp(query: dict) -> None:
+    from apps.common.utils import get_catalog_mode
+
+    from .plp import PLPView, canonical_plp_params
+    from .plp_cache import get_cached_plp
+
+    params = canonical_plp_params(query, get_catalog_mode())
+    if get_cached_plp(params) is None:
+        response = PLPView().build_response(params)
+        if response.status_code != 200:
+            raise ValueError(f"PLP {query} returned {response.status_code}")
+
+
+def _brand_plp_queries() -> list[dict]:
+    """Category/brand pairs with listed products (categories include ancestors)."""
+    from .models import CategoryClosure, ProductListing
+
+    pairs = set(
+        ProductListing.objects.filter(
+            category__isnull=False, brand__isnull=False, brand__is_active=True
+        ).values_list("category_id", "brand__slug").distinct()
+    )
+    ancestors = {}
+    for descendant_id, ancestor_slug in CategoryClosure.objects.values_list(
+        "descendant_id", "ancestor__slug"
+    ):
+        ancestors.setdefault(descendant_id, []).append(ancestor_slug)
+    return [
+        {"category": category_slug, "brands": brand_slug}
+        for category_slug, brand_slug in sorted({
+            (category_slug, brand_slug)
+            for category_id, brand_slug in pairs
+            for category_slug in ancestors.get(category_id, [])
+        })
+    ]
+
+
+def warm_catalog_cache(workers: int = DEFAULT_WORKERS, brands: bool = True) -> dict:
+    """Prefill catalog caches; returns per-endpoint build stats."""
+    from .catalog_snapshot import get_catalog_snapshot
+    from .models import Category, Series
+
+    report = WarmReport()
+    snapshot = get_catalog_snapshot()
+    # Shared trees first: taxonomy and PLP builds read them
+    report.run("nav", lambda: snapshot.nav)
+    report.run("categories_tree", lambda: snapshot.category_tree)
+    report.run("spec_keys", lambda: snapshot.spec_keys)
+
+    tasks = [
+        ("taxonomy_tree", lambda slug=slug: snapshot.taxonomy_tree(slug))
+        for slug in Series.objects.order_by("slug").values_list("slug", flat=True)
+    ]
+    tasks += [
+        ("plp", lambda slug=slug: _warm_plp({"category": slug}))
+        for slug in Category.objects.order_by("slug").values_list("slug", flat=True)
+    ]
+    if brands:
+        tasks += [
+            ("plp_brand", lambda query=query: _warm_plp(query))
+            for query in _brand_plp_queries()
+        ]
+
+    if workers <= 1:
+        for endpoint, build in tasks:
+            report.run(endpoint, build)
+        return report.as_dict()
+
+    pending = deque(tasks)
+
+    def work():
+        try:
+            while pending:
+                try:
+                    endpoint, build = pending.popleft()
+                except IndexError:
+                    return
+                report.run(endpoint, build)
+        finally:
+            # Worker threads hold their own DB connection
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cache-warm") as pool:
+        for future in [pool.submit(work) for _ in range(workers)]:
+            future.result()
+    return report.as_dict()
+
+
+def schedule_catalog_cache_warm(workers: int = DEFAULT_WORKERS) -> None:
+    """Warm the caches in a background thread once the current transaction commits."""
+
+    def _warm():
+        close_old_connections()
+        try:
+            started = time.monotonic()
+            report = warm_catalog_cache(workers=workers)
+            warmed = sum(stats["warmed"] for stats in report.values())
+            logger.info(
+                f"Catalog cache warmed: {warmed} payloads in {time.monotonic() - started:.1f}s"
+            )
+        except Exception:
+            logger.exception("Catalog cache warm failed")
+        finally:
+            connection.close()
+
+    transaction.on_commit(
+        lambda: threading.Thread(target=_warm, name="cache-warm", daemon=True).start()
+    )
@@ -0,0 +1,362 @@
+"""
+Per-worker in-process snapshot of the catalog navigation graph.
+
+Navigation, the category tree, per-series taxonomy trees and the spec key
+list change a few times a day, yet every page needs them. Each worker
+keeps their serialized payloads in memory for the current generations of
+their cache namespaces (see cache_keys.py), so a request costs a single
+read of the counters. When a namespace's generation moves on, only its
+payloads are dropped and reloaded on first use: from Redis when another
+worker already built them, from the database otherwise. Redis reads and
+rebuilds go through stale_cache.py, so only one request rebuilds a payload
+while the others serve its previous copy (which they do not keep).
+
+The snapshot also answers the lookups other endpoints repeat per request
+from these payloads: category breadcrumbs, category subtree ids and spec
+key resolution.
+"""
+
+import threading
+import uuid
+from typing import Callable, Iterable, Optional
+
+from django.db.models import Count, Prefetch, Q
+
+from .cache_keys import (
+    CATEGORIES_TREE,
+    NAV,
+    NAV_CACHE_TTL,
+    SPEC_KEYS,
+    SPEC_KEYS_CACHE_TTL,
+    TAXONOMY,
+    TREE_CACHE_TTL,
+    categories_tree_key,
+    get_generations,
+    nav_key,
+    spec_keys_key,
+    stale_copy_key,
+    taxonomy_tree_key,
+)
+from .stale_cache import (
+    CATEGORIES_TREE_FAMILY,
+    NAV_FAMILY,
+    SPEC_KEYS_FAMILY,
+    TAXONOMY_TREE_FAMILY,
+    get_or_build,
+)
+
+# Cache namespaces held by the snapshot
+SNAPSHOT_NAMESPACES = (NAV, CATEGORIES_TREE, TAXONOMY, SPEC_KEYS)
+
+
+# =============================================================================
+# Payload builders
+# =============================================================================
+
+
+def build_nav() -> list:
+    """Root categories with their series, as served by NavView."""
+    from .models import Category, Series
+    from .serializers import NavCategorySerializer, resolve_single_products
+
+    # Every category at once with its series, annotated with product counts
+    # for visibility calculation; children are attached from this list
+    categories = list(
+        Category.objects.select_related("parent")
+        .prefetch_related(
+            Prefetch(
+                "series",
+                queryset=Series.objects.annotate(
+                    _product_count=Count(
+                        'products',
+                        filter=Q(products__status='active')
+                    )
+                ).order_by("order", "name"),
+            )
+        )
+        .order_by("order", "name")
+    )
+
+    children_map = {}
+    for cat in categories:
+        if cat.parent_id:
+            children_map.setdefault(cat.parent_id, []).append(cat)
+    for cat in categories:
+        cat._prefetched_children = children_map.get(cat.id, [])
+
+    # Single-product series of the whole tree, resolved in one batch
+    single_products = resolve_single_products(
+        [series for cat in categories for series in cat.series.all()]
+    )
+    root_categories = [c for c in categories if c.parent_id is None]
+    return NavCategorySerializer(
+        root_categories, many=True, context={"single_products": single_products}
+    ).data
+
+
+def build_category_tree() -> list:
+    """The whole category tree with counts, as served by CategoryTreeView."""
+    from .models import Category
+    from .serializers import CategoryTreeSerializer
+
+    # Fetch all categories at once to avoid N+1 with counts
+    all_categories = list(
+        Category.objects
+        .select_related("parent")
+        .annotate(
+            products_count=Count(
+                'series__products',
+                filter=Q(series__products__status='active'),
+                distinct=True
+            ),
+            subcategory_count=Count('children', distinct=True)
+        )
+    )
+
+    # Build children map
+    children_map = {}
+    for cat in all_categories:
+        if cat.parent_id:
+            children_map.setdefault(cat.parent_id, []).append(cat)
+
+    # Attach children to categories
+    for cat in all_categories:
+        cat._prefetched_children = children_map.get(cat.id, [])
+
+    root_categories = [c for c in all_categories if c.parent_id is None]
+    root_categories.sort(key=lambda x: (x.order, x.name))
+    return CategoryTreeSerializer(root_categories, many=True).data
+
+
+def build_taxonomy_tree(series_slug: str) -> Optional[list]:
+    """Taxonomy tree of a series (None if it does not exist)."""
+    from .models import Series, TaxonomyNode
+    from .serializers import TaxonomyNodeTreeSerializer
+
+    series = Series.objects.filter(slug=series_slug).first()
+    if series is None:
+        return None
+
+    all_nodes = list(
+        TaxonomyNode.objects.filter(series=series)
+        .select_related("parent")
+        .order_by("order", "name")
+    )
+
+    # Build children map
+    children_map = {}
+    for node in all_nodes:
+        if node.parent_id:
+            children_map.setdefault(node.parent_id, []).append(node)
+
+    for node in all_nodes:
+        node._prefetched_children = children_map.get(node.id, [])
+
+    root_nodes = [n for n in all_nodes if n.parent_id is None]
+    return TaxonomyNodeTreeSerializer(root_nodes, many=True).data
+
+
+def build_spec_keys() -> list:
+    """All spec keys, as served by SpecKeyListView."""
+    from .models import SpecKey
+    from .serializers import SpecKeySerializer
+
+    return SpecKeySerializer(SpecKey.objects.order_by("sort_order", "label_tr"), many=True).data
+
+
+# =============================================================================
+# Snapshot
+# =============================================================================
+
+
+class CatalogSnapshot:
+    """
+    Catalog payloads and lookups of the given namespace generations.
+
+    Payloads load on first use; concurrent first uses may both load, which
+    is harmless as they load the same data. Data of namespaces whose
+    generation did not change is taken over from ``previous``.
+    """
+
+    def __init__(self, generations: dict, previous: Optional["CatalogSnapshot"] = None):
+        self.generations = generations
+        self._payloads = {}
+        self._taxonomy_trees = {}
+        self._category_index = None
+        self._category_ids_by_slug = None
+        self._spec_keys_by_slug = None
+        if previous is not None:
+            self._take_over(previous)
+
+    def _unchanged(self, previous: "CatalogSnapshot", namespace: str) -> bool:
+        generation = self.generations.get(namespace)
+        return generation is not None and previous.generations.get(namespace) == generation
+
+    def _take_over(self, previous: "CatalogSnapshot") -> None:
+        for namespace in SNAPSHOT_NAMESPACES:
+            if self._unchanged(previous, namespace) and namespace in previous._payloads:
+                self._payloads[namespace] = previous._payloads[namespace]
+        if self._unchanged(previous, TAXONOMY):
+            self._taxonomy_trees = previous._taxonomy_trees
+        if self._unchanged(previous, CATEGORIES_TREE):
+            self._category_index = previous._category_index
+            self._category_ids_by_slug = previous._category_ids_by_slug
+        if self._unchanged(previous, SPEC_KEYS):
+            self._spec_keys_by_slug = previous._spec_keys_by_slug
+
+    def is_current(self, generations: dict) -> bool:
+        return bool(generations) and all(
+            generations.get(namespace) == self.generations.get(namespace)
+            for namespace in SNAPSHOT_NAMESPACES
+        )
+
+    def is_fresh(self, namespace: str) -> bool:
+        """True once the payload of ``namespace`` is loaded and not a stale copy."""
+        return namespace in self._payloads
+
+    def _payload(self, namespace: str, family: str, key: Callable, build: Callable, ttl: int):
+        if namespace in self._payloads:
+            return self._payloads[namespace]
+        data, fresh = get_or_build(
+            family, key(self.generations.get(namespace)), build, ttl,
+            stale_key=stale_copy_key(family),
+        )
+        # A stale copy is served only while another request rebuilds
+        if fresh:
+            self._payloads[namespace] = data
+        return data
+
+    @property
+    def nav(self) -> list:
+        return self._payload(NAV, NAV_FAMILY, nav_key, build_nav, NAV_CACHE_TTL)
+
+    @property
+    def category_tree(self) -> list:
+        return self._payload(
+            CATEGORIES_TREE, CATEGORIES_TREE_FAMILY, categories_tree_key,
+            build_category_tree, TREE_CACHE_TTL,
+        )
+
+    @property
+    def spec_keys(self) -> list:
+        return self._payload(
+            SPEC_KEYS, SPEC_KEYS_FAMILY, spec_keys_key, build_spec_keys, SPEC_KEYS_CACHE_TTL
+        )
+
+    def taxonomy_tree(self, series_slug: str) -> Optional[list]:
+        """Taxonomy tree of a series (None if it does not exist)."""
+        tree = self._taxonomy_trees.get(series_slug)
+        if tree is None:
+            tree, fresh = get_or_build(
+                TAXONOMY_TREE_FAMILY,
+                taxonomy_tree_key(series_slug, self.generations.get(TAXONOMY)),
+                lambda: build_taxonomy_tree(series_slug),
+                TREE_CACHE_TTL,
+                stale_key=stale_copy_key(TAXONOMY_TREE_FAMILY, series_slug),
+            )
+            # Unknown slugs are not remembered, so they cannot grow the snapshot
+            if tree is not None and fresh:
+                self._taxonomy_trees[series_slug] = tree
+        return tree
+
+    # -------------------------------------------------------------------------
+    # Category lookups (from the category tree payload)
+    # -------------------------------------------------------------------------
+
+    def _categories(self) -> tuple[dict, dict]:
+        """
+        id -> (parent id, name, slug, child ids) for every category, and
+        slug -> id. Kept only when built from a fresh category tree.
+        """
+        if self._category_index is not None:
+            return self._category_index, self._category_ids_by_slug
+        tree = self.category_tree
+        index = {}
+        stack = [(None, node) for node in tree]
+        while stack:
+            parent_id, node = stack.pop()
+            category_id = uuid.UUID(str(node["id"]))
+            children = node.get("children") or []
+            index[category_id] = (parent_id, node["name"], node["slug"], [])
+            if parent_id is not None:
+                index[parent_id][3].append(category_id)
+            stack.extend((category_id, child) for child in children)
+        ids_by_slug = {entry[2]: category_id for category_id, entry in index.items()}
+        # A stale tree serves this call only; the next one retries the rebuild
+        if self.is_fresh(CATEGORIES_TREE):
+            self._category_index = index
+            self._category_ids_by_slug = ids_by_slug
+        return index, ids_by_slug
+
+    def category_ids(self, slugs: Iterable[str]) -> set:
+        """IDs of the categories with the given slugs (unknown ones skipped)."""
+        _, ids_by_slug = self._categories()
+        return {ids_by_slug[slug] for slug in slugs if slug in ids_by_slug}
+
+    def breadcrumbs(self, category_id) -> list[dict]:
+        """Names and slugs from the root down to ``category_id``."""
+        categories, _ = self._categories()
+        crumbs = []
+        current = uuid.UUID(str(category_id))
+        while current is not None and current in categories and len(crumbs) <= len(categories):
+            parent_id, name, slug, _ = categories[current]
+            crumbs.append({"name": name, "slug": slug})
+            current = parent_id
+        return crumbs[::-1]
+
+    def subtree_ids(self, category_ids: Iterable) -> set:
+        """IDs of the given categories and all their descendants."""
+        categories, _ = self._categories()
+        result = set()
+        stack = [uuid.UUID(str(category_id)) for category_id in category_ids]
+        while stack:
+            category_id = stack.pop()
+            if category_id in result or category_id not in categories:
+                continue
+            result.add(category_id)
+            stack.extend(categories[category_id][3])
+        return result
+
+    # -------------------------------------------------------------------------
+    # Spec key lookups (from the spec key payload)
+    # -------------------------------------------------------------------------
+
+    def resolve_spec_keys(self, slugs: Iterable[str]) -> list[dict]:
+        """Serialized spec keys of ``slugs`` in their order, unknown ones skipped."""
+        spec_keys_by_slug = self._spec_keys_by_slug
+        if spec_keys_by_slug is None:
+            spec_keys_by_slug = {key["slug"]: key for key in self.spec_keys}
+            # As for categories, a stale key list is not kept
+            if self.is_fresh(SPEC_KEYS):
+                self._spec_keys_by_slug = spec_keys_by_slug
+        resolved, seen = [], set()
+        for slug in slugs or []:
+            if slug in spec_keys_by_slug and slug not in seen:
+                seen.add(slug)
+                resolved.append(spec_keys_by_slug[slug])
+        return resolved
+
+
+_current = {"snapshot": None}
+_lock = threading.Lock()
+
+
+def get_catalog_snapshot() -> CatalogSnapshot:
+    """The worker's snapshot of the current namespace generations."""
+    generations = get_generations(SNAPSHOT_NAMESPACES)
+    snapshot = _current["snapshot"]
+    if snapshot is not None and snapshot.is_current(generations):
+        return snapshot
+    with _lock:
+        snapshot = _current["snapshot"]
+        if snapshot is None or not snapshot.is_current(generations):
+            snapshot = CatalogSnapshot(generations, previous=snapshot)
+            # Without generations the snapshot cannot be validated later
+            if generations:
+                _current["snapshot"] = snapshot
+        return snapshot
+
+
+def reset_catalog_snapshot() -> None:
+    """Drop the worker's snapshot (tests, after cache.clear())."""
+    _current["snapshot"] = None
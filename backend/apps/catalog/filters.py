@@ -11,6 +11,7 @@ import django_filters
 
 from .models import Product, TaxonomyNode, Series
 from .query_utils import parse_bool_param, resolve_category_ids
+from .search import normalize_search, search_listings
 
 
 class ProductFilter(django_filters.FilterSet):
@@ -21,7 +22,7 @@ class ProductFilter(django_filters.FilterSet):
     - series: by series slug
     - node: by taxonomy node slug (primary_node OR in product.nodes)
     - status: publication status (default: active)
-    - search: search in title_tr, title_en, variant model_code
+    - search: ranked search over the listing search document
     - sort: ordering (newest, featured, title_asc)
     """
     
@@ -43,7 +44,7 @@ class ProductFilter(django_filters.FilterSet):
     
     search = django_filters.CharFilter(
         method="filter_by_search",
-        help_text="Search in title_tr, title_en, and variant model_code",
+        help_text="Search in titles, variant codes/SKUs and series/category names",
     )
     
     sort = django_filters.ChoiceFilter(
@@ -127,6 +128,10 @@ class ProductFilter(django_filters.FilterSet):
     def filter_by_search(self, queryset, name, value):
         """
         Search across title, variants (code, name, sku) and hierarchy (series, category).
+
+        Active products are matched through their indexed listing search
+        document and annotated with ``search_rank`` (see search.py). Other
+        statuses have no listing row and are matched directly.
         """
         if not value:
             return queryset
@@ -134,6 +139,11 @@ class ProductFilter(django_filters.FilterSet):
         search_term = value.strip()[:200]
         if not search_term:
             return queryset
+
+        if self.data.get("status", Product.Status.ACTIVE) == Product.Status.ACTIVE:
+            if not normalize_search(search_term):
+                return queryset
+            return search_listings(queryset, search_term, prefix="listing__")
         
         # Search in product fields, variant fields and hierarchy
         return queryset.filter(
@@ -0,0 +1,231 @@
+"""
+Maintenance of the ProductListing read model (and the spec value index
+of the same products, see spec_index.py).
+
+``refresh_listings(product_ids)`` recomputes the listing rows of the given
+products: active products get their row upserted, all others lose it.
+Signals (see signals.py) call it for every Product, Variant, ProductMedia
+and Series change, inside the writer's transaction, so the read model
+commits or rolls back together with the change.
+
+Bulk writers (imports) wrap their work in ``deferred_listing_refresh()`` so
+each affected product is recomputed once at the end instead of once per
+saved row. Code that bypasses signals (``bulk_create``, queryset
+``update``) calls ``refresh_listings`` or ``rebuild_listings`` afterwards.
+Both also retire the suggestion index and cached product detail documents.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterable
+
+from django.db import connection
+from django.db.models import Count, Max, Min, Q
+from django.utils import timezone
+
+from .cache_keys import clear_product_detail_cache, clear_product_details
+from .models import Product, ProductListing, ProductMedia, ProductSpecValue, Variant
+from .plp_cache import ALL_TAG, invalidate_plp_categories, invalidate_plp_tags
+from .search import build_search_text, search_vector_expression, uses_full_text
+from .spec_index import index_product_specs
+from .suggest import invalidate_suggest_index
+
+# Products recomputed per query batch
+REFRESH_CHUNK_SIZE = 500
+
+LISTING_UPDATE_FIELDS = [
+    "category",
+    "series_category",
+    "series",
+    "brand",
+    "hero_media",
+    "min_price",
+    "max_price",
+    "in_stock",
+    "variant_count",
+    "title_tr",
+    "is_featured",
+    "series_order",
+    "product_created_at",
+    "search_text",
+    "updated_at",
+]
+
+_deferred = threading.local()
+
+
+def _chunks(items: list, size: int):
+    for offset in range(0, len(items), size):
+        yield items[offset:offset + size]
+
+
+def _hero_media_ids(product_ids: list) -> dict:
+    """
+    Primary (else first by sort order) media id per product.
+
+    The hero may be a document or video; payloads build card URLs from it
+    with ``card_image_url``, which only derives images.
+    """
+    hero = {}
+    rows = (
+        ProductMedia.objects.filter(product_id__in=product_ids)
+        .order_by("product_id", "-is_primary", "sort_order", "id")
+        .values_list("product_id", "media_id")
+    )
+    for product_id, media_id in rows:
+        hero.setdefault(product_id, media_id)
+    return hero
+
+
+def _variant_search_parts(product_ids: list) -> dict:
+    """Model codes, SKUs and names of the variants, per product."""
+    parts = {}
+    rows = Variant.objects.filter(product_id__in=product_ids).values_list(
+        "product_id", "model_code", "sku", "name_tr", "name_en"
+    )
+    for product_id, *values in rows:
+        parts.setdefault(product_id, []).extend(values)
+    return parts
+
+
+def _refresh_chunk(product_ids: list, invalidate_categories: bool = True) -> int:
+    in_stock_filter = Q(variants__stock_qty__isnull=True) | Q(variants__stock_qty__gt=0)
+    products = list(
+        Product.objects.filter(id__in=product_ids, status=Product.Status.ACTIVE)
+        .annotate(
+            _min_price=Min("variants__list_price"),
+            _max_price=Max("variants__list_price"),
+            _variant_count=Count("variants", distinct=True),
+            _stocked_variants=Count("variants", filter=in_stock_filter, distinct=True),
+        )
+        .values(
+            "id", "category_id", "series_id", "series__category_id", "series__order",
+            "brand_id", "title_tr", "is_featured", "created_at",
+            "title_en", "name", "series__name", "series__category__name", "category__name",
+            "_min_price", "_max_price", "_variant_count", "_stocked_variants",
+        )
+    )
+    active_ids = {p["id"] for p in products}
+
+    if invalidate_categories:
+        # Cached PLP responses of the old and new categories go stale
+        touched_categories = set()
+        for row in ProductListing.objects.filter(product_id__in=product_ids).values_list(
+            "category_id", "series_category_id"
+        ):
+            touched_categories.update(row)
+        for p in products:
+            touched_categories.update((p["category_id"], p["series__category_id"]))
+        invalidate_plp_categories(touched_categories)
+
+    ProductListing.objects.filter(product_id__in=product_ids).exclude(
+        product_id__in=active_ids
+    ).delete()
+    index_product_specs(product_ids, active_ids)
+    if not products:
+        return 0
+
+    hero = _hero_media_ids(list(active_ids))
+    variant_parts = _variant_search_parts(list(active_ids))
+    now = timezone.now()
+    rows = [
+        ProductListing(
+            product_id=p["id"],
+            category_id=p["category_id"],
+            series_category_id=p["series__category_id"],
+            series_id=p["series_id"],
+            brand_id=p["brand_id"],
+            hero_media_id=hero.get(p["id"]),
+            min_price=p["_min_price"],
+            max_price=p["_max_price"],
+            # Products without variants have always been listed as in stock
+            in_stock=p["_variant_count"] == 0 or p["_stocked_variants"] > 0,
+            variant_count=p["_variant_count"],
+            title_tr=p["title_tr"],
+            is_featured=p["is_featured"],
+            series_order=p["series__order"] or 0,
+            product_created_at=p["created_at"],
+            search_text=build_search_text([
+                p["title_tr"], p["title_en"], p["name"],
+                *variant_parts.get(p["id"], []),
+                p["series__name"], p["series__category__name"], p["category__name"],
+            ]),
+            updated_at=now,
+        )
+        for p in products
+    ]
+    ProductListing.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["product"],
+        update_fields=LISTING_UPDATE_FIELDS,
+    )
+    if uses_full_text():
+        ProductListing.objects.filter(product_id__in=active_ids).update(
+            search_vector=search_vector_expression()
+        )
+    return len(rows)
+
+
+def refresh_listings(product_ids: Iterable) -> int:
+    """
+    Recompute the listing rows of ``product_ids``.
+
+    Returns the number of rows written (0 while deferred).
+    """
+    product_ids = {pid for pid in product_ids if pid is not None}
+    if not product_ids:
+        return 0
+
+    pending = getattr(_deferred, "pending", None)
+    if pending is not None:
+        pending.update(product_ids)
+        return 0
+
+    written = 0
+    for chunk in _chunks(sorted(product_ids, key=str), REFRESH_CHUNK_SIZE):
+        written += _refresh_chunk(chunk)
+    invalidate_suggest_index()
+    clear_product_details(product_ids)
+    return written
+
+
+def rebuild_listings() -> int:
+    """Recompute the listing rows of every product. Returns the row count."""
+    ProductListing.objects.exclude(product__status=Product.Status.ACTIVE).delete()
+    ProductSpecValue.objects.exclude(product__status=Product.Status.ACTIVE).delete()
+    product_ids = list(
+        Product.objects.filter(status=Product.Status.ACTIVE).values_list("id", flat=True)
+    )
+    written = 0
+    for chunk in _chunks(product_ids, REFRESH_CHUNK_SIZE):
+        written += _refresh_chunk(chunk, invalidate_categories=False)
+    invalidate_plp_tags([ALL_TAG])
+    invalidate_suggest_index()
+    clear_product_detail_cache()
+    return written
+
+
+@contextmanager
+def deferred_listing_refresh():
+    """
+    Collect listing refreshes and run them once when the block exits.
+
+    Nested blocks flush with the outermost one. Nothing is flushed when
+    the block raises or marks the surrounding transaction for rollback
+    (dry runs), as the collected changes are discarded anyway.
+    """
+    if getattr(_deferred, "pending", None) is not None:
+        yield
+        return
+
+    _deferred.pending = set()
+    try:
+        yield
+    except BaseException:
+        _deferred.pending = None
+        raise
+    pending, _deferred.pending = _deferred.pending, None
+    if connection.in_atomic_block and connection.needs_rollback:
+        return
+    refresh_listings(pending)
@@ -10,7 +10,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.db.models import Count, F, Q
 
-from apps.catalog.models import BrandCategory, Category, Product
+from apps.catalog.models import BrandCategory, Category, CategoryClosure, Product
 
 
 ROOT_CATEGORY_SLUG = "firinlar"
@@ -151,6 +151,8 @@ class Command(BaseCommand):
             if planned.get("reparent_subcategories"):
                 for item in planned["reparent_subcategories"]:
                     Category.objects.filter(id=item["id"]).update(parent=canonical_firinlar)
+                # Queryset updates bypass Category.save
+                CategoryClosure.rebuild()
 
             if not options["skip_product_sync"]:
                 self._apply_product_sync()
@@ -38,7 +38,7 @@ class Command(BaseCommand):
         self.stdout.write("\n=== DOCUMENT MEDIA ===")
         doc_media = Media.objects.filter(kind='document')
         for m in doc_media:
-            has_bytes = bool(m.bytes) if m.bytes else False
+            has_bytes = bool(m.read_bytes())
             self.stdout.write(f"  Media#{m.id}: {m.filename} | has_bytes={has_bytes} | size_bytes={m.size_bytes}")
 
         # Products without images
@@ -0,0 +1,159 @@
+"""
+Collapse duplicate Media rows that share the same content checksum.
+
+For every checksum with more than one Media row, the oldest row holding
+content is kept. All foreign keys pointing at the other rows (product
+images, category/series covers, brand logos, catalog assets, blog images,
+import job files, ...) are repointed to the kept row, duplicate
+product/media links are collapsed and the redundant Media rows deleted.
+
+Relations are discovered from the Media model, so new references to Media
+are picked up without changing this command.
+
+Usage:
+    python manage.py dedupe_media --dry-run
+    python manage.py dedupe_media
+    python manage.py dedupe_media --limit 100
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Min
+
+from apps.catalog.models import Media, ProductMedia
+from apps.catalog.services.media_gc import media_foreign_keys
+
+
+class Command(BaseCommand):
+    help = "Merge Media rows with identical content and repoint all references"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report duplicate groups and reclaimable bytes without changing anything",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=0,
+            help="Process at most this many checksum groups (default: no limit)",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        limit = options["limit"]
+        start = time.time()
+
+        groups = (
+            Media.objects.exclude(checksum_sha256="")
+            .values("checksum_sha256")
+            .annotate(copies=Count("id"), size=Min("size_bytes"))
+            .filter(copies__gt=1)
+            .order_by("checksum_sha256")
+        )
+        if limit:
+            groups = groups[:limit]
+        groups = list(groups)
+
+        relations = media_foreign_keys()
+
+        self.stdout.write("=" * 60)
+        self.stdout.write("  MEDIA DEDUPLICATION")
+        self.stdout.write(f"  Duplicate groups: {len(groups)}")
+        self.stdout.write(f"  References:       {len(relations)} foreign keys to Media")
+        if dry_run:
+            self.stdout.write(self.style.WARNING("  MODE: DRY RUN"))
+        self.stdout.write("=" * 60)
+
+        stats = {
+            "groups": 0,
+            "removed": 0,
+            "bytes": 0,
+            "repointed": 0,
+            "links_collapsed": 0,
+            "errors": 0,
+        }
+
+        for group in groups:
+            checksum = group["checksum_sha256"]
+            duplicates = group["copies"] - 1
+            reclaimable = duplicates * (group["size"] or 0)
+
+            if dry_run:
+                self.stdout.write(
+                    f"  [DRY-RUN] {checksum[:12]}: {group['copies']} copies, "
+                    f"{reclaimable / 1024:.1f} KB reclaimable"
+                )
+                stats["groups"] += 1
+                stats["removed"] += duplicates
+                stats["bytes"] += reclaimable
+                continue
+
+            try:
+                with transaction.atomic():
+                    self._merge_group(checksum, relations, stats)
+                stats["groups"] += 1
+                stats["bytes"] += reclaimable
+            except Exception as e:
+                stats["errors"] += 1
+                self.stderr.write(self.style.ERROR(f"  ERROR: {checksum}: {e}"))
+
+        elapsed = time.time() - start
+        self.stdout.write("")
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS("  DEDUPLICATION COMPLETE"))
+        self.stdout.write("=" * 60)
+        self.stdout.write(f"  Groups merged:     {stats['groups']}")
+        self.stdout.write(f"  Media removed:     {stats['removed']}")
+        self.stdout.write(f"  Reclaimable:       {stats['bytes'] / 1024 / 1024:.1f} MB")
+        self.stdout.write(f"  References moved:  {stats['repointed']}")
+        self.stdout.write(f"  Links collapsed:   {stats['links_collapsed']}")
+        self.stdout.write(f"  Errors:            {stats['errors']}")
+        self.stdout.write(f"  Time:              {elapsed:.1f}s")
+
+    def _merge_group(self, checksum, relations, stats):
+        """Merge one checksum group into its oldest row with content."""
+        rows = list(
+            Media.objects.defer("bytes")
+            .filter(checksum_sha256=checksum)
+            .order_by("created_at", "id")
+        )
+        keeper = next((m for m in rows if m.has_content()), rows[0])
+        duplicate_ids = [m.id for m in rows if m.id != keeper.id]
+
+        for model, field_name, nullable in relations:
+            refs = model._default_manager.filter(**{f"{field_name}__in": duplicate_ids})
+            for pk in refs.values_list("pk", flat=True):
+                try:
+                    with transaction.atomic():
+                        model._default_manager.filter(pk=pk).update(**{field_name: keeper.id})
+                    stats["repointed"] += 1
+                except IntegrityError:
+                    # Unique (owner, media) link already exists for the keeper
+                    if nullable:
+                        raise
+                    model._default_manager.filter(pk=pk).delete()
+                    stats["links_collapsed"] += 1
+
+        stats["links_collapsed"] += self._collapse_product_links(keeper)
+
+        # The blob is shared by checksum and survives while the keeper exists
+        Media.objects.filter(id__in=duplicate_ids).delete()
+        stats["removed"] += len(duplicate_ids)
+
+    def _collapse_product_links(self, media):
+        """Keep one ProductMedia per product for ``media``, preferring the primary one."""
+        removed = 0
+        links = ProductMedia.objects.filter(media=media).order_by(
+            "product_id", "-is_primary", "sort_order", "id"
+        )
+        seen = set()
+        for link_id, product_id in links.values_list("id", "product_id"):
+            if product_id in seen:
+                ProductMedia.objects.filter(id=link_id).delete()
+                removed += 1
+            else:
+                seen.add(product_id)
+        return removed
@@ -203,11 +203,9 @@ class Command(BaseCommand):
         """Export ALL Media records (binary + metadata)."""
         from apps.catalog.models import Media
 
-        if skip_bytes:
-            # Defer the huge bytes column when not needed
-            qs = Media.objects.defer("bytes").order_by("filename")
-        else:
-            qs = Media.objects.all().order_by("filename")
+        # Content is read through the blob store (with DB fallback) below,
+        # so the huge bytes column never needs to be loaded here
+        qs = Media.objects.defer("bytes").order_by("filename")
 
         count = qs.count()
         self.stdout.write(f"  Exporting {count} media records...")
@@ -223,8 +221,10 @@ class Command(BaseCommand):
                 "width": m.width,
                 "height": m.height,
             }
-            if not skip_bytes and m.bytes:
-                record["bytes_b64"] = base64.b64encode(m.bytes).decode("ascii")
+            if not skip_bytes:
+                content = m.read_bytes()
+                if content:
+                    record["bytes_b64"] = base64.b64encode(content).decode("ascii")
             records.append(record)
             if i % 200 == 0:
                 self.stdout.write(f"    ... {i}/{count}")
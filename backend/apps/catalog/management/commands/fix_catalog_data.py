@@ -2,6 +2,7 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction, connection
 from django.db.models import Count, F, Q
+from apps.catalog.listing import rebuild_listings
 from apps.catalog.models import Product, Series, Variant, Brand, Category, Media
 from apps.common.slugify_tr import slugify_tr
 import unicodedata
@@ -20,6 +21,9 @@ class Command(BaseCommand):
             
             
             self.fix_brand_categories()
+
+            # Queryset updates above bypass the listing signals
+            rebuild_listings()
             
         self.stdout.write(self.style.SUCCESS("All Repair Phases Completed Successfully"))
 
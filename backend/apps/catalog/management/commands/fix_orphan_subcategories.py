@@ -2,6 +2,7 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.db.models import Q
+from apps.catalog.listing import refresh_listings
 from apps.catalog.models import Product, Series, Category
 
 class Command(BaseCommand):
@@ -81,6 +82,7 @@ class Command(BaseCommand):
                     # 3. Update products in this series to also point to new category (denormalization)
                     products_updated = Product.objects.filter(series=series).update(category=other_cat)
                     self.stdout.write(f"    -> Updated {products_updated} products to new category.")
+                    refresh_listings(series.products.values_list("id", flat=True))
                     
                     fixed_count += 1
 
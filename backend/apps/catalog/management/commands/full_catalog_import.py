@@ -19,6 +19,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import connection, transaction
 from django.db.models.signals import post_delete, post_save
 
+from apps.catalog.listing import rebuild_listings
 from apps.catalog.models import (
     Brand,
     BrandCategory,
@@ -37,9 +38,17 @@ from apps.catalog.models import (
 from apps.catalog.signals import (
     invalidate_category_cache,
     invalidate_product_cache,
+    invalidate_media_product_details,
+    invalidate_product_detail_documents,
     invalidate_series_cache,
     invalidate_spec_keys_cache,
+    invalidate_suggest_snapshot,
     invalidate_taxonomy_cache,
+    refresh_category_product_listings,
+    refresh_parent_product_listing,
+    refresh_product_listing,
+    refresh_series_product_listings,
+    reindex_spec_key_facets,
 )
 from apps.common.slugify_tr import slugify_tr
 
@@ -61,7 +70,12 @@ CATEGORY_SLUG_MAP = {
 
 @contextmanager
 def disabled_signals():
-    """Temporarily disconnect catalog cache signals to avoid Redis timeouts."""
+    """
+    Temporarily disconnect catalog cache signals to avoid Redis timeouts.
+
+    Listing read-model signals are disconnected too; the import rebuilds
+    the listing once at the end instead of per saved row.
+    """
     receivers = [
         (post_save, "catalog.Category", invalidate_category_cache),
         (post_delete, "catalog.Category", invalidate_category_cache),
@@ -71,8 +85,24 @@ def disabled_signals():
         (post_delete, "catalog.TaxonomyNode", invalidate_taxonomy_cache),
         (post_save, "catalog.SpecKey", invalidate_spec_keys_cache),
         (post_delete, "catalog.SpecKey", invalidate_spec_keys_cache),
+        (post_save, "catalog.SpecKey", reindex_spec_key_facets),
         (post_save, "catalog.Product", invalidate_product_cache),
         (post_delete, "catalog.Product", invalidate_product_cache),
+        (post_save, "catalog.Product", refresh_product_listing),
+        (post_save, "catalog.Variant", refresh_parent_product_listing),
+        (post_delete, "catalog.Variant", refresh_parent_product_listing),
+        (post_save, "catalog.ProductMedia", refresh_parent_product_listing),
+        (post_delete, "catalog.ProductMedia", refresh_parent_product_listing),
+        (post_save, "catalog.Series", refresh_series_product_listings),
+        (post_save, "catalog.Category", refresh_category_product_listings),
+        (post_delete, "catalog.Product", invalidate_suggest_snapshot),
+        (post_save, "catalog.Series", invalidate_suggest_snapshot),
+        (post_delete, "catalog.Series", invalidate_suggest_snapshot),
+        (post_save, "catalog.Brand", invalidate_suggest_snapshot),
+        (post_delete, "catalog.Brand", invalidate_suggest_snapshot),
+        (post_save, "catalog.Brand", invalidate_product_detail_documents),
+        (post_delete, "catalog.Brand", invalidate_product_detail_documents),
+        (post_save, "catalog.Media", invalidate_media_product_details),
     ]
     for signal, sender, receiver in receivers:
         signal.disconnect(receiver, sender=sender)
@@ -197,6 +227,9 @@ class Command(BaseCommand):
                 # Phase 10: Ensure BrandCategory links
                 self.phase_ensure_brand_categories(data, brands, categories, stats)
 
+                # Phase 10b: Rebuild the listing read model (bulk_create skips signals)
+                stats["listings"] = rebuild_listings()
+
                 if self.dry_run:
                     transaction.savepoint_rollback(sid)
                     self.warn("\nDry run complete. All changes rolled back.")
@@ -789,10 +822,10 @@ class Command(BaseCommand):
         self.ok(f"  Backup created: {backup_path}")
 
     def clear_caches(self):
-        """Clear Django caches for nav/spec data."""
+        """Invalidate every catalog cache namespace and PLP response."""
         try:
-            from django.core.cache import cache
-            cache.clear()
+            from apps.catalog.cache_keys import clear_all_catalog_cache
+            clear_all_catalog_cache()
             self.ok("Caches cleared.")
         except Exception:
             pass
@@ -813,6 +846,7 @@ class Command(BaseCommand):
             "products_created": 0,
             "variants_created": 0,
             "brand_category_links": 0,
+            "listings": 0,
         }
 
     def print_json_stats(self, data: List[Dict]):
@@ -844,6 +878,7 @@ class Command(BaseCommand):
         self.line(f"Products created: {stats['products_created']}")
         self.line(f"Variants created: {stats['variants_created']}")
         self.line(f"BrandCategory links: {stats['brand_category_links']}")
+        self.line(f"Listing rows: {stats['listings']}")
 
         # Verify counts
         if not self.dry_run:
@@ -0,0 +1,102 @@
+"""
+Delete Media rows that nothing refers to.
+
+Mark: all foreign keys to Media (products, categories, series, brands,
+catalog assets, blog posts, import jobs, ...) plus media URLs embedded in
+blog content, product descriptions and site settings.
+Sweep: unreferenced media older than the grace period are deleted in
+batches; each deletion is recorded in the audit log.
+
+Usage:
+    python manage.py gc_media --dry-run
+    python manage.py gc_media --grace-hours 48 --batch-size 200
+    python manage.py gc_media --release-import-files-days 30
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.catalog.services.media_gc import DEFAULT_BATCH_SIZE, MediaGarbageCollector
+
+
+class Command(BaseCommand):
+    help = "Garbage-collect unreferenced media"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report candidates and reclaimable bytes without deleting",
+        )
+        parser.add_argument(
+            "--grace-hours",
+            type=int,
+            default=24,
+            help="Keep media created within this many hours (default: 24)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Media deleted per transaction (default: {DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--max-delete",
+            type=int,
+            default=0,
+            help="Delete at most this many media (default: no limit)",
+        )
+        parser.add_argument(
+            "--release-import-files-days",
+            type=int,
+            default=None,
+            help="Stop protecting files of finished import jobs older than this many days",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        start = time.time()
+        release_days = options["release_import_files_days"]
+
+        collector = MediaGarbageCollector(
+            grace_period=timedelta(hours=max(0, options["grace_hours"])),
+            batch_size=options["batch_size"],
+            max_delete=max(0, options["max_delete"]),
+            release_import_files_after=(
+                timedelta(days=release_days) if release_days is not None else None
+            ),
+        )
+
+        self.stdout.write("=" * 60)
+        self.stdout.write("  MEDIA GARBAGE COLLECTION")
+        self.stdout.write(f"  Grace period: {options['grace_hours']}h")
+        if dry_run:
+            self.stdout.write(self.style.WARNING("  MODE: DRY RUN"))
+        self.stdout.write("=" * 60)
+
+        report = collector.collect(dry_run=dry_run)
+
+        self.stdout.write("  References:")
+        for label, count in sorted(report["references"].items()):
+            self.stdout.write(f"    {label:<45} {count}")
+
+        if dry_run:
+            for row in report["sample"]:
+                self.stdout.write(
+                    f"  [DRY] {row['filename']} ({row['id']}, {row['kind']}, {row['size_bytes']} bytes)"
+                )
+
+        elapsed = time.time() - start
+        self.stdout.write("")
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS("  GC COMPLETE"))
+        self.stdout.write("=" * 60)
+        self.stdout.write(f"  Referenced media:   {report['referenced']}")
+        self.stdout.write(f"  Candidates:         {report['candidates']}")
+        self.stdout.write(f"  Reclaimable:        {report['reclaimable_bytes'] / 1024 / 1024:.2f} MB")
+        if not dry_run:
+            self.stdout.write(f"  Deleted:            {report['deleted']}")
+            self.stdout.write(f"  Deleted bytes:      {report['deleted_bytes'] / 1024 / 1024:.2f} MB")
+            self.stdout.write(f"  Batches:            {report['batches']}")
+        self.stdout.write(f"  Time:               {elapsed:.1f}s")
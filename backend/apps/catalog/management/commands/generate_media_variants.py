@@ -0,0 +1,116 @@
+"""
+Precompute responsive variants for existing image Media.
+
+Uploads queue variant generation automatically; this command backfills
+images that were imported or uploaded before variants existed. Variants
+are keyed by content checksum, so re-running the command only renders
+what is missing and images shared by several Media rows are rendered once.
+
+Usage:
+    python manage.py generate_media_variants
+    python manage.py generate_media_variants --limit 500
+    python manage.py generate_media_variants --dry-run
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.catalog.media_variants import (
+    generate_variants,
+    responsive_formats,
+    responsive_widths,
+    variant_ladder,
+)
+from apps.catalog.models import Media
+
+
+class Command(BaseCommand):
+    help = "Render the responsive srcset variants of all image media"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Rows loaded per batch (default: 50)",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=0,
+            help="Stop after this many images (default: no limit)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many variants would be checked without rendering",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        limit = options["limit"]
+        dry_run = options["dry_run"]
+        start = time.time()
+
+        images = Media.objects.filter(kind=Media.Kind.IMAGE).defer("bytes")
+
+        self.stdout.write("=" * 60)
+        self.stdout.write("  RESPONSIVE MEDIA VARIANTS")
+        self.stdout.write(f"  Widths:  {', '.join(map(str, responsive_widths()))}")
+        self.stdout.write(f"  Formats: {', '.join(responsive_formats())}")
+        self.stdout.write(f"  Images:  {images.count()}")
+        if dry_run:
+            self.stdout.write(self.style.WARNING("  MODE: DRY RUN"))
+        self.stdout.write("=" * 60)
+
+        stats = {"images": 0, "variants": 0, "skipped_duplicate": 0, "errors": 0}
+        seen_checksums = set()
+        last_id = None
+
+        while True:
+            page = images.order_by("id")
+            if last_id is not None:
+                page = page.filter(id__gt=last_id)
+            batch = list(page[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            for media in batch:
+                if limit and stats["images"] >= limit:
+                    break
+                if media.checksum_sha256 in seen_checksums:
+                    stats["skipped_duplicate"] += 1
+                    continue
+                seen_checksums.add(media.checksum_sha256)
+
+                if dry_run:
+                    stats["variants"] += len(variant_ladder(media.width)) * len(responsive_formats())
+                    stats["images"] += 1
+                    continue
+
+                try:
+                    stats["variants"] += generate_variants(media)
+                    stats["images"] += 1
+                except Exception as e:
+                    stats["errors"] += 1
+                    self.stderr.write(self.style.ERROR(f"  ERROR: {media.filename} ({media.id}): {e}"))
+
+            elapsed = time.time() - start
+            self.stdout.write(
+                f"  ... {stats['images']} images, {stats['variants']} variants ({elapsed:.0f}s)"
+            )
+            if limit and stats["images"] >= limit:
+                self.stdout.write(self.style.WARNING(f"  Limit of {limit} reached, stopping."))
+                break
+
+        elapsed = time.time() - start
+        self.stdout.write("")
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS("  VARIANTS COMPLETE"))
+        self.stdout.write("=" * 60)
+        self.stdout.write(f"  Images:              {stats['images']}")
+        self.stdout.write(f"  Variants:            {stats['variants']}")
+        self.stdout.write(f"  Skipped (same file): {stats['skipped_duplicate']}")
+        self.stdout.write(f"  Errors:              {stats['errors']}")
+        self.stdout.write(f"  Time:                {elapsed:.1f}s")
@@ -11,7 +11,6 @@ Run:
     python manage.py import_all_images --dry-run
     python manage.py import_all_images
 """
-import hashlib
 import os
 import re
 from pathlib import Path
@@ -156,16 +155,13 @@ class Command(BaseCommand):
                     data = fh.read()
 
                 content_type = 'image/png' if filename.lower().endswith('.png') else 'image/jpeg'
-                checksum = hashlib.sha256(data).hexdigest()
 
                 with transaction.atomic():
-                    media = Media.objects.create(
+                    media, _ = Media.get_or_create_by_content(
+                        data,
                         kind='image',
                         filename=filename,
                         content_type=content_type,
-                        bytes=data,
-                        size_bytes=len(data),
-                        checksum_sha256=checksum,
                     )
 
                     # Check if link already exists
@@ -1,30 +1,54 @@
 """
 Migrate binary media data from SQLite to the active database (PostgreSQL).
 
-Reads media bytes directly from the repo's db.sqlite3 file and updates
-the corresponding Media records in the production PostgreSQL database.
-This is used after import_full_data --skip-media-bytes to fill in the
-binary content without needing a multi-GB JSON export.
+Reads media bytes directly from the repo's db.sqlite3 file and fills in the
+content of the corresponding Media records of the active database. This is
+used after import_full_data --skip-media-bytes to fill in the binary content
+without needing a multi-GB JSON export.
+
+The source is read with a streaming cursor in rowid order, so memory stays
+bounded by the batch size. Batches are written by a pool of worker threads:
+content goes to the blob store (MEDIA_BLOB_STORE) and the rows are flipped
+with a single ``UPDATE ... FROM (VALUES ...)`` per batch. With the blob
+store disabled the bytes are written to the ``bytes`` column the same way.
+
+Progress is checkpointed to a JSON file after every completed batch (the
+highest source rowid below which every batch is done), so an interrupted
+run resumes where it stopped. Rows that already have content are skipped
+as well, so re-running from scratch is safe.
 
 Usage (on VPS inside Docker):
     python manage.py migrate_media_bytes
     python manage.py migrate_media_bytes --sqlite-path /app/backend/db.sqlite3
     python manage.py migrate_media_bytes --dry-run
-    python manage.py migrate_media_bytes --batch-size 50
+    python manage.py migrate_media_bytes --workers 8 --batch-size 200
+    python manage.py migrate_media_bytes --restart
 """
+import hashlib
+import json
+import os
 import sqlite3
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from django.core.management.base import BaseCommand
-from django.db import connection
+from django.db import connection, transaction
+from django.db.models.functions import Length
 
+from apps.catalog.media_cache import get_media_hot_cache
+from apps.catalog.media_storage import get_media_store
 from apps.catalog.models import Media
 
 
 BACKEND_DIR = Path(__file__).resolve().parent.parent.parent.parent.parent
 DEFAULT_SQLITE = BACKEND_DIR / "db.sqlite3"
 
+# A batch is cut early once it holds this much content
+BATCH_MAX_BYTES = 64 * 1024 * 1024
+
 
 class Command(BaseCommand):
     help = "Migrate binary media data from SQLite db.sqlite3 to production DB"
@@ -44,99 +68,102 @@ class Command(BaseCommand):
         parser.add_argument(
             "--batch-size",
             type=int,
-            default=25,
-            help="Records per batch (default: 25)",
+            default=100,
+            help="Records per batch (default: 100)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Writer threads (default: 4; 1 writes inline)",
         )
         parser.add_argument(
             "--force",
             action="store_true",
             help="Overwrite existing bytes (default: skip if bytes exist)",
         )
+        parser.add_argument(
+            "--checkpoint",
+            type=str,
+            default="",
+            help="Checkpoint file (default: <sqlite-path>.migrate_media_bytes.json)",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore an existing checkpoint and start from the first row",
+        )
 
     def handle(self, *args, **options):
         sqlite_path = Path(options["sqlite_path"])
         dry_run = options["dry_run"]
-        batch_size = options["batch_size"]
+        batch_size = max(1, options["batch_size"])
+        workers = max(1, options["workers"])
         force = options["force"]
+        checkpoint_path = Path(
+            options["checkpoint"] or f"{sqlite_path}.migrate_media_bytes.json"
+        )
         start = time.time()
 
         if not sqlite_path.exists():
             self.stderr.write(self.style.ERROR(f"SQLite file not found: {sqlite_path}"))
             return
 
-        # Check if we're targeting a different DB (not SQLite itself)
+        # Refuse to copy a database onto itself
         db_engine = connection.settings_dict.get("ENGINE", "")
-        if "sqlite3" in db_engine:
+        target_name = str(connection.settings_dict.get("NAME", ""))
+        if "sqlite3" in db_engine and os.path.exists(target_name) and os.path.samefile(
+            target_name, sqlite_path
+        ):
             self.stderr.write(self.style.WARNING(
-                "Target DB is also SQLite — this command is meant for SQLite→PostgreSQL migration.\n"
+                "Target DB is the source SQLite file — this command is meant for "
+                "SQLite→PostgreSQL migration.\n"
                 "If the active DB IS your db.sqlite3 file, you already have the data."
             ))
             return
 
+        store = get_media_store()
+        checkpoint = self._load_checkpoint(checkpoint_path, sqlite_path, options["restart"])
+        last_rowid = checkpoint["last_rowid"]
+
         self.stdout.write("=" * 60)
         self.stdout.write("  MEDIA BYTES MIGRATION")
         self.stdout.write(f"  Source: {sqlite_path} ({sqlite_path.stat().st_size / 1024 / 1024:.0f} MB)")
         self.stdout.write(f"  Target: {connection.settings_dict.get('NAME', 'unknown')}")
+        self.stdout.write(f"  Store:  {store.__class__.__name__ if store else 'database column'}")
+        self.stdout.write(f"  Workers: {workers}, batch size: {batch_size}")
+        if last_rowid:
+            self.stdout.write(f"  Resuming after source row {last_rowid} ({checkpoint_path})")
         if dry_run:
             self.stdout.write(self.style.WARNING("  MODE: DRY RUN"))
         self.stdout.write("=" * 60)
 
-        # Connect to source SQLite
-        src = sqlite3.connect(str(sqlite_path))
-        src.row_factory = sqlite3.Row
-
-        # Get all media filenames from SQLite
-        cursor = src.execute(
-            "SELECT id, filename, checksum_sha256, size_bytes "
-            "FROM catalog_media ORDER BY filename"
+        targets, skipped_has_bytes = self._load_targets(store, force)
+        self.stdout.write(
+            f"  Target DB: {len(targets)} filenames need content "
+            f"({skipped_has_bytes} rows already have it)"
         )
-        src_records = cursor.fetchall()
-        self.stdout.write(f"  Source SQLite: {len(src_records)} media records")
-
-        # Get target media records (filenames that need bytes)
-        if force:
-            target_media = {m.filename: m for m in Media.objects.only("id", "filename")}
-        else:
-            # Only update records where bytes is NULL or empty
-            target_media = {}
-            for m in Media.objects.only("id", "filename").iterator():
-                target_media[m.filename] = m
-
-        self.stdout.write(f"  Target DB: {len(target_media)} media records")
-
-        # Process in batches
-        stats = {"migrated": 0, "skipped_no_match": 0, "skipped_has_bytes": 0, "errors": 0}
-        batch = []
-
-        for row in src_records:
-            filename = row["filename"]
-
-            if filename not in target_media:
-                stats["skipped_no_match"] += 1
-                continue
-
-            target = target_media[filename]
-
-            # Check if target already has bytes (unless --force)
-            if not force:
-                has_bytes = Media.objects.filter(
-                    id=target.id
-                ).exclude(bytes=b"").exclude(bytes=None).exists()
-                if has_bytes:
-                    stats["skipped_has_bytes"] += 1
-                    continue
-
-            batch.append((row["filename"], target.id))
 
-            if len(batch) >= batch_size:
-                self._process_batch(src, batch, stats, dry_run)
-                batch = []
-
-        # Process remaining
-        if batch:
-            self._process_batch(src, batch, stats, dry_run)
-
-        src.close()
+        src = sqlite3.connect(f"file:{sqlite_path}?mode=ro", uri=True)
+        stats = {
+            "migrated": 0,
+            "bytes": 0,
+            "skipped_no_match": 0,
+            "skipped_has_bytes": skipped_has_bytes,
+            "errors": 0,
+        }
+        stats_lock = threading.Lock()
+
+        try:
+            if dry_run:
+                self._dry_run(src, targets, last_rowid, stats)
+            else:
+                self._migrate(
+                    src, targets, store, last_rowid, batch_size, workers,
+                    stats, stats_lock, checkpoint, checkpoint_path, start,
+                )
+        finally:
+            src.close()
 
         elapsed = time.time() - start
         self.stdout.write("")
@@ -144,40 +171,263 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS("  MIGRATION COMPLETE"))
         self.stdout.write("=" * 60)
         self.stdout.write(f"  Migrated:          {stats['migrated']}")
+        self.stdout.write(f"  Data moved:        {stats['bytes'] / 1024 / 1024:.1f} MB")
         self.stdout.write(f"  Skipped (no match):{stats['skipped_no_match']}")
         self.stdout.write(f"  Skipped (has data):{stats['skipped_has_bytes']}")
         self.stdout.write(f"  Errors:            {stats['errors']}")
         self.stdout.write(f"  Time:              {elapsed:.1f}s")
-
-    def _process_batch(self, src_conn, batch, stats, dry_run):
-        """Process a batch of media records."""
-        for filename, target_id in batch:
-            try:
-                if dry_run:
-                    self.stdout.write(f"  [DRY-RUN] Would migrate: {filename}")
-                    stats["migrated"] += 1
+        self.stdout.write(f"  Throughput:        {self._rate(stats, elapsed)}")
+
+    # ------------------------------------------------------------------
+    # Source and target
+    # ------------------------------------------------------------------
+
+    def _load_targets(self, store, force):
+        """Map filename -> ids of target rows that need content."""
+        targets = {}
+        skipped = 0
+        rows = (
+            Media.objects.annotate(db_bytes=Length("bytes"))
+            .values_list("id", "filename", "storage_backend", "checksum_sha256", "db_bytes")
+            .iterator(chunk_size=2000)
+        )
+        for media_id, filename, backend, checksum, db_bytes in rows:
+            if not force:
+                if backend == Media.StorageBackend.DATABASE:
+                    has_content = bool(db_bytes)
+                else:
+                    has_content = store is not None and store.exists(checksum)
+                if has_content:
+                    skipped += 1
                     continue
+            targets.setdefault(filename, []).append(media_id)
+        return targets, skipped
 
-                # Read bytes from SQLite
-                cursor = src_conn.execute(
-                    "SELECT bytes FROM catalog_media WHERE filename = ?",
-                    (filename,),
-                )
-                row = cursor.fetchone()
-                if not row or not row["bytes"]:
-                    stats["errors"] += 1
+    def _stream_batches(self, src, targets, last_rowid, batch_size, stats, stats_lock):
+        """Yield (max_rowid, [(filename, ids, content), ...]) from the source."""
+        cursor = src.execute(
+            "SELECT rowid, filename, bytes FROM catalog_media WHERE rowid > ? ORDER BY rowid",
+            (last_rowid,),
+        )
+        batch, batch_bytes, max_rowid = [], 0, last_rowid
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for rowid, filename, content in rows:
+                max_rowid = rowid
+                ids = targets.get(filename)
+                if not ids:
+                    with stats_lock:
+                        stats["skipped_no_match"] += 1
+                    continue
+                if not content:
+                    with stats_lock:
+                        stats["errors"] += 1
                     self.stderr.write(f"  WARNING: No bytes in SQLite for {filename}")
                     continue
+                batch.append((filename, ids, bytes(content)))
+                batch_bytes += len(content)
+                if len(batch) >= batch_size or batch_bytes >= BATCH_MAX_BYTES:
+                    yield max_rowid, batch
+                    batch, batch_bytes = [], 0
+        # A trailing empty batch still advances the checkpoint past skipped rows
+        yield max_rowid, batch
+
+    def _dry_run(self, src, targets, last_rowid, stats):
+        cursor = src.execute(
+            "SELECT filename, length(bytes) FROM catalog_media WHERE rowid > ? ORDER BY rowid",
+            (last_rowid,),
+        )
+        for filename, size in cursor:
+            if filename not in targets:
+                stats["skipped_no_match"] += 1
+                continue
+            self.stdout.write(f"  [DRY-RUN] Would migrate: {filename} ({size or 0} bytes)")
+            stats["migrated"] += 1
+            stats["bytes"] += size or 0
+
+    # ------------------------------------------------------------------
+    # Writers
+    # ------------------------------------------------------------------
+
+    def _migrate(self, src, targets, store, last_rowid, batch_size, workers,
+                 stats, stats_lock, checkpoint, checkpoint_path, start):
+        batches = self._stream_batches(src, targets, last_rowid, batch_size, stats, stats_lock)
+
+        if workers == 1:
+            for max_rowid, batch in batches:
+                self._write_batch(batch, store, stats, stats_lock)
+                self._save_checkpoint(checkpoint_path, checkpoint, max_rowid)
+                self._progress(stats, start)
+            return
 
-                binary_data = bytes(row["bytes"])
-
-                # Update PostgreSQL
-                Media.objects.filter(id=target_id).update(bytes=binary_data)
+        # Batches finish out of order; the checkpoint only advances over a
+        # contiguous run of completed batches
+        in_flight = deque()
+        failed = False
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="media-bytes") as pool:
+            for max_rowid, batch in batches:
+                in_flight.append(
+                    (max_rowid, pool.submit(self._run_batch, batch, store, stats, stats_lock))
+                )
+                # Bound memory: at most two batches queued per worker
+                while len(in_flight) >= workers * 2 or (in_flight and in_flight[0][1].done()):
+                    done_rowid, future = in_flight.popleft()
+                    failed = not future.result() or failed
+                    if not failed:
+                        self._save_checkpoint(checkpoint_path, checkpoint, done_rowid)
+                    self._progress(stats, start)
+
+            while in_flight:
+                done_rowid, future = in_flight.popleft()
+                failed = not future.result() or failed
+                if not failed:
+                    self._save_checkpoint(checkpoint_path, checkpoint, done_rowid)
+            self._progress(stats, start)
+
+    def _run_batch(self, batch, store, stats, stats_lock):
+        try:
+            return self._write_batch(batch, store, stats, stats_lock)
+        finally:
+            # Worker threads hold their own DB connection
+            connection.close()
+
+    def _write_batch(self, batch, store, stats, stats_lock):
+        """Write one batch; returns False if it failed as a whole."""
+        if not batch:
+            return True
+
+        rows = []
+        errors = 0
+        written_bytes = 0
+        for filename, ids, content in batch:
+            checksum = hashlib.sha256(content).hexdigest()
+            if store is not None:
+                try:
+                    store.save(checksum, content)
+                    if store.size(checksum) != len(content):
+                        raise IOError("stored blob size does not match source content")
+                except Exception as e:
+                    errors += 1
+                    self.stderr.write(self.style.ERROR(f"  ERROR: {filename}: {e}"))
+                    continue
+            written_bytes += len(content)
+            for media_id in ids:
+                rows.append((media_id, checksum, len(content), None if store else content))
+
+        try:
+            with transaction.atomic():
+                self._bulk_update(rows, store)
+        except Exception as e:
+            with stats_lock:
+                stats["errors"] += len(batch)
+            self.stderr.write(self.style.ERROR(f"  ERROR: batch of {len(batch)} failed: {e}"))
+            return False
+
+        # Queryset updates skip post_save; drop any hot-cache entries
+        hot_cache = get_media_hot_cache()
+        for media_id, *_ in rows:
+            hot_cache.invalidate(media_id)
+
+        with stats_lock:
+            stats["migrated"] += len(batch) - errors
+            stats["errors"] += errors
+            stats["bytes"] += written_bytes
+        return True
+
+    def _bulk_update(self, rows, store):
+        """Apply one batch with a single statement."""
+        if not rows:
+            return
+        backend = store.name if store is not None else Media.StorageBackend.DATABASE
+
+        if connection.vendor != "postgresql":
+            objs = []
+            for media_id, checksum, size, content in rows:
+                media = Media(
+                    id=media_id,
+                    checksum_sha256=checksum,
+                    size_bytes=size,
+                    storage_backend=backend,
+                    bytes=content if content is not None else b"",
+                )
+                objs.append(media)
+            Media.objects.bulk_update(
+                objs, ["checksum_sha256", "size_bytes", "storage_backend", "bytes"]
+            )
+            return
 
-                stats["migrated"] += 1
-                if stats["migrated"] % 50 == 0:
-                    self.stdout.write(f"  ... {stats['migrated']} migrated")
+        qn = connection.ops.quote_name
+        table = qn(Media._meta.db_table)
+        if store is not None:
+            values = ", ".join(["(%s::uuid, %s, %s::integer)"] * len(rows))
+            params = [backend]
+            for media_id, checksum, size, _content in rows:
+                params.extend([str(media_id), checksum, size])
+            sql = (
+                f"UPDATE {table} AS m SET "
+                f"{qn('storage_backend')} = %s, "
+                f"{qn('checksum_sha256')} = v.checksum, "
+                f"{qn('size_bytes')} = v.size_bytes, "
+                f"{qn('bytes')} = ''::bytea, "
+                f"{qn('updated_at')} = now() "
+                f"FROM (VALUES {values}) AS v(id, checksum, size_bytes) "
+                f"WHERE m.{qn('id')} = v.id"
+            )
+        else:
+            values = ", ".join(["(%s::uuid, %s, %s::integer, %s::bytea)"] * len(rows))
+            params = [backend]
+            for media_id, checksum, size, content in rows:
+                params.extend([str(media_id), checksum, size, content])
+            sql = (
+                f"UPDATE {table} AS m SET "
+                f"{qn('storage_backend')} = %s, "
+                f"{qn('checksum_sha256')} = v.checksum, "
+                f"{qn('size_bytes')} = v.size_bytes, "
+                f"{qn('bytes')} = v.content, "
+                f"{qn('updated_at')} = now() "
+                f"FROM (VALUES {values}) AS v(id, checksum, size_bytes, content) "
+                f"WHERE m.{qn('id')} = v.id"
+            )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    # ------------------------------------------------------------------
+    # Checkpoint and progress
+    # ------------------------------------------------------------------
+
+    def _load_checkpoint(self, path, sqlite_path, restart):
+        fresh = {"sqlite_path": str(sqlite_path.resolve()), "last_rowid": 0}
+        if restart or not path.exists():
+            return fresh
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return fresh
+        if data.get("sqlite_path") != fresh["sqlite_path"]:
+            return fresh
+        fresh["last_rowid"] = int(data.get("last_rowid") or 0)
+        return fresh
+
+    def _save_checkpoint(self, path, checkpoint, rowid):
+        if rowid <= checkpoint["last_rowid"]:
+            return
+        checkpoint["last_rowid"] = rowid
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(checkpoint))
+        os.replace(tmp, path)
+
+    def _rate(self, stats, elapsed):
+        elapsed = max(elapsed, 0.001)
+        return (
+            f"{stats['migrated'] / elapsed:.1f} rows/s, "
+            f"{stats['bytes'] / 1024 / 1024 / elapsed:.1f} MB/s"
+        )
 
-            except Exception as e:
-                stats["errors"] += 1
-                self.stderr.write(self.style.ERROR(f"  ERROR: {filename}: {e}"))
+    def _progress(self, stats, start):
+        elapsed = time.time() - start
+        self.stdout.write(
+            f"  ... {stats['migrated']} migrated, {stats['bytes'] / 1024 / 1024:.1f} MB "
+            f"({self._rate(stats, elapsed)}, {elapsed:.0f}s)"
+        )
@@ -0,0 +1,160 @@
+"""
+Move Media content out of the database column into the blob store.
+
+Processes Media rows still marked as database-backed in batches, writes each
+row's content to the configured blob store (MEDIA_BLOB_STORE), verifies the
+stored copy and then clears the ``bytes`` column.
+
+The command is resumable: migrated rows are flipped to the blob store
+backend as each batch commits, so re-running it after an interruption
+continues with the remaining rows.
+
+Usage:
+    python manage.py migrate_media_to_blob_store
+    python manage.py migrate_media_to_blob_store --dry-run
+    python manage.py migrate_media_to_blob_store --batch-size 50 --limit 1000
+    python manage.py migrate_media_to_blob_store --keep-db-bytes
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.catalog.media_cache import get_media_hot_cache
+from apps.catalog.media_storage import get_media_store
+from apps.catalog.models import Media
+
+
+class Command(BaseCommand):
+    help = "Move Media bytes from the database into the content-addressed blob store"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20,
+            help="Rows loaded per batch (default: 20)",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=0,
+            help="Stop after migrating this many rows (default: no limit)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be migrated without writing anything",
+        )
+        parser.add_argument(
+            "--keep-db-bytes",
+            action="store_true",
+            help="Write blobs but keep the database copy (bytes column untouched)",
+        )
+
+    def handle(self, *args, **options):
+        store = get_media_store()
+        if store is None:
+            raise CommandError(
+                "No blob store configured. Set MEDIA_BLOB_STORE['BACKEND'] first."
+            )
+
+        batch_size = max(1, options["batch_size"])
+        limit = options["limit"]
+        dry_run = options["dry_run"]
+        keep_db_bytes = options["keep_db_bytes"]
+        start = time.time()
+
+        pending = Media.objects.filter(storage_backend=Media.StorageBackend.DATABASE)
+
+        self.stdout.write("=" * 60)
+        self.stdout.write("  MEDIA BLOB STORE MIGRATION")
+        self.stdout.write(f"  Store:   {store.__class__.__name__}")
+        self.stdout.write(f"  Pending: {pending.count()} database-backed media rows")
+        if dry_run:
+            self.stdout.write(self.style.WARNING("  MODE: DRY RUN"))
+        self.stdout.write("=" * 60)
+
+        stats = {"migrated": 0, "skipped_empty": 0, "checksum_fixed": 0, "errors": 0, "bytes": 0}
+        last_id = None
+
+        while True:
+            # Keyset pagination on id keeps every batch query cheap and stable
+            # while rows are being flipped to the blob store
+            page = pending.order_by("id")
+            if last_id is not None:
+                page = page.filter(id__gt=last_id)
+            ids = list(page.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            self._process_batch(ids, store, stats, dry_run, keep_db_bytes)
+
+            done = stats["migrated"] + stats["skipped_empty"] + stats["errors"]
+            elapsed = time.time() - start
+            self.stdout.write(
+                f"  ... {done} processed, {stats['migrated']} migrated "
+                f"({stats['bytes'] / 1024 / 1024:.1f} MB, {elapsed:.0f}s)"
+            )
+
+            if limit and stats["migrated"] >= limit:
+                self.stdout.write(self.style.WARNING(f"  Limit of {limit} reached, stopping."))
+                break
+
+        elapsed = time.time() - start
+        self.stdout.write("")
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS("  MIGRATION COMPLETE"))
+        self.stdout.write("=" * 60)
+        self.stdout.write(f"  Migrated:          {stats['migrated']}")
+        self.stdout.write(f"  Data moved:        {stats['bytes'] / 1024 / 1024:.1f} MB")
+        self.stdout.write(f"  Checksums fixed:   {stats['checksum_fixed']}")
+        self.stdout.write(f"  Skipped (empty):   {stats['skipped_empty']}")
+        self.stdout.write(f"  Errors:            {stats['errors']}")
+        self.stdout.write(f"  Time:              {elapsed:.1f}s")
+
+    def _process_batch(self, ids, store, stats, dry_run, keep_db_bytes):
+        """Write one batch of rows to the blob store and flip their backend."""
+        rows = Media.objects.filter(id__in=ids).only("id", "filename", "checksum_sha256", "bytes")
+        for media in rows:
+            content = bytes(media.bytes or b"")
+            if not content:
+                stats["skipped_empty"] += 1
+                continue
+
+            checksum = Media.compute_sha256(content)
+            if dry_run:
+                self.stdout.write(f"  [DRY-RUN] Would migrate: {media.filename} ({len(content)} bytes)")
+                stats["migrated"] += 1
+                stats["bytes"] += len(content)
+                continue
+
+            try:
+                store.save(checksum, content)
+                if store.size(checksum) != len(content):
+                    raise IOError("stored blob size does not match database content")
+
+                updates = {
+                    "storage_backend": store.name,
+                    "size_bytes": len(content),
+                    "checksum_sha256": checksum,
+                }
+                if not keep_db_bytes:
+                    updates["bytes"] = b""
+                if checksum != media.checksum_sha256:
+                    stats["checksum_fixed"] += 1
+
+                with transaction.atomic():
+                    Media.objects.filter(
+                        id=media.id,
+                        storage_backend=Media.StorageBackend.DATABASE,
+                    ).update(**updates)
+                # Queryset updates skip post_save; drop any hot-cache entry
+                get_media_hot_cache().invalidate(media.id)
+
+                stats["migrated"] += 1
+                stats["bytes"] += len(content)
+            except Exception as e:
+                stats["errors"] += 1
+                self.stderr.write(self.style.ERROR(f"  ERROR: {media.filename} ({media.id}): {e}"))
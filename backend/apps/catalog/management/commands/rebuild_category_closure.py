@@ -0,0 +1,57 @@
+"""
+Rebuild the Category closure table from Category.parent.
+
+Category.save keeps the table in sync; run this after bulk changes that
+bypass it (queryset updates of ``parent``, raw SQL, fixture loads).
+
+Usage:
+    python manage.py rebuild_category_closure
+    python manage.py rebuild_category_closure --check
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.catalog.cache_keys import clear_all_catalog_cache
+from apps.catalog.models import Category, CategoryClosure
+
+
+class Command(BaseCommand):
+    help = "Recompute the category closure (ancestor/descendant) table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report whether the table is out of sync (exit code 1 if so)",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            stale = self._find_stale()
+            if stale:
+                raise CommandError(f"Category closure is out of sync for {stale} categories")
+            self.stdout.write(self.style.SUCCESS("Category closure is in sync."))
+            return
+
+        rows = CategoryClosure.rebuild()
+        clear_all_catalog_cache()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt category closure: {Category.objects.count()} categories, {rows} rows."
+        ))
+
+    def _find_stale(self) -> int:
+        """Count categories whose stored parent link disagrees with Category.parent."""
+        parents = dict(Category.objects.values_list("id", "parent_id"))
+        stored = {
+            descendant_id: ancestor_id
+            for ancestor_id, descendant_id in CategoryClosure.objects.filter(depth=1).values_list(
+                "ancestor_id", "descendant_id"
+            )
+        }
+        has_self = set(
+            CategoryClosure.objects.filter(depth=0).values_list("descendant_id", flat=True)
+        )
+        return sum(
+            1
+            for category_id, parent_id in parents.items()
+            if category_id not in has_self or stored.get(category_id) != parent_id
+        )
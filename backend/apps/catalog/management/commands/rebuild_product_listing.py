@@ -0,0 +1,27 @@
+"""
+Rebuild the ProductListing read model from products, variants and media.
+
+Signals keep the listing rows in sync; run this after bulk changes that
+bypass them (bulk_create, queryset updates, raw SQL, fixture loads).
+
+Usage:
+    python manage.py rebuild_product_listing
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.catalog.listing import rebuild_listings
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized listing rows of all active products"
+
+    def handle(self, *args, **options):
+        start = time.time()
+        with transaction.atomic():
+            rows = rebuild_listings()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt product listing: {rows} rows in {time.time() - start:.1f}s."
+        ))
@@ -197,15 +197,17 @@ class Command(BaseCommand):
                             except Exception:
                                 pass
 
-                            # Create Media (stores bytes directly in DB)
-                            media = Media.objects.create(
+                            # Reuse existing media with identical content
+                            media, _ = Media.get_or_create_by_content(
+                                content,
                                 kind='image',
                                 filename=image_path.name,
                                 content_type=content_type,
-                                bytes=content,
                                 width=width,
                                 height=height,
                             )
+                            if ProductMedia.objects.filter(product=product, media=media).exists():
+                                continue
 
                             # Create ProductMedia association
                             ProductMedia.objects.create(
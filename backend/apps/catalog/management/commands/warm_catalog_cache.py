@@ -0,0 +1,53 @@
+"""
+Prefill the catalog caches (nav, trees, taxonomy trees, PLP pages).
+
+Run after a deploy so the first visitors do not pay for cold builds;
+imports schedule the same warm-up themselves. See apps/catalog/cache_warmer.py.
+
+Usage:
+    python manage.py warm_catalog_cache
+    python manage.py warm_catalog_cache --workers 8
+    python manage.py warm_catalog_cache --skip-brands
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.catalog.cache_warmer import DEFAULT_WORKERS, warm_catalog_cache
+
+
+class Command(BaseCommand):
+    help = "Prefill catalog caches and report build time per endpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_WORKERS,
+            help=f"Concurrent builds (default: {DEFAULT_WORKERS})",
+        )
+        parser.add_argument(
+            "--skip-brands",
+            action="store_true",
+            help="Do not warm brand-filtered PLP pages",
+        )
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        report = warm_catalog_cache(
+            workers=max(1, options["workers"]), brands=not options["skip_brands"]
+        )
+
+        self.stdout.write(f"  {'Endpoint':<18}{'Warmed':>8}{'Errors':>8}{'Avg ms':>10}{'Max ms':>10}{'Total ms':>11}")
+        for endpoint, stats in report.items():
+            self.stdout.write(
+                f"  {endpoint:<18}{stats['warmed']:>8}{stats['errors']:>8}"
+                f"{stats['avg_ms']:>10.1f}{stats['max_ms']:>10.1f}{stats['total_ms']:>11.1f}"
+            )
+
+        errors = sum(stats["errors"] for stats in report.values())
+        message = f"Warmed catalog caches in {time.monotonic() - start:.1f}s."
+        if errors:
+            self.stdout.write(self.style.WARNING(f"{message} {errors} builds failed (see log)."))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,204 @@
+"""
+Two-tier hot cache for small media files.
+
+Brand logos, category covers and spec-key icons are a few KB each and are
+requested on almost every page. Media up to MEDIA_HOT_CACHE_MAX_ITEM_BYTES
+is served without touching the database:
+
+- Redis holds the metadata per media id (checksum, type, size, filename)
+  and the content per checksum, shared by all workers.
+- Each worker keeps an in-process LRU of content by checksum, bounded by
+  MEDIA_HOT_CACHE_MAX_BYTES in total.
+
+Content is addressed by checksum, so the in-process tier can never serve
+stale bytes: rewriting a Media row only has to drop its metadata entry in
+Redis (see ``signals.invalidate_media_hot_cache``).
+"""
+
+import io
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .cache_keys import MEDIA_HOT_CACHE_TTL, media_hot_content_key, media_hot_key
+
+logger = logging.getLogger(__name__)
+
+
+def max_item_bytes() -> int:
+    return getattr(settings, "MEDIA_HOT_CACHE_MAX_ITEM_BYTES", 64 * 1024)
+
+
+class HotMedia:
+    """
+    A cached media file exposing the attributes media delivery needs.
+
+    Mirrors the Media fields used by ``media_delivery.build_media_response``
+    and ``media_derivatives.get_derivative``.
+    """
+
+    def __init__(self, meta: dict, content: bytes):
+        self.id = meta["id"]
+        self.kind = meta["kind"]
+        self.filename = meta["filename"]
+        self.content_type = meta["content_type"]
+        self.checksum_sha256 = meta["checksum_sha256"]
+        self.size_bytes = len(content)
+        self._content = content
+
+    def open_content(self):
+        return io.BytesIO(self._content)
+
+    def read_bytes(self) -> bytes:
+        return self._content
+
+
+class LocalLRU:
+    """Thread-safe LRU of ``checksum -> bytes`` bounded by total size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            content = self._items.get(key)
+            if content is not None:
+                self._items.move_to_end(key)
+            return content
+
+    def put(self, key: str, content: bytes) -> None:
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            self._items[key] = content
+            self.current_bytes += len(content)
+            while self.current_bytes > self.max_bytes:
+                _key, evicted = self._items.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+class MediaHotCache:
+    """Redis + in-process cache of small media, with hit/miss counters."""
+
+    def __init__(self, local_max_bytes: int):
+        self.local = LocalLRU(local_max_bytes)
+        self._counters_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        with self._counters_lock:
+            self.counters = {"local_hits": 0, "redis_hits": 0, "misses": 0, "stores": 0}
+
+    def _count(self, name: str) -> None:
+        with self._counters_lock:
+            self.counters[name] += 1
+
+    def stats(self) -> dict:
+        """Counters for this worker process plus the local tier size."""
+        with self._counters_lock:
+            stats = dict(self.counters)
+        lookups = stats["local_hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_ratio"] = (
+            round((stats["local_hits"] + stats["redis_hits"]) / lookups, 4) if lookups else 0.0
+        )
+        stats["local_items"] = len(self.local)
+        stats["local_bytes"] = self.local.current_bytes
+        return stats
+
+    def get(self, media_id) -> Optional[HotMedia]:
+        """Return the cached media for ``media_id``, or None on a miss."""
+        try:
+            meta = cache.get(media_hot_key(media_id))
+            if meta is None:
+                self._count("misses")
+                return None
+
+            checksum = meta["checksum_sha256"]
+            content = self.local.get(checksum)
+            if content is not None:
+                self._count("local_hits")
+                return HotMedia(meta, content)
+
+            content = cache.get(media_hot_content_key(checksum))
+            if content is None:
+                self._count("misses")
+                return None
+            self.local.put(checksum, content)
+            self._count("redis_hits")
+            return HotMedia(meta, content)
+        except Exception as e:
+            logger.warning(f"Media hot cache lookup failed for {media_id}: {e}")
+            self._count("misses")
+            return None
+
+    def remember(self, media) -> Optional[HotMedia]:
+        """
+        Cache ``media`` if it is small enough.
+
+        Returns the cached copy (so the caller can serve it without reading
+        the content again) or None when the media is not cacheable.
+        """
+        size = media.size_bytes or 0
+        if not size or size > max_item_bytes() or not media.checksum_sha256:
+            return None
+
+        content = media.read_bytes()
+        if len(content) != size:
+            return None
+
+        meta = {
+            "id": str(media.id),
+            "kind": media.kind,
+            "filename": media.filename,
+            "content_type": media.content_type,
+            "checksum_sha256": media.checksum_sha256,
+        }
+        try:
+            cache.set_many(
+                {
+                    media_hot_key(media.id): meta,
+                    media_hot_content_key(media.checksum_sha256): content,
+                },
+                MEDIA_HOT_CACHE_TTL,
+            )
+        except Exception as e:
+            logger.warning(f"Media hot cache store failed for {media.id}: {e}")
+        self.local.put(media.checksum_sha256, content)
+        self._count("stores")
+        return HotMedia(meta, content)
+
+    def invalidate(self, media_id) -> None:
+        """Forget the metadata of a rewritten or deleted Media row."""
+        cache.delete(media_hot_key(media_id))
+
+
+@lru_cache(maxsize=1)
+def get_media_hot_cache() -> MediaHotCache:
+    return MediaHotCache(getattr(settings, "MEDIA_HOT_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+
+
+@receiver(setting_changed)
+def _reset_media_hot_cache(sender, setting, **kwargs):
+    if setting.startswith("MEDIA_HOT_CACHE_"):
+        get_media_hot_cache.cache_clear()
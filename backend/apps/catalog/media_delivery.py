@@ -0,0 +1,225 @@
+"""
+HTTP delivery helpers for Media content.
+
+Builds responses for the public media file endpoint:
+- ETag / If-None-Match revalidation (304)
+- Single byte-range requests (206) with If-Range
+- HEAD requests (headers only, content is never opened)
+- Chunked streaming so per-request memory stays flat for large files
+- Optional offload to the reverse proxy (X-Accel-Redirect / X-Sendfile)
+
+With MEDIA_ACCEL_MODE set, the app only checks the ETag and that the file
+exists on disk; the body (including Range handling) is sent by the web
+server from an internal location mapped to MEDIA_ACCEL_ROOT. Content that
+has no local file (legacy DB-backed rows) is still streamed by Django.
+"""
+
+import re
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+
+# Bodies up to this size are sent in one buffer, larger ones are streamed
+STREAM_CHUNK_SIZE = 64 * 1024  # 64 KB
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+ACCEL_REDIRECT = "x-accel-redirect"  # nginx
+ACCEL_SENDFILE = "x-sendfile"  # Apache mod_xsendfile, lighttpd
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when a Range header cannot be satisfied for the resource size."""
+
+
+def media_etag(media) -> str:
+    """Strong ETag for a media object (its content checksum)."""
+    return f'"{media.checksum_sha256}"'
+
+
+def etag_matches(header_value: Optional[str], media, strong: bool = False) -> bool:
+    """
+    Check an If-None-Match / If-Range value against the media ETag.
+
+    Accepts quoted or unquoted tags, weak tags and comma-separated lists.
+    With ``strong`` (If-Range, RFC 9110 13.1.5) only the exact strong tag
+    matches: no ``*``, no weak tags and no lists.
+    """
+    if not header_value:
+        return False
+    if strong:
+        return header_value.strip() == media_etag(media)
+    for candidate in header_value.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') == media.checksum_sha256:
+            return True
+    return False
+
+
+def parse_byte_range(header_value: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single ``bytes=`` range into an inclusive ``(start, end)`` pair.
+
+    Returns None when the header should be ignored (malformed or multiple
+    ranges), in which case the full content is served. Raises
+    RangeNotSatisfiable when the range lies outside the content.
+    """
+    match = _RANGE_RE.match(header_value.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        if suffix == 0:
+            raise RangeNotSatisfiable()
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or (last and end < start):
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+def iter_content(fh, length: int, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield up to ``length`` bytes from an open file, closing it when done."""
+    try:
+        remaining = length
+        while remaining > 0:
+            chunk = fh.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def apply_media_headers(response, media) -> None:
+    """Set caching and disposition headers shared by all media responses."""
+    response["ETag"] = media_etag(media)
+    response["Accept-Ranges"] = "bytes"
+
+    # Cache for 7 days for images/PDFs
+    if media.kind in ["image", "pdf"]:
+        response["Cache-Control"] = "public, max-age=604800"
+    else:
+        response["Cache-Control"] = "public, max-age=3600"
+
+    # Content-Disposition for downloads
+    if media.kind == "pdf":
+        response["Content-Disposition"] = f'inline; filename="{media.filename}"'
+
+
+def accel_header(path: Path) -> Optional[Tuple[str, str]]:
+    """
+    Header handing ``path`` to the web server, or None if offload is off.
+
+    For X-Accel-Redirect the path must live under MEDIA_ACCEL_ROOT and is
+    mapped to the internal MEDIA_ACCEL_PREFIX location.
+    """
+    mode = (getattr(settings, "MEDIA_ACCEL_MODE", "") or "").lower()
+    if mode == ACCEL_SENDFILE:
+        return "X-Sendfile", str(path)
+    if mode != ACCEL_REDIRECT:
+        return None
+
+    root = getattr(settings, "MEDIA_ACCEL_ROOT", None) or settings.MEDIA_ROOT
+    try:
+        relative = Path(path).resolve().relative_to(Path(root).resolve())
+    except ValueError:
+        return None
+    prefix = getattr(settings, "MEDIA_ACCEL_PREFIX", "/_protected_media/")
+    return "X-Accel-Redirect", f"{prefix.rstrip('/')}/{relative.as_posix()}"
+
+
+def build_offload_response(media) -> Optional[HttpResponse]:
+    """
+    Response delegating the transfer to the web server, when possible.
+
+    Returns None (serve from Django) when offload is disabled or the
+    content has no file on local disk.
+    """
+    local_path = getattr(media, "local_path", None)
+    path = local_path() if local_path else None
+    if path is None:
+        return None
+
+    header = accel_header(path)
+    if header is None or not path.is_file():
+        return None
+
+    response = HttpResponse(content_type=media.content_type)
+    response[header[0]] = header[1]
+    apply_media_headers(response, media)
+    return response
+
+
+def build_media_response(request, media):
+    """
+    Build the full, partial, 304 or 416 response for a media file request.
+    """
+    if etag_matches(request.headers.get("If-None-Match"), media):
+        response = HttpResponse(status=304)
+        response["ETag"] = media_etag(media)
+        return response
+
+    # The web server handles Range and HEAD for offloaded files itself
+    offload = build_offload_response(media)
+    if offload is not None:
+        return offload
+
+    size = media.size_bytes or 0
+    start, end = 0, size - 1
+    status = 200
+
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    # If-Range with a stale or weak validator means "send the whole representation"
+    if range_header and size and (not if_range or etag_matches(if_range, media, strong=True)):
+        try:
+            byte_range = parse_byte_range(range_header, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            apply_media_headers(response, media)
+            return response
+        if byte_range:
+            start, end = byte_range
+            status = 206
+
+    length = max(end - start + 1, 0)
+
+    if request.method == "HEAD":
+        response = HttpResponse(status=status, content_type=media.content_type)
+    else:
+        fh = media.open_content()
+        if start:
+            fh.seek(start)
+        if length <= STREAM_CHUNK_SIZE:
+            with fh:
+                body = fh.read(length)
+            response = HttpResponse(body, status=status, content_type=media.content_type)
+        else:
+            response = StreamingHttpResponse(
+                iter_content(fh, length),
+                status=status,
+                content_type=media.content_type,
+            )
+
+    response["Content-Length"] = length
+    if status == 206:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    apply_media_headers(response, media)
+    return response
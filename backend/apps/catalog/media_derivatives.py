@@ -0,0 +1,329 @@
+"""
+On-the-fly image derivatives for Media.
+
+Resized/transcoded variants of image media are requested through the media
+file endpoint, e.g. ``/api/v1/media/<id>/file/?w=400&fmt=webp``. Only the
+widths in MEDIA_DERIVATIVE_WIDTHS and formats in MEDIA_DERIVATIVE_FORMATS are
+accepted, so the number of variants per image is bounded.
+
+Each derivative is generated once with Pillow and kept in a persistent
+on-disk cache keyed by ``(checksum_sha256, width, format)``. The cache is
+bounded by MEDIA_DERIVATIVE_CACHE_MAX_BYTES and evicts least recently used
+files first (hits refresh the file mtime).
+"""
+
+import hashlib
+import io
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .media_storage import FileSystemMediaStore
+
+logger = logging.getLogger(__name__)
+
+# Output formats: name -> (Pillow format, content type, file extension)
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", "image/webp", "webp"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+    "png": ("PNG", "image/png", "png"),
+    # Only offered when Pillow was built with AVIF support
+    "avif": ("AVIF", "image/avif", "avif"),
+}
+
+CONTENT_TYPE_TO_FORMAT = {
+    "image/webp": "webp",
+    "image/jpeg": "jpeg",
+    "image/png": "png",
+    "image/avif": "avif",
+}
+
+# Image size used for product/series cards in listing payloads
+CARD_IMAGE_WIDTH = 400
+CARD_IMAGE_FORMAT = "webp"
+
+# Evict when this fraction of the budget was written since the last sweep,
+# and trim down to LOW_WATERMARK of the budget
+SWEEP_INTERVAL_FRACTION = 0.05
+LOW_WATERMARK = 0.9
+
+
+class DerivativeError(ValueError):
+    """Invalid derivative request (unknown size/format or non-image media)."""
+
+    def __init__(self, message: str, code: str):
+        super().__init__(message)
+        self.code = code
+
+
+def allowed_widths() -> Tuple[int, ...]:
+    return tuple(getattr(settings, "MEDIA_DERIVATIVE_WIDTHS", (160, 320, 400, 640, 800, 1280)))
+
+
+@lru_cache(maxsize=None)
+def format_supported(fmt: str) -> bool:
+    """Whether Pillow can encode the given derivative format."""
+    if fmt not in DERIVATIVE_FORMATS:
+        return False
+    from PIL import features
+
+    return fmt != "avif" or bool(features.check("avif"))
+
+
+def allowed_formats() -> Tuple[str, ...]:
+    formats = getattr(settings, "MEDIA_DERIVATIVE_FORMATS", ("webp", "jpeg", "png"))
+    return tuple(f for f in formats if format_supported(f))
+
+
+def media_file_url(media_id, width: Optional[int] = None, fmt: Optional[str] = None) -> str:
+    """Public file URL for a media object, optionally for a derivative."""
+    url = f"/api/v1/media/{media_id}/file/"
+    params = []
+    if width:
+        params.append(f"w={width}")
+    if fmt:
+        params.append(f"fmt={fmt}")
+    return f"{url}?{'&'.join(params)}" if params else url
+
+
+def card_image_url(media_id, kind: str) -> str:
+    """
+    File URL of the card-sized derivative for listing payloads.
+
+    Only images have derivatives; other kinds (documents, videos) link the
+    file itself.
+    """
+    if kind != "image":
+        return media_file_url(media_id)
+    return media_file_url(media_id, width=CARD_IMAGE_WIDTH, fmt=CARD_IMAGE_FORMAT)
+
+
+def parse_derivative_params(query_params, media) -> Optional[Tuple[Optional[int], str]]:
+    """
+    Read ``w`` / ``fmt`` query params for a derivative request.
+
+    Returns None when no derivative was requested, otherwise
+    ``(width, fmt)`` where width may be None (transcode only).
+    Raises DerivativeError for values outside the whitelist.
+    """
+    raw_width = query_params.get("w")
+    raw_fmt = query_params.get("fmt")
+    if not raw_width and not raw_fmt:
+        return None
+
+    if media.kind != "image":
+        raise DerivativeError(
+            "Resizing is only supported for image media.", "DERIVATIVE_NOT_SUPPORTED"
+        )
+
+    width = None
+    if raw_width:
+        try:
+            width = int(raw_width)
+        except (TypeError, ValueError):
+            width = None
+        if width not in allowed_widths():
+            raise DerivativeError(
+                f"Unsupported width. Allowed: {', '.join(map(str, allowed_widths()))}.",
+                "INVALID_WIDTH",
+            )
+
+    if raw_fmt:
+        fmt = raw_fmt.lower()
+        if fmt == "jpg":
+            fmt = "jpeg"
+        if fmt not in allowed_formats():
+            raise DerivativeError(
+                f"Unsupported format. Allowed: {', '.join(allowed_formats())}.",
+                "INVALID_FORMAT",
+            )
+    else:
+        # Keep the source format when possible
+        fmt = CONTENT_TYPE_TO_FORMAT.get(media.content_type, CARD_IMAGE_FORMAT)
+        if fmt not in allowed_formats():
+            fmt = allowed_formats()[0]
+
+    return width, fmt
+
+
+class DerivativeCache:
+    """
+    Size-bounded LRU cache of derivative files on disk.
+
+    Files are addressed like blobs (sharded by a hex key) so the layout and
+    atomic-write guarantees of FileSystemMediaStore apply.
+    """
+
+    def __init__(self, root, max_bytes: int):
+        self.store = FileSystemMediaStore(root)
+        self.max_bytes = max_bytes
+        self._written_since_sweep = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(checksum: str, width: Optional[int], fmt: str) -> str:
+        return hashlib.sha256(f"{checksum}:w{width or 0}:{fmt}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[int]:
+        """Return the cached size and mark the entry as recently used, or None."""
+        path = self.store.path(key)
+        try:
+            size = path.stat().st_size
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return size
+
+    def open(self, key: str):
+        return self.store.open(key)
+
+    def put(self, key: str, content: bytes) -> None:
+        self.store.save(key, content)
+        with self._lock:
+            self._written_since_sweep += len(content)
+            due = self._written_since_sweep >= self.max_bytes * SWEEP_INTERVAL_FRACTION
+            if due:
+                self._written_since_sweep = 0
+        if due:
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Evict least recently used files until under budget. Returns bytes freed."""
+        entries = []
+        total = 0
+        for dirpath, _dirnames, filenames in os.walk(self.store.root):
+            for name in filenames:
+                if name.startswith(".tmp-"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        if total <= self.max_bytes:
+            return 0
+
+        target = self.max_bytes * LOW_WATERMARK
+        freed = 0
+        for _mtime, size, path in sorted(entries):
+            if total - freed <= target:
+                break
+            try:
+                os.unlink(path)
+                freed += size
+            except FileNotFoundError:
+                pass
+
+        logger.info(f"Derivative cache sweep freed {freed} bytes ({total} -> {total - freed})")
+        return freed
+
+
+@lru_cache(maxsize=1)
+def get_derivative_cache() -> DerivativeCache:
+    root = getattr(settings, "MEDIA_DERIVATIVE_ROOT", None) or os.path.join(
+        settings.MEDIA_ROOT, "derivatives"
+    )
+    max_bytes = getattr(settings, "MEDIA_DERIVATIVE_CACHE_MAX_BYTES", 1024 * 1024 * 1024)
+    return DerivativeCache(root, max_bytes)
+
+
+@receiver(setting_changed)
+def _reset_derivative_cache(sender, setting, **kwargs):
+    if setting.startswith("MEDIA_DERIVATIVE_") or setting == "MEDIA_ROOT":
+        get_derivative_cache.cache_clear()
+
+
+class DerivativeFile:
+    """
+    A cached derivative exposing the attributes media delivery needs.
+
+    Mirrors the Media fields used by ``media_delivery.build_media_response``
+    so derivatives get the same ETag, Range and HEAD handling.
+    """
+
+    kind = "image"
+
+    def __init__(self, media, key: str, size: int, fmt: str, width: Optional[int]):
+        _pil_format, content_type, extension = DERIVATIVE_FORMATS[fmt]
+        stem = os.path.splitext(media.filename)[0] or "image"
+        self.checksum_sha256 = key
+        self.size_bytes = size
+        self.content_type = content_type
+        self.filename = f"{stem}-w{width}.{extension}" if width else f"{stem}.{extension}"
+        self._key = key
+
+    def open_content(self):
+        return get_derivative_cache().open(self._key)
+
+    def local_path(self):
+        return get_derivative_cache().store.local_path(self._key)
+
+
+def render_derivative(source, width: Optional[int], fmt: str) -> bytes:
+    """Resize (never upscale) and encode an image file object."""
+    from PIL import Image, ImageOps
+
+    pil_format = DERIVATIVE_FORMATS[fmt][0]
+
+    with Image.open(source) as img:
+        if width and img.format == "JPEG":
+            # Let the JPEG decoder downscale by a power of two up front
+            img.draft("RGB", (width, max(1, img.height * width // max(img.width, 1))))
+        img = ImageOps.exif_transpose(img)
+
+        if width and img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.Resampling.LANCZOS)
+
+        if pil_format == "JPEG":
+            if img.mode in ("RGBA", "LA", "P"):
+                img = img.convert("RGBA")
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                background.paste(img, mask=img.getchannel("A"))
+                img = background
+            elif img.mode != "RGB":
+                img = img.convert("RGB")
+            save_kwargs = {"quality": 82, "optimize": True, "progressive": True}
+        elif pil_format == "WEBP":
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if "A" in img.getbands() or img.mode == "P" else "RGB")
+            save_kwargs = {"quality": 80, "method": 4}
+        elif pil_format == "AVIF":
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if "A" in img.getbands() or img.mode == "P" else "RGB")
+            save_kwargs = {"quality": 60}
+        else:
+            save_kwargs = {"optimize": True}
+
+        out = io.BytesIO()
+        img.save(out, format=pil_format, **save_kwargs)
+        return out.getvalue()
+
+
+def get_derivative(media, width: Optional[int], fmt: str) -> DerivativeFile:
+    """
+    Return the derivative of ``media``, generating and caching it on a miss.
+
+    Raises OSError/PIL errors when the source cannot be decoded.
+    """
+    cache = get_derivative_cache()
+    key = DerivativeCache.key(media.checksum_sha256, width, fmt)
+
+    size = cache.get(key)
+    if size is None:
+        with media.open_content() as source:
+            content = render_derivative(source, width, fmt)
+        cache.put(key, content)
+        size = len(content)
+        logger.debug(f"Generated derivative w={width} fmt={fmt} for media {media.id} ({size} bytes)")
+
+    return DerivativeFile(media, key, size, fmt, width)
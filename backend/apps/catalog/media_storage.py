@@ -0,0 +1,208 @@
+"""
+Content-addressed blob storage for Media.
+
+Media content is stored outside the database, keyed by its SHA-256 checksum.
+The active store is configured with the ``MEDIA_BLOB_STORE`` setting:
+
+    MEDIA_BLOB_STORE = {
+        "BACKEND": "apps.catalog.media_storage.FileSystemMediaStore",
+        "OPTIONS": {"root": "/app/media/blobs"},
+    }
+
+Setting ``BACKEND`` to an empty value disables the store; Media content is
+then kept in the legacy ``Media.bytes`` column, which also remains the
+read fallback for rows that have not been migrated yet
+(see ``manage.py migrate_media_to_blob_store``).
+
+A blob is shared by every Media row with its checksum and deleted with the
+last one. Writers ``share_blob`` before saving, which keeps the blob from
+being deleted until their row is committed (see ``lock_blob_for_delete``).
+"""
+
+import logging
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Chunk size used when copying file-like content into the store
+COPY_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+class MediaStore:
+    """
+    Base class for media blob stores.
+
+    Blobs are immutable and addressed by their SHA-256 hex digest, so the
+    same content uploaded twice is stored once.
+    """
+
+    #: Value written to ``Media.storage_backend`` for blobs held by this store
+    name = ""
+
+    def exists(self, checksum: str) -> bool:
+        raise NotImplementedError
+
+    def open(self, checksum: str) -> BinaryIO:
+        """Open a blob for binary reading. Raises FileNotFoundError if missing."""
+        raise NotImplementedError
+
+    def save(self, checksum: str, content: Union[bytes, BinaryIO]) -> None:
+        """Store content under checksum. A no-op if the blob already exists."""
+        raise NotImplementedError
+
+    def delete(self, checksum: str) -> None:
+        raise NotImplementedError
+
+    def size(self, checksum: str) -> int:
+        raise NotImplementedError
+
+    def read(self, checksum: str) -> bytes:
+        with self.open(checksum) as fh:
+            return fh.read()
+
+    def local_path(self, checksum: str) -> Optional[Path]:
+        """
+        Filesystem path of a blob, for stores that keep blobs on local disk.
+
+        Used to hand transfers to the reverse proxy (X-Accel-Redirect).
+        Returns None when the store has no local file for the blob.
+        """
+        return None
+
+
+class FileSystemMediaStore(MediaStore):
+    """
+    Filesystem store sharded by checksum prefix.
+
+    A blob with checksum ``abcdef...`` lives at ``<root>/ab/cd/abcdef...``,
+    which keeps directories small even with hundreds of thousands of files.
+    Writes go to a temporary file in the target directory and are renamed
+    into place, so readers never observe a partially written blob.
+    """
+
+    name = "filesystem"
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    def path(self, checksum: str) -> Path:
+        checksum = checksum.lower()
+        if len(checksum) < 4 or not all(c in "0123456789abcdef" for c in checksum):
+            raise ValueError(f"Invalid checksum: {checksum!r}")
+        return self.root / checksum[:2] / checksum[2:4] / checksum
+
+    def exists(self, checksum: str) -> bool:
+        return self.path(checksum).is_file()
+
+    def open(self, checksum: str) -> BinaryIO:
+        return open(self.path(checksum), "rb")
+
+    def save(self, checksum: str, content: Union[bytes, BinaryIO]) -> None:
+        target = self.path(checksum)
+        if target.is_file():
+            return
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                if isinstance(content, (bytes, bytearray, memoryview)):
+                    out.write(content)
+                else:
+                    while True:
+                        chunk = content.read(COPY_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        out.write(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, target)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def delete(self, checksum: str) -> None:
+        try:
+            self.path(checksum).unlink()
+        except FileNotFoundError:
+            pass
+
+    def size(self, checksum: str) -> int:
+        return self.path(checksum).stat().st_size
+
+    def local_path(self, checksum: str) -> Optional[Path]:
+        return self.path(checksum)
+
+
+@lru_cache(maxsize=1)
+def get_media_store() -> Optional[MediaStore]:
+    """
+    Return the configured media store, or None when blobs live in the DB.
+    """
+    config = getattr(settings, "MEDIA_BLOB_STORE", None) or {}
+    backend = config.get("BACKEND")
+    if not backend:
+        return None
+    store_class = import_string(backend)
+    return store_class(**config.get("OPTIONS", {}))
+
+
+def _blob_lock_key(checksum: str) -> int:
+    # Advisory lock keys are signed 64-bit integers: 60 bits of the checksum
+    return int(checksum[:15], 16)
+
+
+def share_blob(checksum: str, using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Keep the blob of ``checksum`` from being deleted until the current
+    transaction ends.
+
+    ``save`` leaves an existing blob alone, and the Media row that will
+    reference it is not visible to other connections before commit, so
+    writers call this before saving. Takes a shared PostgreSQL advisory
+    lock; a no-op on other databases.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock_shared(%s)", [_blob_lock_key(checksum)])
+
+
+def lock_blob_for_delete(checksum: str, using: str = DEFAULT_DB_ALIAS) -> bool:
+    """
+    Lock the blob of ``checksum`` against writers until the current
+    transaction ends.
+
+    Returns False, without waiting, while an uncommitted writer shares the
+    blob. Writers that start later wait for the lock and then store the
+    blob again if it was deleted. Always True on databases other than
+    PostgreSQL.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [_blob_lock_key(checksum)])
+        return cursor.fetchone()[0]
+
+
+@receiver(setting_changed)
+def _reset_media_store(sender, setting, **kwargs):
+    """Drop the cached store when tests override MEDIA_BLOB_STORE."""
+    if setting == "MEDIA_BLOB_STORE":
+        get_media_store.cache_clear()
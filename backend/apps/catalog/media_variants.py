@@ -0,0 +1,147 @@
+"""
+Precomputed responsive variants for image Media.
+
+After an image is uploaded, a fixed ladder of widths
+(MEDIA_RESPONSIVE_WIDTHS) is rendered in every modern format in
+MEDIA_RESPONSIVE_FORMATS on a small background thread pool. The variants
+are ordinary derivatives (``?w=<width>&fmt=<format>``), stored in the
+derivative cache keyed by content checksum, so generation is idempotent
+per checksum and an evicted variant is simply re-rendered on demand.
+
+Serializers expose the ladder as ``srcset``, a mapping of format to an
+HTML ``srcset`` string, so clients can pick the smallest adequate file:
+
+    {"avif": "/api/v1/media/<id>/file/?w=160&fmt=avif 160w, ...",
+     "webp": "/api/v1/media/<id>/file/?w=160&fmt=webp 160w, ..."}
+
+Backfill existing images with ``manage.py generate_media_variants``.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .media_derivatives import allowed_formats, allowed_widths, get_derivative, media_file_url
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+# Checksums with a generation job queued or running in this process
+_pending = set()
+
+
+def responsive_widths() -> Tuple[int, ...]:
+    widths = getattr(settings, "MEDIA_RESPONSIVE_WIDTHS", (160, 320, 640, 1280))
+    return tuple(w for w in widths if w in allowed_widths())
+
+
+def responsive_formats() -> Tuple[str, ...]:
+    formats = getattr(settings, "MEDIA_RESPONSIVE_FORMATS", ("avif", "webp"))
+    return tuple(f for f in formats if f in allowed_formats())
+
+
+def variant_ladder(source_width: Optional[int]) -> List[Tuple[Optional[int], int]]:
+    """
+    Widths to offer for an image, as ``(requested_width, descriptor)`` pairs.
+
+    Ladder steps at or above the source width are replaced by a single
+    full-size entry (``requested_width`` None), since images are never
+    upscaled. With an unknown source width the full ladder is offered.
+    """
+    widths = responsive_widths()
+    if not source_width:
+        return [(w, w) for w in widths]
+
+    ladder = [(w, w) for w in widths if w < source_width]
+    if len(ladder) < len(widths):
+        ladder.append((None, source_width))
+    return ladder
+
+
+def build_srcset(media_id, kind: str, source_width: Optional[int]) -> Optional[Dict[str, str]]:
+    """``srcset`` strings per format for an image media, or None for other kinds."""
+    if kind != "image" or not media_id:
+        return None
+    ladder = variant_ladder(source_width)
+    if not ladder:
+        return None
+    return {
+        fmt: ", ".join(
+            f"{media_file_url(media_id, width=width, fmt=fmt)} {descriptor}w"
+            for width, descriptor in ladder
+        )
+        for fmt in responsive_formats()
+    }
+
+
+def generate_variants(media) -> int:
+    """
+    Render every missing variant of an image media.
+
+    Returns the number of variants checked; existing ones are reused.
+    """
+    if media.kind != "image":
+        return 0
+
+    count = 0
+    for width, _descriptor in variant_ladder(media.width):
+        for fmt in responsive_formats():
+            get_derivative(media, width, fmt)
+            count += 1
+    return count
+
+
+def _run(media_id, checksum: str) -> None:
+    from .models import Media
+
+    try:
+        media = Media.objects.defer("bytes").filter(id=media_id).first()
+        if media is not None:
+            count = generate_variants(media)
+            logger.debug(f"Generated {count} responsive variants for media {media_id}")
+    except Exception as e:
+        logger.warning(f"Responsive variant generation failed for media {media_id}: {e}")
+    finally:
+        with _executor_lock:
+            _pending.discard(checksum)
+        # Worker threads hold their own DB connection
+        connection.close()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, getattr(settings, "MEDIA_VARIANT_WORKERS", 1)),
+                thread_name_prefix="media-variants",
+            )
+        return _executor
+
+
+def schedule_variants(media) -> None:
+    """
+    Queue background generation of the variants of ``media``.
+
+    Runs after the surrounding transaction commits; a checksum already
+    queued in this process is not queued again.
+    """
+    if media.kind != "image" or not media.checksum_sha256:
+        return
+
+    media_id = media.id
+    checksum = media.checksum_sha256
+
+    def _submit():
+        with _executor_lock:
+            if checksum in _pending:
+                return
+            _pending.add(checksum)
+        _get_executor().submit(_run, media_id, checksum)
+
+    transaction.on_commit(_submit)
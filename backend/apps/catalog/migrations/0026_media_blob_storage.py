@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-16 20:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0025_add_unique_category_media_constraint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='media',
+            name='storage_backend',
+            field=models.CharField(choices=[('database', 'Database (legacy)'), ('filesystem', 'Filesystem blob store')], db_index=True, default='database', help_text='Where the file content is stored', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='media',
+            name='bytes',
+            field=models.BinaryField(blank=True, default=b'', help_text='Legacy binary content (empty once moved to the blob store)'),
+        ),
+    ]
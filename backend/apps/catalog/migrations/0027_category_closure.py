@@ -0,0 +1,48 @@
+# Generated by Django 5.1.15 on 2026-10-16 20:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_closure(apps, schema_editor):
+    Category = apps.get_model("catalog", "Category")
+    CategoryClosure = apps.get_model("catalog", "CategoryClosure")
+
+    parents = dict(Category.objects.values_list("id", "parent_id"))
+    rows = []
+    for category_id in parents:
+        depth = 0
+        current = category_id
+        seen = set()
+        while current is not None and current not in seen:
+            seen.add(current)
+            rows.append(CategoryClosure(ancestor_id=current, descendant_id=category_id, depth=depth))
+            current = parents.get(current)
+            depth += 1
+    CategoryClosure.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0026_media_blob_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField(help_text='Levels between ancestor and descendant (0 = same category)')),
+                ('ancestor', models.ForeignKey(help_text='Ancestor category (or the category itself)', on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='catalog.category')),
+                ('descendant', models.ForeignKey(help_text='Descendant category (or the category itself)', on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='catalog.category')),
+            ],
+            options={
+                'verbose_name': 'category closure',
+                'verbose_name_plural': 'category closure',
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='catalog_cat_descend_324f15_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ancestor', 'descendant'), name='uq_category_closure_pair')],
+            },
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.1.15 on 2026-10-16 21:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Q
+from django.utils import timezone
+
+
+def build_listings(apps, schema_editor):
+    Product = apps.get_model("catalog", "Product")
+    ProductMedia = apps.get_model("catalog", "ProductMedia")
+    ProductListing = apps.get_model("catalog", "ProductListing")
+
+    hero = {}
+    for product_id, media_id in ProductMedia.objects.order_by(
+        "product_id", "-is_primary", "sort_order", "id"
+    ).values_list("product_id", "media_id"):
+        hero.setdefault(product_id, media_id)
+
+    in_stock_filter = Q(variants__stock_qty__isnull=True) | Q(variants__stock_qty__gt=0)
+    products = Product.objects.filter(status="active").annotate(
+        _min_price=Min("variants__list_price"),
+        _max_price=Max("variants__list_price"),
+        _variant_count=Count("variants", distinct=True),
+        _stocked_variants=Count("variants", filter=in_stock_filter, distinct=True),
+    ).values(
+        "id", "category_id", "series_id", "series__category_id", "series__order",
+        "brand_id", "title_tr", "is_featured", "created_at",
+        "_min_price", "_max_price", "_variant_count", "_stocked_variants",
+    )
+    now = timezone.now()
+    ProductListing.objects.bulk_create(
+        [
+            ProductListing(
+                product_id=p["id"],
+                category_id=p["category_id"],
+                series_category_id=p["series__category_id"],
+                series_id=p["series_id"],
+                brand_id=p["brand_id"],
+                hero_media_id=hero.get(p["id"]),
+                min_price=p["_min_price"],
+                max_price=p["_max_price"],
+                in_stock=p["_variant_count"] == 0 or p["_stocked_variants"] > 0,
+                variant_count=p["_variant_count"],
+                title_tr=p["title_tr"],
+                is_featured=p["is_featured"],
+                series_order=p["series__order"] or 0,
+                product_created_at=p["created_at"],
+                updated_at=now,
+            )
+            for p in products
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0027_category_closure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductListing',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='listing', serialize=False, to='catalog.product')),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('max_price', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('in_stock', models.BooleanField(default=True, help_text='Any variant with unlimited or positive stock (or no variants)')),
+                ('variant_count', models.PositiveIntegerField(default=0)),
+                ('title_tr', models.CharField(max_length=200)),
+                ('is_featured', models.BooleanField(default=False)),
+                ('series_order', models.PositiveIntegerField(default=0)),
+                ('product_created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('brand', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.brand')),
+                ('category', models.ForeignKey(blank=True, help_text='Product.category', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.category')),
+                ('hero_media', models.ForeignKey(blank=True, help_text='Primary (or first) product image', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.media')),
+                ('series', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.series')),
+                ('series_category', models.ForeignKey(blank=True, help_text="Category of the product's series", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.category')),
+            ],
+            options={
+                'verbose_name': 'product listing',
+                'verbose_name_plural': 'product listings',
+                'indexes': [models.Index(fields=['category', 'title_tr'], name='catalog_pro_categor_42f026_idx'), models.Index(fields=['series_category', 'title_tr'], name='catalog_pro_series__c246ad_idx'), models.Index(fields=['min_price'], name='catalog_pro_min_pri_bb8fcb_idx'), models.Index(fields=['product_created_at'], name='catalog_pro_product_2cf269_idx')],
+            },
+        ),
+        migrations.RunPython(build_listings, migrations.RunPython.noop),
+    ]
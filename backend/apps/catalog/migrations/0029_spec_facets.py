@@ -0,0 +1,124 @@
+# Generated by Django 5.1.15 on 2026-10-16 21:11
+
+import re
+from decimal import Decimal, InvalidOperation
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Keys that were hard-coded as PLP attribute facets before SpecKey.is_facetable
+LEGACY_FACET_KEYS = [
+    ("power_type", "Güç Tipi"),
+    ("series_type", "Seri"),
+    ("capacity", "Kapasite"),
+    ("width", "Genişlik"),
+    ("depth", "Derinlik"),
+]
+
+NUMBER_RE = re.compile(r"^\s*(-?\d+(?:[.,]\d+)?)")
+
+# Bounds of ProductSpecValue.numeric_value (max_digits=18, decimal_places=4)
+NUMERIC_VALUE_PLACES = Decimal("0.0001")
+NUMERIC_VALUE_LIMIT = Decimal(10) ** 14
+
+
+def _normalize(value_type, raw):
+    if raw is None or isinstance(raw, (dict, list)):
+        return None
+    if isinstance(raw, bool):
+        return ("true" if raw else "false"), None
+    if value_type in ("int", "decimal"):
+        match = NUMBER_RE.match(str(raw))
+        if match:
+            try:
+                number = Decimal(match.group(1).replace(",", "."))
+            except InvalidOperation:
+                number = None
+            if (
+                number is not None
+                and number.is_finite()
+                and abs(number) < NUMERIC_VALUE_LIMIT
+            ):
+                number = number.quantize(NUMERIC_VALUE_PLACES)
+                text = format(number, "f")
+                if "." in text:
+                    text = text.rstrip("0").rstrip(".")
+                return text, number
+    text = str(raw).strip()
+    return (text[:255], None) if text else None
+
+
+def enable_legacy_facets(apps, schema_editor):
+    SpecKey = apps.get_model("catalog", "SpecKey")
+    Variant = apps.get_model("catalog", "Variant")
+    ProductSpecValue = apps.get_model("catalog", "ProductSpecValue")
+
+    slugs = [slug for slug, _ in LEGACY_FACET_KEYS]
+    raw_values = []
+    for product_id, specs in Variant.objects.filter(product__status="active").values_list(
+        "product_id", "specs"
+    ).iterator(chunk_size=2000):
+        if not isinstance(specs, dict):
+            continue
+        for slug in slugs:
+            if specs.get(slug) is not None:
+                raw_values.append((product_id, slug, specs[slug]))
+
+    # The old facets read variant specs directly, so a key may have values
+    # without a SpecKey row. Create those rows; keys without any values
+    # would only give empty facets.
+    spec_keys = {spec_key.slug: spec_key for spec_key in SpecKey.objects.filter(slug__in=slugs)}
+    used = {slug for _, slug, raw in raw_values if _normalize("text", raw) is not None}
+    for order, (slug, label) in enumerate(LEGACY_FACET_KEYS):
+        if slug not in spec_keys and slug in used:
+            spec_keys[slug] = SpecKey.objects.create(slug=slug, label_tr=label, sort_order=order)
+    SpecKey.objects.filter(slug__in=spec_keys).update(is_facetable=True)
+
+    rows = {}
+    for product_id, slug, raw in raw_values:
+        spec_key = spec_keys.get(slug)
+        normalized = _normalize(spec_key.value_type, raw) if spec_key else None
+        if normalized is None:
+            continue
+        value, number = normalized
+        rows[(spec_key.id, value, product_id)] = ProductSpecValue(
+            spec_key_id=spec_key.id, product_id=product_id, value=value, numeric_value=number,
+        )
+    ProductSpecValue.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0028_product_listing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='speckey',
+            name='facet_buckets',
+            field=models.JSONField(blank=True, default=list, help_text='Ascending bucket boundaries for numeric facets, e.g. [600, 900] gives < 600, 600 – 900 and ≥ 900. Empty: one option per value.'),
+        ),
+        migrations.AddField(
+            model_name='speckey',
+            name='is_facetable',
+            field=models.BooleanField(default=False, help_text='Offer this spec as a PLP attribute facet'),
+        ),
+        migrations.CreateModel(
+            name='ProductSpecValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.CharField(help_text='Normalized value as shown in facets', max_length=255)),
+                ('numeric_value', models.DecimalField(blank=True, decimal_places=4, help_text='Parsed number for numeric spec keys', max_digits=18, null=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spec_values', to='catalog.product')),
+                ('spec_key', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_values', to='catalog.speckey')),
+            ],
+            options={
+                'verbose_name': 'product spec value',
+                'verbose_name_plural': 'product spec values',
+                'indexes': [models.Index(fields=['spec_key', 'numeric_value'], name='catalog_pro_spec_ke_cd5606_idx')],
+                'constraints': [models.UniqueConstraint(fields=('spec_key', 'value', 'product'), name='uq_product_spec_value')],
+            },
+        ),
+        migrations.RunPython(enable_legacy_facets, migrations.RunPython.noop),
+    ]
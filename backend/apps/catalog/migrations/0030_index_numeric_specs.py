@@ -0,0 +1,69 @@
+# Generated by Django 5.1.15 on 2026-10-16 22:40
+
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations
+
+NUMBER_RE = re.compile(r"^\s*(-?\d+(?:[.,]\d+)?)")
+
+
+def _normalize(raw):
+    if raw is None or isinstance(raw, (bool, dict, list)):
+        return None
+    match = NUMBER_RE.match(str(raw))
+    if match:
+        try:
+            number = Decimal(match.group(1).replace(",", "."))
+        except InvalidOperation:
+            number = None
+        if number is not None and number.is_finite():
+            text = format(number, "f")
+            if "." in text:
+                text = text.rstrip("0").rstrip(".")
+            return text, number
+    text = str(raw).strip()
+    return (text[:255], None) if text else None
+
+
+def index_numeric_specs(apps, schema_editor):
+    """Index numeric spec keys that are not facetable (those are indexed already)."""
+    SpecKey = apps.get_model("catalog", "SpecKey")
+    Variant = apps.get_model("catalog", "Variant")
+    ProductSpecValue = apps.get_model("catalog", "ProductSpecValue")
+
+    spec_keys = list(SpecKey.objects.filter(value_type__in=["int", "decimal"], is_facetable=False))
+    if not spec_keys:
+        return
+
+    rows = {}
+    for product_id, specs in Variant.objects.filter(product__status="active").values_list(
+        "product_id", "specs"
+    ).iterator(chunk_size=2000):
+        if not isinstance(specs, dict):
+            continue
+        for spec_key in spec_keys:
+            normalized = _normalize(specs.get(spec_key.slug))
+            if normalized is None:
+                continue
+            value, number = normalized
+            rows[(spec_key.id, value, product_id)] = ProductSpecValue(
+                spec_key_id=spec_key.id, product_id=product_id, value=value, numeric_value=number,
+            )
+    ProductSpecValue.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+def unindex_numeric_specs(apps, schema_editor):
+    ProductSpecValue = apps.get_model("catalog", "ProductSpecValue")
+    ProductSpecValue.objects.filter(spec_key__is_facetable=False).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0029_spec_facets'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_numeric_specs, unindex_numeric_specs),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.15 on 2026-10-16 21:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0030_index_numeric_specs'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='productlisting',
+            name='catalog_pro_min_pri_bb8fcb_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='productlisting',
+            name='catalog_pro_product_2cf269_idx',
+        ),
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(fields=['title_tr', 'product'], name='catalog_pro_title_t_b2579d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(fields=['min_price', 'product'], name='catalog_pro_min_pri_857778_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(fields=['product_created_at', 'product'], name='catalog_pro_product_a4bde1_idx'),
+        ),
+    ]
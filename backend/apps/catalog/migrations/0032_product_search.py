@@ -0,0 +1,77 @@
+# Generated by Django 5.1.15 on 2026-10-16 21:23
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+from apps.common.canonical import canonical_text
+
+
+def build_search_documents(apps, schema_editor):
+    Product = apps.get_model("catalog", "Product")
+    ProductListing = apps.get_model("catalog", "ProductListing")
+    Variant = apps.get_model("catalog", "Variant")
+
+    variant_parts = {}
+    for product_id, *values in Variant.objects.filter(product__listing__isnull=False).values_list(
+        "product_id", "model_code", "sku", "name_tr", "name_en"
+    ).iterator(chunk_size=2000):
+        variant_parts.setdefault(product_id, []).extend(values)
+
+    rows = []
+    for product in Product.objects.filter(listing__isnull=False).values(
+        "id", "title_tr", "title_en", "name",
+        "series__name", "series__category__name", "category__name",
+    ).iterator(chunk_size=2000):
+        parts = [
+            product["title_tr"], product["title_en"], product["name"],
+            *variant_parts.get(product["id"], []),
+            product["series__name"], product["series__category__name"], product["category__name"],
+        ]
+        rows.append(ProductListing(
+            product_id=product["id"],
+            search_text=canonical_text(" ".join(part for part in parts if part)),
+        ))
+    ProductListing.objects.bulk_update(rows, ["search_text"], batch_size=1000)
+
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE catalog_productlisting SET search_vector = to_tsvector('simple', search_text);"
+            )
+
+
+def add_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_listing_search_vector ON catalog_productlisting USING GIN (search_vector);")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_listing_search_text_trgm ON catalog_productlisting USING GIN (search_text gin_trgm_ops);")
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("DROP INDEX IF EXISTS idx_listing_search_text_trgm;")
+            cursor.execute("DROP INDEX IF EXISTS idx_listing_search_vector;")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0031_listing_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productlisting',
+            name='search_text',
+            field=models.TextField(blank=True, default='', help_text='Canonical title, name, variant codes/SKUs and series/category names'),
+        ),
+        migrations.AddField(
+            model_name='productlisting',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, help_text='tsvector of search_text (PostgreSQL only)', null=True),
+        ),
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(add_search_indexes, remove_search_indexes),
+    ]
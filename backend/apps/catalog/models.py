@@ -3,21 +3,25 @@ Catalog models for Gastrotech B2B product catalog.
 
 This module implements the complete catalog domain:
 - Category: Top-level product categories
+- CategoryClosure: Ancestor/descendant pairs of the Category tree
 - Series: Product series/lines within categories (600/700/900/etc.)
 - TaxonomyNode: Hierarchical classification within series
 - Product: Catalog group (contains multiple model lines)
 - Variant: Individual model line within a product group
 - SpecKey: Specification keys for consistent labeling
-- Media: Binary media storage in PostgreSQL
+- Media: Media metadata with content in the blob store (legacy: PostgreSQL)
 - ProductMedia: Product-media associations
+- ProductListing: Denormalized listing rows of active products
+- ProductSpecValue: Indexed facet spec values of active products
 """
 
 import hashlib
 import uuid
 from decimal import Decimal
 
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, router, transaction
 
 from apps.common.models import TimeStampedUUIDModel
 from apps.common.slugify_tr import slugify_tr
@@ -25,9 +29,12 @@ from apps.common.slugify_tr import slugify_tr
 
 class Media(TimeStampedUUIDModel):
     """
-    Media storage model - stores binary data directly in PostgreSQL.
-    
-    Supports images, PDFs, and videos with metadata.
+    Media metadata with content held in the configured blob store.
+
+    Supports images, PDFs, and videos with metadata. Content is stored in a
+    content-addressed blob store keyed by ``checksum_sha256`` (see
+    ``apps.catalog.media_storage``). The ``bytes`` column is a legacy
+    fallback for rows that have not been migrated out of the database.
     """
     
     class Kind(models.TextChoices):
@@ -35,6 +42,10 @@ class Media(TimeStampedUUIDModel):
         PDF = "pdf", "PDF"
         VIDEO = "video", "Video"
         FILE = "file", "File"  # For CSV, Excel, and other data files
+
+    class StorageBackend(models.TextChoices):
+        DATABASE = "database", "Database (legacy)"
+        FILESYSTEM = "filesystem", "Filesystem blob store"
     
     kind = models.CharField(
         max_length=10,
@@ -52,7 +63,16 @@ class Media(TimeStampedUUIDModel):
         help_text="MIME type (e.g., image/jpeg)",
     )
     bytes = models.BinaryField(
-        help_text="Binary content stored in database",
+        blank=True,
+        default=b"",
+        help_text="Legacy binary content (empty once moved to the blob store)",
+    )
+    storage_backend = models.CharField(
+        max_length=20,
+        choices=StorageBackend.choices,
+        default=StorageBackend.DATABASE,
+        db_index=True,
+        help_text="Where the file content is stored",
     )
     size_bytes = models.PositiveIntegerField(
         help_text="File size in bytes",
@@ -86,17 +106,189 @@ class Media(TimeStampedUUIDModel):
         return f"{self.filename} ({self.kind})"
     
     def save(self, *args, **kwargs):
-        """Compute checksum and size before saving."""
-        if self.bytes:
-            self.size_bytes = len(self.bytes)
-            self.checksum_sha256 = self.compute_sha256(self.bytes)
-        super().save(*args, **kwargs)
+        """
+        Compute checksum and size, and write new content to the blob store.
+
+        When a blob store is configured, the content is written there and the
+        ``bytes`` column is persisted empty. The in-memory value is left
+        untouched so callers holding the instance can keep using it.
+        """
+        from .media_storage import get_media_store, share_blob
+
+        content = None
+        if "bytes" not in self.get_deferred_fields() and self.bytes:
+            content = bytes(self.bytes)
+            self.size_bytes = len(content)
+            self.checksum_sha256 = self.compute_sha256(content)
+
+        store = get_media_store()
+        if content is None or store is None:
+            if content is not None:
+                self.storage_backend = self.StorageBackend.DATABASE
+            super().save(*args, **kwargs)
+            return
+
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            # Until the row commits, the blob must not be deleted as an orphan
+            share_blob(self.checksum_sha256, using)
+            store.save(self.checksum_sha256, content)
+            self.storage_backend = store.name
+            self.bytes = b""
+            try:
+                super().save(*args, **kwargs)
+            finally:
+                self.bytes = content
+
+    @property
+    def is_in_blob_store(self) -> bool:
+        """Whether the content lives in the blob store rather than the DB."""
+        return self.storage_backend != self.StorageBackend.DATABASE
+
+    def open_content(self):
+        """
+        Open the file content for binary reading.
+
+        Reads from the blob store, falling back to the legacy ``bytes``
+        column for rows that have not been migrated.
+        """
+        import io
+
+        from .media_storage import get_media_store
+
+        store = get_media_store()
+        if store is not None and self.is_in_blob_store:
+            try:
+                return store.open(self.checksum_sha256)
+            except FileNotFoundError:
+                pass
+
+        if "bytes" in self.get_deferred_fields():
+            legacy = (
+                Media.objects.filter(pk=self.pk).values_list("bytes", flat=True).first()
+            )
+        else:
+            legacy = self.bytes
+        return io.BytesIO(bytes(legacy or b""))
+
+    def local_path(self):
+        """
+        Path of the blob on local disk, or None for DB-backed content.
+
+        Lets the web server send the file directly (see media_delivery).
+        """
+        from .media_storage import get_media_store
+
+        store = get_media_store()
+        if store is None or not self.is_in_blob_store or not self.checksum_sha256:
+            return None
+        return store.local_path(self.checksum_sha256)
+
+    def has_content(self) -> bool:
+        """Whether the content is actually available in the store or DB."""
+        from .media_storage import get_media_store
+
+        store = get_media_store()
+        if store is not None and self.is_in_blob_store and store.exists(self.checksum_sha256):
+            return True
+        return Media.objects.filter(pk=self.pk).exclude(bytes=b"").exists()
+
+    def read_bytes(self) -> bytes:
+        """Return the full file content."""
+        with self.open_content() as fh:
+            return fh.read()
     
     @staticmethod
     def compute_sha256(data: bytes) -> str:
         """Compute SHA-256 hash of binary data."""
         return hashlib.sha256(data).hexdigest()
 
+    @classmethod
+    def get_or_create_by_content(cls, content: bytes, **fields):
+        """
+        Return an existing Media with identical content, or create one.
+
+        Uploads and imports use this so the same file is stored once.
+        ``fields`` (kind, filename, content_type, width, height) only apply
+        when a new row is created.
+
+        Returns:
+            Tuple of (media, created)
+        """
+        checksum = cls.compute_sha256(content)
+        existing = cls._first_with_checksum(checksum)
+        if existing is not None:
+            if not existing.has_content():
+                # Metadata-only row (e.g. imported without bytes): repair it
+                existing.bytes = content
+                existing.save()
+            return existing, False
+
+        fields.pop("bytes", None)
+        fields.pop("checksum_sha256", None)
+        fields.pop("size_bytes", None)
+        media = cls.objects.create(bytes=content, **fields)
+        return media, True
+
+    @classmethod
+    def get_or_create_by_file(cls, fh, checksum: str, size: int, **fields):
+        """
+        Like get_or_create_by_content for content already spooled to a file.
+
+        ``checksum`` and ``size`` come from hashing the file while it was
+        received (see media_ingest). The file is copied to the blob store in
+        chunks, so it is never held in memory. Without a blob store the
+        content has to go into the DB column and is read in full.
+
+        Returns:
+            Tuple of (media, created)
+        """
+        from .media_storage import get_media_store, share_blob
+
+        store = get_media_store()
+        if store is None:
+            fh.seek(0)
+            return cls.get_or_create_by_content(fh.read(), **fields)
+
+        existing = cls._first_with_checksum(checksum)
+        if existing is not None and existing.has_content():
+            return existing, False
+
+        using = router.db_for_write(cls)
+        with transaction.atomic(using=using):
+            share_blob(checksum, using)
+            fh.seek(0)
+            store.save(checksum, fh)
+            if store.size(checksum) != size:
+                raise IOError(f"Stored blob {checksum} does not match the uploaded size")
+
+            if existing is not None:
+                # Metadata-only row (e.g. imported without bytes): repair it
+                existing.storage_backend = store.name
+                existing.size_bytes = size
+                existing.save(update_fields=["storage_backend", "size_bytes", "updated_at"])
+                return existing, False
+
+            for name in ("bytes", "checksum_sha256", "size_bytes", "storage_backend"):
+                fields.pop(name, None)
+            media = cls.objects.create(
+                checksum_sha256=checksum,
+                size_bytes=size,
+                storage_backend=store.name,
+                **fields,
+            )
+        return media, True
+
+    @classmethod
+    def _first_with_checksum(cls, checksum: str):
+        """Oldest Media row with the given checksum (content deferred)."""
+        return (
+            cls.objects.defer("bytes")
+            .filter(checksum_sha256=checksum)
+            .order_by("created_at")
+            .first()
+        )
+
 
 class SpecKey(TimeStampedUUIDModel):
     """
@@ -150,6 +342,18 @@ class SpecKey(TimeStampedUUIDModel):
         related_name="spec_key_icons",
         help_text="Optional icon for UI display",
     )
+    is_facetable = models.BooleanField(
+        default=False,
+        help_text="Offer this spec as a PLP attribute facet",
+    )
+    facet_buckets = models.JSONField(
+        default=list,
+        blank=True,
+        help_text=(
+            "Ascending bucket boundaries for numeric facets, e.g. [600, 900] "
+            "gives < 600, 600 – 900 and ≥ 900. Empty: one option per value."
+        ),
+    )
     
     class Meta:
         verbose_name = "spec key"
@@ -160,6 +364,10 @@ class SpecKey(TimeStampedUUIDModel):
         unit_str = f" ({self.unit})" if self.unit else ""
         return f"{self.label_tr}{unit_str}"
 
+    @property
+    def is_numeric(self) -> bool:
+        return self.value_type in (self.ValueType.INT, self.ValueType.DECIMAL)
+
 
 class Category(TimeStampedUUIDModel):
     """
@@ -262,9 +470,27 @@ class Category(TimeStampedUUIDModel):
         return self.name
 
     def save(self, *args, **kwargs):
+        """Save and keep the CategoryClosure table in sync with ``parent``."""
         if not self.slug:
             self.slug = slugify_tr(self.name)
-        super().save(*args, **kwargs)
+
+        adding = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        parent_may_change = not adding and (
+            update_fields is None or "parent" in update_fields or "parent_id" in update_fields
+        )
+        old_parent_id = None
+        if parent_may_change:
+            old_parent_id = (
+                Category.objects.filter(pk=self.pk).values_list("parent_id", flat=True).first()
+            )
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                CategoryClosure.insert_node(self)
+            elif parent_may_change and old_parent_id != self.parent_id:
+                CategoryClosure.move_subtree(self)
 
     def clean(self):
         """Validate category hierarchy to prevent circular references and enforce depth limit."""
@@ -312,35 +538,49 @@ class Category(TimeStampedUUIDModel):
     @property
     def depth(self) -> int:
         """Return depth in tree (0 = root, 1 = subcategory, etc.)."""
-        depth = 0
-        current = self.parent
-        while current:
-            depth += 1
-            current = current.parent
-        return depth
+        # Querysets annotated with tree_depth (see with_tree_depth) skip the query
+        if hasattr(self, "tree_depth"):
+            return self.tree_depth
+        return max(CategoryClosure.objects.filter(descendant_id=self.id).count() - 1, 0)
 
     @property
     def breadcrumbs(self) -> list:
         """Return list of ancestor categories including self (root → ... → self)."""
-        crumbs = [self]
-        current = self.parent
-        while current:
-            crumbs.insert(0, current)
-            current = current.parent
-        return crumbs
+        ancestors = list(
+            Category.objects.filter(descendant_links__descendant_id=self.id)
+            .exclude(id=self.id)
+            .order_by("-descendant_links__depth")
+        )
+        return ancestors + [self]
 
     @property
     def breadcrumb_path(self) -> str:
         """Return breadcrumb path as string (e.g., 'Fırınlar > Pizza Fırını')."""
         return " > ".join(c.name for c in self.breadcrumbs)
 
+    @classmethod
+    def with_tree_depth(cls, queryset=None):
+        """Annotate ``tree_depth`` so ``depth`` needs no extra query per row."""
+        queryset = cls.objects.all() if queryset is None else queryset
+        return queryset.annotate(tree_depth=models.Max("ancestor_links__depth"))
+
+    @staticmethod
+    def subtree_ids(category_ids) -> set:
+        """IDs of the given categories and all their descendants (one query)."""
+        return set(
+            CategoryClosure.objects.filter(ancestor_id__in=list(category_ids))
+            .values_list("descendant_id", flat=True)
+        )
+
     def get_descendants(self, include_self=False):
-        """Get all descendant categories recursively."""
-        descendants = [self] if include_self else []
-        for child in self.children.all():
-            descendants.append(child)
-            descendants.extend(child.get_descendants(include_self=False))
-        return descendants
+        """Get all descendant categories, shallowest first."""
+        min_depth = 0 if include_self else 1
+        return list(
+            Category.objects.filter(
+                ancestor_links__ancestor_id=self.id,
+                ancestor_links__depth__gte=min_depth,
+            ).order_by("ancestor_links__depth", "order", "name")
+        )
 
     def get_leaf_categories(self):
         """Get all leaf (childless) categories under this category."""
@@ -352,6 +592,117 @@ class Category(TimeStampedUUIDModel):
         return leaves
 
 
+class CategoryClosure(models.Model):
+    """
+    Closure table of the Category tree.
+
+    Holds one row per (ancestor, descendant) pair, including each category
+    paired with itself at depth 0, so subtrees, ancestors and depths are a
+    single indexed lookup. Kept in sync by Category.save (new categories and
+    reparenting); deletes cascade. Rebuild with
+    ``manage.py rebuild_category_closure`` after bulk updates of ``parent``.
+    """
+
+    ancestor = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name="descendant_links",
+        help_text="Ancestor category (or the category itself)",
+    )
+    descendant = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name="ancestor_links",
+        help_text="Descendant category (or the category itself)",
+    )
+    depth = models.PositiveSmallIntegerField(
+        help_text="Levels between ancestor and descendant (0 = same category)",
+    )
+
+    class Meta:
+        verbose_name = "category closure"
+        verbose_name_plural = "category closure"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ancestor", "descendant"],
+                name="uq_category_closure_pair",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["descendant", "depth"]),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} > {self.descendant_id} ({self.depth})"
+
+    @classmethod
+    def insert_node(cls, category):
+        """Add the rows of a new (childless) category."""
+        rows = [cls(ancestor_id=category.id, descendant_id=category.id, depth=0)]
+        if category.parent_id:
+            rows.extend(
+                cls(ancestor_id=ancestor_id, descendant_id=category.id, depth=depth + 1)
+                for ancestor_id, depth in cls.objects.filter(
+                    descendant_id=category.parent_id
+                ).values_list("ancestor_id", "depth")
+            )
+        cls.objects.bulk_create(rows, ignore_conflicts=True)
+
+    @classmethod
+    def move_subtree(cls, category):
+        """Re-link the subtree of ``category`` under its new parent."""
+        subtree = list(
+            cls.objects.filter(ancestor_id=category.id).values_list("descendant_id", "depth")
+        )
+        if not subtree:
+            # Category predates the closure table
+            cls.rebuild()
+            return
+
+        subtree_ids = [descendant_id for descendant_id, _ in subtree]
+        cls.objects.filter(descendant_id__in=subtree_ids).exclude(
+            ancestor_id__in=subtree_ids
+        ).delete()
+
+        if category.parent_id:
+            ancestors = list(
+                cls.objects.filter(descendant_id=category.parent_id).values_list(
+                    "ancestor_id", "depth"
+                )
+            )
+            cls.objects.bulk_create(
+                [
+                    cls(
+                        ancestor_id=ancestor_id,
+                        descendant_id=descendant_id,
+                        depth=ancestor_depth + descendant_depth + 1,
+                    )
+                    for ancestor_id, ancestor_depth in ancestors
+                    for descendant_id, descendant_depth in subtree
+                ]
+            )
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """Recompute the whole table from Category.parent. Returns the row count."""
+        parents = dict(Category.objects.values_list("id", "parent_id"))
+        rows = []
+        for category_id in parents:
+            depth = 0
+            current = category_id
+            seen = set()
+            while current is not None and current not in seen:
+                seen.add(current)
+                rows.append(cls(ancestor_id=current, descendant_id=category_id, depth=depth))
+                current = parents.get(current)
+                depth += 1
+
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+
 class BrandCategory(models.Model):
     """
     Through model for Brand-Category M2M relationship.
@@ -1274,6 +1625,163 @@ class ProductMedia(models.Model):
             super().save(*args, **kwargs)
 
 
+class ProductListing(models.Model):
+    """
+    Denormalized listing row for an active product (read model).
+
+    Holds everything product listings filter and sort on (category
+    membership, brand, series, price range, stock, hero image, variant
+    count, sort keys, search document), so listing queries need no variant
+    joins or aggregation. Rows exist only for active products and are maintained
+    by apps.catalog.listing from Product/Variant/ProductMedia/Series
+    changes. Rebuild with ``manage.py rebuild_product_listing``.
+    """
+
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="listing",
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="Product.category",
+    )
+    series_category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="Category of the product's series",
+    )
+    series = models.ForeignKey(
+        Series,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    brand = models.ForeignKey(
+        "Brand",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    hero_media = models.ForeignKey(
+        Media,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="Primary (or first) product image",
+    )
+    min_price = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True,
+    )
+    max_price = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True,
+    )
+    in_stock = models.BooleanField(
+        default=True,
+        help_text="Any variant with unlimited or positive stock (or no variants)",
+    )
+    variant_count = models.PositiveIntegerField(default=0)
+    # Sort keys
+    title_tr = models.CharField(max_length=200)
+    is_featured = models.BooleanField(default=False)
+    series_order = models.PositiveIntegerField(default=0)
+    product_created_at = models.DateTimeField()
+    # Search document (see apps.catalog.search)
+    search_text = models.TextField(
+        blank=True,
+        default="",
+        help_text="Canonical title, name, variant codes/SKUs and series/category names",
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="tsvector of search_text (PostgreSQL only)",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "product listing"
+        verbose_name_plural = "product listings"
+        # Sort keys are indexed with the product as keyset tie-breaker
+        indexes = [
+            models.Index(fields=["category", "title_tr"]),
+            models.Index(fields=["series_category", "title_tr"]),
+            models.Index(fields=["title_tr", "product"]),
+            models.Index(fields=["min_price", "product"]),
+            models.Index(fields=["product_created_at", "product"]),
+        ]
+
+    def __str__(self):
+        return f"Listing: {self.title_tr}"
+
+
+class ProductSpecValue(models.Model):
+    """
+    Normalized spec value of an active product, indexed for PLP facets.
+
+    One row per (spec key, value, product) for facetable and numeric spec
+    keys, taken from the product's variant specs. Numeric spec keys also
+    store the parsed number for bucket and range filters. Maintained together with
+    ProductListing (see apps.catalog.spec_index).
+    """
+
+    spec_key = models.ForeignKey(
+        SpecKey,
+        on_delete=models.CASCADE,
+        related_name="product_values",
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="spec_values",
+    )
+    value = models.CharField(
+        max_length=255,
+        help_text="Normalized value as shown in facets",
+    )
+    numeric_value = models.DecimalField(
+        max_digits=18,
+        decimal_places=4,
+        null=True,
+        blank=True,
+        help_text="Parsed number for numeric spec keys",
+    )
+
+    class Meta:
+        verbose_name = "product spec value"
+        verbose_name_plural = "product spec values"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["spec_key", "value", "product"],
+                name="uq_product_spec_value",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["spec_key", "numeric_value"]),
+        ]
+
+    def __str__(self):
+        return f"{self.spec_key_id}={self.value} ({self.product_id})"
+
+
 class CatalogAsset(TimeStampedUUIDModel):
     """
     Downloadable catalog assets (PDF catalogs, brochures).
@@ -2,6 +2,14 @@
 Custom pagination classes for Gastrotech catalog APIs.
 """
 
+import base64
+import json
+import math
+import uuid
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import F, Q
 from rest_framework.pagination import CursorPagination
 
 
@@ -9,7 +17,8 @@ class ProductCursorPagination(CursorPagination):
     """
     Cursor-based pagination for product lists.
     
-    Uses created_at for efficient cursor pagination.
+    Uses created_at for efficient cursor pagination, or the search rank
+    first for searched (``search_rank`` annotated) querysets.
     Default page size: 24, max: 100.
     """
     
@@ -19,6 +28,12 @@ class ProductCursorPagination(CursorPagination):
     ordering = "-created_at"
     cursor_query_param = "cursor"
     
+    def get_ordering(self, request, queryset, view):
+        """Order search results by relevance."""
+        if "search_rank" in queryset.query.annotations:
+            return ("-search_rank", "-created_at")
+        return super().get_ordering(request, queryset, view)
+
     def get_page_size(self, request):
         """Get page size with validation."""
         if self.page_size_query_param:
@@ -31,3 +46,87 @@ class ProductCursorPagination(CursorPagination):
             except (ValueError, TypeError):
                 pass
         return self.page_size
+
+
+# =============================================================================
+# Keyset cursors (PLP)
+# =============================================================================
+
+
+class InvalidCursor(ValueError):
+    """Cursor that cannot be decoded or was issued for another sort order."""
+
+
+def keyset_ordering(sort_field: str) -> list:
+    """
+    Ordering for keyset pagination on ``sort_field`` ("-field" for
+    descending): NULLs last, then the primary key as a unique tie-breaker.
+    """
+    name = sort_field.lstrip("-")
+    if sort_field.startswith("-"):
+        return [F(name).desc(nulls_last=True), "pk"]
+    return [F(name).asc(nulls_last=True), "pk"]
+
+
+def encode_keyset_cursor(sort_key: str, value, pk) -> str:
+    """Opaque cursor pointing after the row with sort ``value`` and ``pk``."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif value is not None:
+        value = str(value)
+    payload = json.dumps({"s": sort_key, "v": value, "k": str(pk)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def _parse_keyset_value(value: str, value_type: type):
+    if value_type is datetime:
+        parsed = datetime.fromisoformat(value)
+        # Cursors are issued from aware datetimes
+        if parsed.tzinfo is None:
+            raise ValueError(value)
+        return parsed
+    parsed = value_type(value)
+    # Decimal and float accept "NaN" and "Infinity"
+    if value_type in (Decimal, float) and not math.isfinite(parsed):
+        raise ValueError(value)
+    return parsed
+
+
+def decode_keyset_cursor(cursor: str, sort_key: str, value_type: type = str) -> tuple:
+    """
+    Return the (value, pk) a cursor points after; raises InvalidCursor.
+
+    ``value`` is parsed as ``value_type`` (the sort field's type: str,
+    Decimal, float or datetime) and ``pk`` as a UUID, so tampered cursors
+    never reach the database.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        value, pk = payload["v"], payload["k"]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Malformed cursor")
+    if payload.get("s") != sort_key:
+        raise InvalidCursor("Cursor was issued for another sort order")
+    if not isinstance(pk, str) or not (value is None or isinstance(value, str)):
+        raise InvalidCursor("Malformed cursor")
+    try:
+        pk = uuid.UUID(pk)
+        if value is not None:
+            value = _parse_keyset_value(value, value_type)
+    except (ValueError, TypeError, InvalidOperation):
+        raise InvalidCursor("Malformed cursor")
+    return value, pk
+
+
+def keyset_after(queryset, sort_field: str, value, pk):
+    """Rows after (``value``, ``pk``) in ``keyset_ordering(sort_field)``."""
+    name = sort_field.lstrip("-")
+    if value is None:
+        # NULLs sort last: only the remaining NULL rows follow
+        return queryset.filter(**{f"{name}__isnull": True, "pk__gt": pk})
+    beyond = "lt" if sort_field.startswith("-") else "gt"
+    return queryset.filter(
+        Q(**{f"{name}__{beyond}": value})
+        | Q(**{name: value, "pk__gt": pk})
+        | Q(**{f"{name}__isnull": True})
+    )
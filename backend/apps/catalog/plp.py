@@ -2,22 +2,49 @@
 Product Listing Page (PLP) API views for Gastrotech catalog.
 
 Provides faceted filtering, sorting, and pagination for category-based
-product browsing with real-time filter counts.
+product browsing with real-time filter counts. Products are read from the
+ProductListing read model (see listing.py); responses are cached per
+canonical query and invalidated by category/brand tags (see plp_cache.py).
 """
 
-from collections import defaultdict
+import json
+from datetime import datetime
 from decimal import Decimal
-from typing import Any
 
-from django.db.models import Count, Max, Min, Q, Prefetch, Case, When, Value, BooleanField, F
-from django.db.models.functions import Coalesce
+from django.db import connection
+from django.db.models import Q
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Brand, Category, CategoryCatalog, Product, ProductMedia, Variant
+from .catalog_snapshot import get_catalog_snapshot
+from .media_derivatives import card_image_url
+from .media_variants import build_srcset
+from .models import Category, CategoryCatalog, ProductListing, Variant
+from .pagination import (
+    InvalidCursor,
+    decode_keyset_cursor,
+    encode_keyset_cursor,
+    keyset_after,
+    keyset_ordering,
+)
+from .plp_cache import (
+    brand_tag,
+    category_tag,
+    get_cached_plp,
+    plp_tag_versions,
+    set_cached_plp,
+)
+from .plp_facets import PLPFacets
+from .search import normalize_search, search_listings
+from .spec_index import (
+    format_spec_number,
+    parse_bucket_value,
+    spec_filter_product_ids,
+    spec_range_product_ids,
+)
 from .serializers import CategoryCatalogSerializer
 from apps.common.utils import get_catalog_mode
 
@@ -29,24 +56,35 @@ from apps.common.utils import get_catalog_mode
 MAX_PAGE_SIZE = 100
 DEFAULT_PAGE_SIZE = 24
 
-# Known attribute keys that should appear as facets
-# These correspond to common keys in Variant.specs JSON
-FACET_ATTRIBUTE_KEYS = [
-    ("power_type", "Güç Tipi"),
-    ("series_type", "Seri"),
-    ("capacity", "Kapasite"),
-    ("width", "Genişlik"),
-    ("depth", "Derinlik"),
-]
-
 SORT_OPTIONS = {
     "name_asc": ("title_tr", "İsim (A-Z)"),
     "name_desc": ("-title_tr", "İsim (Z-A)"),
-    "price_asc": ("_min_price", "Fiyat (Artan)"),
-    "price_desc": ("-_min_price", "Fiyat (Azalan)"),
-    "newest": ("-created_at", "En Yeni"),
+    "price_asc": ("min_price", "Fiyat (Artan)"),
+    "price_desc": ("-min_price", "Fiyat (Azalan)"),
+    "newest": ("-product_created_at", "En Yeni"),
 }
 
+# Default sort of searched listings (only offered with ``search``)
+RELEVANCE_SORT = "relevance"
+RELEVANCE_OPTION = ("-search_rank", "Alaka Düzeyi")
+
+# Type of each sort field's values, for decoding keyset cursors
+SORT_VALUE_TYPES = {
+    "title_tr": str,
+    "min_price": Decimal,
+    "product_created_at": datetime,
+    "search_rank": float,
+}
+
+# Columns needed to render a product card from a ProductListing row
+LISTING_CARD_FIELDS = (
+    "product", "min_price", "max_price", "in_stock",
+    "product__id", "product__slug", "product__name", "product__title_tr",
+    "product__short_specs",
+    "brand__id", "brand__name", "brand__slug",
+    "hero_media__id", "hero_media__kind", "hero_media__width",
+)
+
 
 # =============================================================================
 # Helper Functions
@@ -55,10 +93,9 @@ SORT_OPTIONS = {
 def get_category_subtree_ids(category: Category) -> list:
     """
     Get all category IDs in the subtree (including the category itself).
-    Uses the Category.get_descendants() method for recursive traversal.
+    Resolved from the worker's catalog snapshot.
     """
-    descendants = category.get_descendants(include_self=True)
-    return [cat.id for cat in descendants]
+    return list(get_catalog_snapshot().subtree_ids([category.id]))
 
 
 def parse_comma_list(value: str | None) -> list[str]:
@@ -95,6 +132,86 @@ def parse_int(value: str | None, default: int = 1) -> int:
         return default
 
 
+def parse_attrs(value: str | None) -> list[tuple[str, str]]:
+    """Parse attrs=key:value,key2:value2 into sorted unique (key, value) pairs."""
+    pairs = set()
+    for pair in parse_comma_list(value):
+        if ":" in pair:
+            key, val = pair.split(":", 1)
+            key, val = key.strip(), val.strip()
+            if key and val:
+                pairs.add((key, val))
+    return sorted(pairs)
+
+
+def parse_ranges(value: str | None) -> list[tuple[str, str, str]]:
+    """
+    Parse range=key:low..high,key2:..900 into sorted (key, low, high) tuples.
+
+    Bounds are canonical number strings ("" for an open side); malformed
+    ranges are ignored and a repeated key keeps its last range.
+    """
+    ranges = {}
+    for pair in parse_comma_list(value):
+        if ":" not in pair:
+            continue
+        key, bounds = pair.split(":", 1)
+        key = key.strip()
+        parsed = parse_bucket_value(bounds.strip())
+        if not key or parsed is None:
+            continue
+        low, high = parsed
+        ranges[key] = (
+            format_spec_number(low) if low is not None else "",
+            format_spec_number(high) if high is not None else "",
+        )
+    return sorted((key, low, high) for key, (low, high) in ranges.items())
+
+
+def canonical_plp_params(query_params, catalog_mode: bool) -> dict:
+    """
+    Normalize PLP query parameters; also the response cache key.
+
+    Comma lists are de-duplicated and sorted and missing or unknown values
+    fall back to their defaults, so equivalent URLs share one cache entry.
+    A ``cursor`` parameter (empty for the first page) selects keyset
+    pagination; ``page`` is then ignored. ``search`` is kept in its
+    canonical form and makes relevance the default sort.
+    """
+    category = query_params.get("category")
+    if catalog_mode:
+        # Catalog listings ignore all product filters
+        return {"category": category, "catalog_mode": True}
+
+    price_min = parse_decimal(query_params.get("price_min"))
+    price_max = parse_decimal(query_params.get("price_max"))
+    search = normalize_search(query_params.get("search"))
+    default_sort = RELEVANCE_SORT if search else "name_asc"
+    sort_key = query_params.get("sort", default_sort)
+    if sort_key not in SORT_OPTIONS and not (search and sort_key == RELEVANCE_SORT):
+        sort_key = default_sort
+    cursor = query_params.get("cursor")
+    return {
+        "category": category,
+        "catalog_mode": False,
+        "brands": sorted(set(parse_comma_list(query_params.get("brands")))),
+        "series": sorted(set(parse_comma_list(query_params.get("series")))),
+        "attrs": parse_attrs(query_params.get("attrs")),
+        "ranges": parse_ranges(query_params.get("range")),
+        "price_min": price_min.normalize() if price_min is not None else None,
+        "price_max": price_max.normalize() if price_max is not None else None,
+        "in_stock": bool(parse_bool(query_params.get("in_stock"))),
+        "search": search or None,
+        "sort": sort_key,
+        "cursor": cursor,
+        "page": max(1, parse_int(query_params.get("page"), 1)) if cursor is None else None,
+        "page_size": max(1, min(
+            parse_int(query_params.get("page_size"), DEFAULT_PAGE_SIZE),
+            MAX_PAGE_SIZE,
+        )),
+    }
+
+
 # =============================================================================
 # PLP View
 # =============================================================================
@@ -109,8 +226,11 @@ def parse_int(value: str | None, default: int = 1) -> int:
         "- Price range filtering\n"
         "- Stock filtering\n"
         "- Dynamic attribute facets from variant specs\n"
+        "- Numeric spec range filters with min/max facets\n"
+        "- Full-text search within the category, ranked by relevance\n"
         "- Multiple sort options\n"
-        "- Page-based pagination"
+        "- Page-based pagination, or keyset pagination with `cursor` "
+        "(estimated totals, no deep OFFSET scans)"
     ),
     tags=["PLP"],
     parameters=[
@@ -139,24 +259,51 @@ def parse_int(value: str | None, default: int = 1) -> int:
             location=OpenApiParameter.QUERY,
             description="Maximum price filter",
         ),
+        OpenApiParameter(
+            name="range",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description=(
+                "Comma-separated numeric spec ranges, inclusive, either side optional "
+                "(e.g. genislik:600..900,kapasite:..40)"
+            ),
+        ),
         OpenApiParameter(
             name="in_stock",
             type=bool,
             location=OpenApiParameter.QUERY,
             description="Filter to only show in-stock products",
         ),
+        OpenApiParameter(
+            name="search",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description=(
+                "Search in titles, variant codes/SKUs and series/category names "
+                "(Turkish characters folded, prefix matching)"
+            ),
+        ),
         OpenApiParameter(
             name="sort",
             type=str,
             location=OpenApiParameter.QUERY,
-            description="Sort order",
-            enum=list(SORT_OPTIONS.keys()),
+            description=f"Sort order ('{RELEVANCE_SORT}', the default with search, requires search)",
+            enum=[*SORT_OPTIONS.keys(), RELEVANCE_SORT],
         ),
         OpenApiParameter(
             name="page",
             type=int,
             location=OpenApiParameter.QUERY,
-            description="Page number (default: 1)",
+            description="Page number (default: 1); ignored in cursor mode",
+        ),
+        OpenApiParameter(
+            name="cursor",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description=(
+                "Keyset pagination cursor. Pass an empty value for the first page, "
+                "then pagination.next_cursor"
+            ),
         ),
         OpenApiParameter(
             name="page_size",
@@ -167,7 +314,7 @@ def parse_int(value: str | None, default: int = 1) -> int:
     ],
     responses={
         200: OpenApiResponse(description="PLP data with products and facets"),
-        400: OpenApiResponse(description="Missing or invalid category parameter"),
+        400: OpenApiResponse(description="Missing or invalid category parameter, unknown range key or invalid cursor"),
         404: OpenApiResponse(description="Category not found"),
     },
     auth=[],
@@ -195,7 +342,16 @@ class PLPView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Get category
+        # Serve equivalent requests from the tagged response cache
+        params = canonical_plp_params(request.query_params, get_catalog_mode())
+        cached = get_cached_plp(params)
+        if cached is not None:
+            return Response(cached)
+        return self.build_response(params)
+
+    def build_response(self, params: dict) -> Response:
+        """Render canonical ``params`` from the database and cache the result."""
+        category_slug = params["category"]
         try:
             category = Category.objects.select_related("parent", "cover_media").get(slug=category_slug)
         except Category.DoesNotExist:
@@ -204,127 +360,107 @@ class PLPView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Catalog mode: return catalogs instead of products
-        if get_catalog_mode():
-            catalogs = (
-                CategoryCatalog.objects
-                .filter(category=category, published=True)
-                .select_related("media", "category")
-                .order_by("order", "title_tr")
-            )
-            catalogs_data = CategoryCatalogSerializer(catalogs, many=True).data
-
-            breadcrumbs = [
-                {"name": c.name, "slug": c.slug}
-                for c in category.breadcrumbs
-            ]
-
-            return Response({
-                "catalog_mode": True,
-                "category": {
-                    "id": str(category.id),
-                    "name": category.name,
-                    "slug": category.slug,
-                    "description_short": category.description_short,
-                    "cover_media_url": f"/api/v1/media/{category.cover_media_id}/file/" if category.cover_media_id else None,
-                    "breadcrumbs": breadcrumbs,
-                },
-                "catalogs": catalogs_data,
-                "products": [],
-                "pagination": {
-                    "total": 0,
-                    "page": 1,
-                    "page_size": 24,
-                    "total_pages": 1,
-                    "has_next": False,
-                    "has_prev": False,
-                },
-                "facets": {
-                    "brands": [],
-                    "categories": [],
-                    "price": {"min": 0, "max": 0},
-                    "series": [],
-                    "attributes": [],
-                },
-                "selected_filters": {
-                    "brands": [],
-                    "price_min": None,
-                    "price_max": None,
-                    "in_stock": False,
-                    "series": [],
-                    "attrs": None,
-                },
-                "sort": "name_asc",
-                "sort_options": [
-                    {"key": k, "label": v[1]} for k, v in SORT_OPTIONS.items()
-                ],
-            })
-
-        # Parse filter parameters
-        brand_slugs = parse_comma_list(request.query_params.get("brands"))
-        price_min = parse_decimal(request.query_params.get("price_min"))
-        price_max = parse_decimal(request.query_params.get("price_max"))
-        in_stock = parse_bool(request.query_params.get("in_stock"))
-        sort_key = request.query_params.get("sort", "name_asc")
-        page = parse_int(request.query_params.get("page"), 1)
-        page_size = min(
-            parse_int(request.query_params.get("page_size"), DEFAULT_PAGE_SIZE),
-            MAX_PAGE_SIZE
+        # Versions from before the build: a change while building evicts it
+        versions = plp_tag_versions([category_tag(category.id)])
+        if params["catalog_mode"]:
+            data, tags = self._catalog_response(category)
+        else:
+            result = self._product_response(category, params)
+            if isinstance(result, Response):
+                return result
+            data, tags = result
+        set_cached_plp(params, data, versions, tags)
+        return Response(data)
+
+    def _catalog_response(self, category: Category) -> tuple[dict, list[str]]:
+        """Catalog mode: return catalogs instead of products."""
+        catalogs = (
+            CategoryCatalog.objects
+            .filter(category=category, published=True)
+            .select_related("media", "category")
+            .order_by("order", "title_tr")
         )
+        catalogs_data = CategoryCatalogSerializer(catalogs, many=True).data
+
+        breadcrumbs = get_catalog_snapshot().breadcrumbs(category.id)
+
+        return {
+            "catalog_mode": True,
+            "category": {
+                "id": str(category.id),
+                "name": category.name,
+                "slug": category.slug,
+                "description_short": category.description_short,
+                "cover_media_url": f"/api/v1/media/{category.cover_media_id}/file/" if category.cover_media_id else None,
+                "breadcrumbs": breadcrumbs,
+            },
+            "catalogs": catalogs_data,
+            "products": [],
+            "pagination": {
+                "total": 0,
+                "page": 1,
+                "page_size": 24,
+                "total_pages": 1,
+                "has_next": False,
+                "has_prev": False,
+            },
+            "facets": {
+                "brands": [],
+                "categories": [],
+                "price": {"min": 0, "max": 0},
+                "series": [],
+                "attributes": [],
+                "ranges": [],
+            },
+            "selected_filters": {
+                "brands": [],
+                "price_min": None,
+                "price_max": None,
+                "in_stock": False,
+                "series": [],
+                "attrs": None,
+                "range": None,
+                "search": None,
+            },
+            "sort": "name_asc",
+            "sort_options": [
+                {"key": k, "label": v[1]} for k, v in SORT_OPTIONS.items()
+            ],
+        }, [category_tag(category.id)]
+
+    def _product_response(self, category: Category, params: dict) -> tuple[dict, list[str]] | Response:
+        """
+        Products, facets and pagination for the canonical ``params``, or an
+        error Response for an invalid range filter or cursor.
+        """
+        brand_slugs = params["brands"]
+        series_slugs = params["series"]
+        price_min = params["price_min"]
+        price_max = params["price_max"]
+        in_stock = params["in_stock"]
+        sort_key = params["sort"]
+        page = params["page"]
+        page_size = params["page_size"]
         
         # Get category subtree IDs
         category_ids = get_category_subtree_ids(category)
         
-        # Build base product queryset
+        # Listing rows of the subtree: price, stock and hero image are
+        # precomputed on ProductListing, so no variant join is needed here
         base_qs = (
-            Product.objects
-            .filter(
-                Q(series__category_id__in=category_ids) | Q(category_id__in=category_ids),
-                status=Product.Status.ACTIVE,
-            )
-            .select_related("series", "series__category", "brand", "brand__logo_media")
-            .prefetch_related(
-                Prefetch(
-                    "product_media",
-                    queryset=ProductMedia.objects.select_related("media").only(
-                        "id", "product_id", "media_id", "sort_order", "is_primary",
-                        "media__id", "media__kind", "media__filename",
-                    ).order_by("-is_primary", "sort_order"),
-                ),
-            )
-            .distinct()
-        )
-        
-        # Annotate with price and stock info from variants
-        base_qs = base_qs.annotate(
-            _min_price=Min("variants__list_price"),
-            _max_price=Max("variants__list_price"),
-            _has_stock=Case(
-                When(variants__stock_qty__isnull=True, then=Value(True)),  # NULL = unlimited
-                When(variants__stock_qty__gt=0, then=Value(True)),
-                default=Value(False),
-                output_field=BooleanField(),
-            ),
+            ProductListing.objects
+            .filter(Q(category_id__in=category_ids) | Q(series_category_id__in=category_ids))
+            .select_related("product", "brand", "hero_media")
+            .only(*LISTING_CARD_FIELDS)
         )
         
         # =====================================================================
-        # Compute facets BEFORE applying filters (for accurate counts)
+        # Compute facets BEFORE applying filters (for accurate counts);
+        # all facets come from one pass over the subtree (see plp_facets)
         # =====================================================================
         
-        # Brand facets (count products per brand in category)
-        brand_facets = self._compute_brand_facets(base_qs, brand_slugs)
-        
-        # Price range facet
-        price_facet = self._compute_price_facet(base_qs)
-        
-        # Subcategory facets
-        category_facets = self._compute_category_facets(category, category_ids, base_qs)
-
-        # Series facets
-        series_facets = self._compute_series_facets(base_qs)
-
-        # Attribute facets (from Variant specs)
-        attribute_facets = self._compute_attribute_facets(base_qs)
+        plp_facets = PLPFacets(category, category_ids)
+        facets = plp_facets.compute(selected_brands=brand_slugs)
         
         # =====================================================================
         # Apply filters
@@ -337,51 +473,113 @@ class PLPView(APIView):
             filtered_qs = filtered_qs.filter(brand__slug__in=brand_slugs)
 
         # Series filter
-        series_slugs = parse_comma_list(request.query_params.get("series"))
         if series_slugs:
             filtered_qs = filtered_qs.filter(series__slug__in=series_slugs)
             
         # Attribute filters (format: attrs=key:value,key2:value2)
-        attrs_param = request.query_params.get("attrs")
-        if attrs_param:
-            for pair in attrs_param.split(","):
-                if ":" in pair:
-                    key, val = pair.split(":", 1)
-                    key, val = key.strip(), val.strip()
-                    if key and val:
-                        # JSON contains check for specs
-                        filtered_qs = filtered_qs.filter(variants__specs__contains={key: val})
+        for key, val in params["attrs"]:
+            spec_key = plp_facets.spec_keys.get(key)
+            if spec_key is not None:
+                # Facetable key: indexed value or numeric bucket
+                matching = spec_filter_product_ids(spec_key, val)
+            else:
+                # JSON contains check for specs
+                matching = Variant.objects.filter(specs__contains={key: val}).values("product_id")
+            filtered_qs = filtered_qs.filter(product_id__in=matching)
+
+        # Numeric range filters (format: range=key:low..high), served by the
+        # (spec_key, numeric_value) index
+        for key, low, high in params["ranges"]:
+            spec_key = plp_facets.numeric_keys.get(key)
+            if spec_key is None:
+                return Response(
+                    {"error": f"'{key}' is not a numeric spec key", "code": "INVALID_RANGE_KEY"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            matching = spec_range_product_ids(
+                spec_key,
+                Decimal(low) if low else None,
+                Decimal(high) if high else None,
+            )
+            filtered_qs = filtered_qs.filter(product_id__in=matching)
         
         # Price filter
         if price_min is not None:
-            filtered_qs = filtered_qs.filter(_min_price__gte=price_min)
+            filtered_qs = filtered_qs.filter(min_price__gte=price_min)
         if price_max is not None:
-            filtered_qs = filtered_qs.filter(_max_price__lte=price_max)
+            filtered_qs = filtered_qs.filter(max_price__lte=price_max)
         
         # Stock filter
         if in_stock:
-            # Product has stock if any variant has stock
-            filtered_qs = filtered_qs.filter(
-                Q(variants__stock_qty__isnull=True) | Q(variants__stock_qty__gt=0)
-            ).distinct()
+            filtered_qs = filtered_qs.filter(in_stock=True)
+
+        # Search filter, served by the listing search document indexes;
+        # annotates search_rank for relevance sorting
+        if params["search"]:
+            filtered_qs = search_listings(filtered_qs, params["search"])
         
         # =====================================================================
         # Sorting
         # =====================================================================
         
-        sort_field = SORT_OPTIONS.get(sort_key, SORT_OPTIONS["name_asc"])[0]
-        filtered_qs = filtered_qs.order_by(sort_field)
+        sort_options = self._sort_options(params)
+        sort_field = sort_options[sort_key][0]
+        ordered_qs = filtered_qs.order_by(*keyset_ordering(sort_field))
         
         # =====================================================================
         # Pagination
         # =====================================================================
         
-        total = filtered_qs.count()
-        total_pages = (total + page_size - 1) // page_size if total > 0 else 1
-        page = max(1, min(page, total_pages))  # Clamp to valid range
-        
-        offset = (page - 1) * page_size
-        products = list(filtered_qs[offset:offset + page_size])
+        if params["cursor"] is not None:
+            # Keyset mode: seek past the cursor row instead of counting and
+            # skipping OFFSET rows, so deep pages cost the same as the first
+            if params["cursor"]:
+                try:
+                    value, pk = decode_keyset_cursor(
+                        params["cursor"], sort_key, SORT_VALUE_TYPES[sort_field.lstrip("-")]
+                    )
+                except InvalidCursor as e:
+                    return Response(
+                        {"error": str(e), "code": "INVALID_CURSOR"},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                ordered_qs = keyset_after(ordered_qs, sort_field, value, pk)
+
+            products = list(ordered_qs[:page_size + 1])
+            has_next = len(products) > page_size
+            products = products[:page_size]
+            next_cursor = None
+            if has_next:
+                last = products[-1]
+                next_cursor = encode_keyset_cursor(
+                    sort_key, getattr(last, sort_field.lstrip("-")), last.pk
+                )
+
+            total, total_is_estimate = self._estimate_total(filtered_qs, plp_facets, params)
+            pagination = {
+                "mode": "cursor",
+                "total": total,
+                "total_is_estimate": total_is_estimate,
+                "page_size": page_size,
+                "next_cursor": next_cursor,
+                "has_next": has_next,
+                "has_prev": bool(params["cursor"]),
+            }
+        else:
+            total = filtered_qs.count()
+            total_pages = (total + page_size - 1) // page_size if total > 0 else 1
+            page = max(1, min(page, total_pages))  # Clamp to valid range
+
+            offset = (page - 1) * page_size
+            products = list(ordered_qs[offset:offset + page_size])
+            pagination = {
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": total_pages,
+                "has_next": page < total_pages,
+                "has_prev": page > 1,
+            }
         
         # =====================================================================
         # Build response
@@ -391,12 +589,19 @@ class PLPView(APIView):
         products_data = [self._serialize_product(p) for p in products]
         
         # Build category breadcrumbs
-        breadcrumbs = [
-            {"name": c.name, "slug": c.slug}
-            for c in category.breadcrumbs
-        ]
+        breadcrumbs = get_catalog_snapshot().breadcrumbs(category.id)
         
-        return Response({
+        # Responses depend on the category (and its facet categories) and
+        # on the brands shown for its products
+        tags = [category_tag(category.id)]
+        tags += [category_tag(category_id) for category_id in plp_facets.facet_category_ids]
+        tags += [
+            brand_tag(product["brand_id"])
+            for product in plp_facets.products
+            if product["brand_id"] is not None
+        ]
+
+        return {
             "category": {
                 "id": str(category.id),
                 "name": category.name,
@@ -406,209 +611,75 @@ class PLPView(APIView):
                 "breadcrumbs": breadcrumbs,
             },
             "products": products_data,
-            "pagination": {
-                "total": total,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": total_pages,
-                "has_next": page < total_pages,
-                "has_prev": page > 1,
-            },
-            "facets": {
-                "brands": brand_facets,
-                "categories": category_facets,
-                "price": price_facet,
-                "series": series_facets,
-                "attributes": attribute_facets,
-            },
+            "pagination": pagination,
+            "facets": facets,
             "selected_filters": {
                 "brands": brand_slugs,
                 "price_min": float(price_min) if price_min else None,
                 "price_max": float(price_max) if price_max else None,
                 "in_stock": in_stock or False,
-                # Simple serialization for series/attrs for now
-                "series": parse_comma_list(request.query_params.get("series")),
-                "attrs": request.query_params.get("attrs"),
+                "series": series_slugs,
+                "attrs": ",".join(f"{key}:{val}" for key, val in params["attrs"]) or None,
+                "range": ",".join(f"{key}:{low}..{high}" for key, low, high in params["ranges"]) or None,
+                "search": params["search"],
             },
             "sort": sort_key,
             "sort_options": [
-                {"key": k, "label": v[1]} for k, v in SORT_OPTIONS.items()
+                {"key": k, "label": v[1]} for k, v in sort_options.items()
             ],
-        })
+        }, tags
+
+    @staticmethod
+    def _sort_options(params: dict) -> dict:
+        """Sort options for ``params``; relevance is offered only with a search."""
+        if params["search"]:
+            return {RELEVANCE_SORT: RELEVANCE_OPTION, **SORT_OPTIONS}
+        return SORT_OPTIONS
     
-    def _compute_brand_facets(self, queryset, selected_brands: list[str]) -> list[dict]:
-        """Compute brand facet counts."""
-        brand_counts = (
-            queryset
-            .filter(brand__isnull=False, brand__is_active=True)
-            .values("brand__id", "brand__name", "brand__slug", "brand__logo_media_id")
-            .annotate(count=Count("id", distinct=True))
-            .order_by("-count", "brand__name")
-        )
-        
-        return [
-            {
-                "id": str(bc["brand__id"]),
-                "name": bc["brand__name"],
-                "slug": bc["brand__slug"],
-                "count": bc["count"],
-                "logo_url": f"/api/v1/media/{bc['brand__logo_media_id']}/file/" if bc["brand__logo_media_id"] else None,
-                "selected": bc["brand__slug"] in selected_brands,
-            }
-            for bc in brand_counts
-        ]
-    
-    def _compute_price_facet(self, queryset) -> dict:
-        """Compute price range from all products."""
-        agg = queryset.aggregate(
-            min_price=Min("variants__list_price"),
-            max_price=Max("variants__list_price"),
-        )
-        return {
-            "min": float(agg["min_price"]) if agg["min_price"] else 0,
-            "max": float(agg["max_price"]) if agg["max_price"] else 0,
-        }
-    
-    def _compute_category_facets(self, root_category: Category, category_ids: list, queryset) -> list[dict]:
-        """Compute subcategory facet counts."""
-        # Get direct children of root category
-        children = Category.objects.filter(parent=root_category).order_by("order", "name")
-        
-        # If no children, show alternatives:
-        if not children.exists():
-            if root_category.parent_id:
-                # Has a parent: show sibling categories (same parent, excluding self)
-                children = Category.objects.filter(
-                    parent_id=root_category.parent_id
-                ).exclude(id=root_category.id).order_by("order", "name")
-            else:
-                # Is a root category: show other root categories (excluding self)
-                children = Category.objects.filter(
-                    parent_id__isnull=True
-                ).exclude(id=root_category.id).order_by("order", "name")
-        
-        facets = []
-        for child in children:
-            child_ids = get_category_subtree_ids(child)
-            
-            # For sibling/root categories, we need to query ALL products, not just current category
-            # Use a fresh queryset
-            count = (
-                Product.objects
-                .filter(
-                    Q(series__category_id__in=child_ids) | Q(category_id__in=child_ids),
-                    status=Product.Status.ACTIVE,
-                )
-                .distinct()
-                .count()
-            )
-            
-            if count > 0:
-                facets.append({
-                    "id": str(child.id),
-                    "name": child.name,
-                    "slug": child.slug,
-                    "count": count,
-                    "depth": child.depth,
-                })
-        
-        return facets
-
-    def _compute_series_facets(self, queryset) -> list[dict]:
-        """Compute series counts."""
-        series_counts = (
-            queryset
-            .filter(series__isnull=False)
-            .values("series__id", "series__name", "series__slug")
-            .annotate(count=Count("id", distinct=True))
-            .order_by("-count", "series__name")
-        )
-        
-        return [
-            {
-                "id": str(sc["series__id"]),
-                "name": sc["series__name"],
-                "slug": sc["series__slug"],
-                "count": sc["count"],
-            }
-            for sc in series_counts
-        ]
-
-    def _compute_attribute_facets(self, queryset) -> list[dict]:
+    @staticmethod
+    def _estimate_total(filtered_qs, plp_facets: PLPFacets, params: dict) -> tuple[int, bool]:
         """
-        Compute dynamic attribute facets from Variant specs.
-        Iterates over known FACET_ATTRIBUTE_KEYS.
+        Total for cursor mode as (total, is_estimate), without a COUNT query
+        where possible.
+
+        Brand and series filters are counted exactly from the facet pass.
+        Other filters use the planner's row estimate on PostgreSQL and fall
+        back to an exact count elsewhere.
         """
-        facets = []
-        
-        # We need to inspect variants of the filtered products
-        # This can be expensive, so we specific keys only
-        
-        for key, label in FACET_ATTRIBUTE_KEYS:
-            # Group by specific json key
-            # Django ORM supports KeyTextTransform/KeyTransform for JSON
-            # But simple approach: filter products with variants having this key
-            
-            # Get all values for this key from variants of these products
-            # We use a raw-ish approach or simple annotation if possible
-            # Standard ORM for JSON grouping is tricky across DBs, but Postgres supports it.
-            
-            # Safer approach for now:
-            # 1. Filter variants present in these products
-            # 2. Extract specific key
-            # 3. Aggregation
-            
-            # Using JSON_EXTRACT equivalent in Django:
-            values = (
-                Variant.objects
-                .filter(product__in=queryset)
-                .values(value=Case(
-                    When(specs__has_key=key, then=F(f"specs__{key}")),
-                    default=None
-                ))
-                .filter(value__isnull=False)
-                .annotate(count=Count("product", distinct=True))
-                .order_by("-count", "value")
+        if not (params["attrs"] or params["ranges"] or params["in_stock"] or params["search"]
+                or params["price_min"] is not None or params["price_max"] is not None):
+            brands, series = set(params["brands"]), set(params["series"])
+            total = sum(
+                1 for product in plp_facets.products
+                if (not brands or product["brand__slug"] in brands)
+                and (not series or product["series__slug"] in series)
             )
-            
-            if values:
-                options = []
-                for v in values:
-                    val_str = str(v["value"]).strip()
-                    if val_str:
-                        options.append({
-                            "value": val_str,
-                            "count": v["count"],
-                            "label": val_str, # Could be mapped if needed
-                        })
-                
-                if options:
-                    facets.append({
-                        "key": key,
-                        "label": label,
-                        "options": options
-                    })
-                    
-        return facets
-    
-    def _serialize_product(self, product: Product) -> dict:
-        """Serialize a product for PLP response."""
-        # Get primary image
+            return total, False
+
+        if connection.vendor == "postgresql":
+            plan = json.loads(filtered_qs.order_by().explain(format="json"))
+            if isinstance(plan, list):
+                plan = plan[0]
+            return int(plan["Plan"]["Plan Rows"]), True
+        return filtered_qs.count(), False
+
+    def _serialize_product(self, listing: ProductListing) -> dict:
+        """Serialize a product listing row for PLP response."""
+        product = listing.product
         hero_image_url = None
-        product_media_list = list(product.product_media.all())
-        if product_media_list:
-            primary = next((pm for pm in product_media_list if pm.is_primary), None)
-            if not primary:
-                primary = product_media_list[0]
-            if primary and primary.media_id:
-                hero_image_url = f"/api/v1/media/{primary.media_id}/file/"
+        hero_image_srcset = None
+        if listing.hero_media_id:
+            hero_image_url = card_image_url(listing.hero_media_id, listing.hero_media.kind)
+            hero_image_srcset = build_srcset(
+                listing.hero_media_id, listing.hero_media.kind, listing.hero_media.width
+            )
         
         # Price info
         price_info = None
-        if product._min_price is not None:
+        if listing.min_price is not None:
             price_info = {
-                "min": float(product._min_price),
-                "max": float(product._max_price) if product._max_price else float(product._min_price),
+                "min": float(listing.min_price),
+                "max": float(listing.max_price) if listing.max_price else float(listing.min_price),
                 "currency": "TRY",
             }
         
@@ -618,12 +689,13 @@ class PLPView(APIView):
             "name": product.name,
             "title_tr": product.title_tr,
             "brand": {
-                "id": str(product.brand.id),
-                "name": product.brand.name,
-                "slug": product.brand.slug,
-            } if product.brand else None,
+                "id": str(listing.brand.id),
+                "name": listing.brand.name,
+                "slug": listing.brand.slug,
+            } if listing.brand else None,
             "hero_image_url": hero_image_url,
+            "hero_image_srcset": hero_image_srcset,
             "price": price_info,
-            "in_stock": getattr(product, "_has_stock", True),
+            "in_stock": listing.in_stock,
             "short_specs": product.short_specs[:3] if product.short_specs else [],
         }
@@ -0,0 +1,145 @@
+"""
+Tagged response cache for the Product Listing Page.
+
+Responses are stored under a hash of the canonical request parameters
+(see ``plp.canonical_plp_params``) together with the versions of the tags
+they depend on:
+
+- ``all``: category tree changes and full listing rebuilds,
+- ``category:<id>``: products in that category's subtree changed,
+- ``brand:<id>``: the brand itself changed.
+
+A tag is invalidated by deleting its version key; an entry whose stored
+versions no longer match is a miss. Product changes invalidate the tags
+of the affected categories and all their ancestors only, so the rest of
+the catalog stays cached.
+
+Invalidation runs immediately and again after commit, so a reader that
+re-cached the old state while the writer's transaction was open is
+evicted as well. Inside ``cache_keys.deferred_invalidation()`` tags are
+collected and invalidated once when the block exits. Cache errors never
+fail a request.
+"""
+
+import hashlib
+import json
+import logging
+import uuid
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .cache_keys import PLP_CACHE_TTL, defer_invalidation, plp_response_key, plp_tag_key
+
+logger = logging.getLogger(__name__)
+
+ALL_TAG = "all"
+
+
+def category_tag(category_id) -> str:
+    return f"category:{category_id}"
+
+
+def brand_tag(brand_id) -> str:
+    return f"brand:{brand_id}"
+
+
+def _params_digest(params: dict) -> str:
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def get_cached_plp(params: dict) -> Optional[dict]:
+    """Return the cached response for ``params`` if none of its tags changed."""
+    try:
+        entry = cache.get(plp_response_key(_params_digest(params)))
+        if not entry:
+            return None
+        if cache.get_many(list(entry["tags"])) != entry["tags"]:
+            return None
+        return entry["data"]
+    except Exception as e:
+        logger.warning(f"PLP cache read failed: {e}")
+        return None
+
+
+def plp_tag_versions(tags: Iterable[str]) -> Optional[dict]:
+    """
+    Current versions of ``tags`` (and ``all``), creating missing ones.
+
+    Returns None if the cache is unavailable.
+    """
+    try:
+        tag_keys = [plp_tag_key(tag) for tag in {ALL_TAG, *tags}]
+        versions = cache.get_many(tag_keys)
+        missing = [key for key in tag_keys if key not in versions]
+        if missing:
+            for key in missing:
+                cache.add(key, uuid.uuid4().hex, timeout=None)
+            # Re-read: a concurrent writer may have added the key first
+            versions = cache.get_many(tag_keys)
+        return versions if len(versions) == len(tag_keys) else None
+    except Exception as e:
+        logger.warning(f"PLP cache tag read failed: {e}")
+        return None
+
+
+def set_cached_plp(
+    params: dict, data: dict, versions: Optional[dict], tags: Iterable[str] = ()
+) -> None:
+    """
+    Store a response for ``params`` under tag ``versions`` read before it was built.
+
+    An invalidation that lands while the response is built changes those
+    versions, so the entry is never served. ``tags`` only known once built
+    (facet categories, brands) are stored with their current versions.
+    """
+    if versions is None:
+        return
+    extra_tags = [tag for tag in tags if plp_tag_key(tag) not in versions]
+    if extra_tags:
+        extra_versions = plp_tag_versions(extra_tags)
+        if extra_versions is None:
+            return
+        versions = {**extra_versions, **versions}
+    try:
+        cache.set(
+            plp_response_key(_params_digest(params)),
+            {"tags": versions, "data": data},
+            PLP_CACHE_TTL,
+        )
+    except Exception as e:
+        logger.warning(f"PLP cache write failed: {e}")
+
+
+def invalidate_plp_tags(tags: Iterable[str]) -> None:
+    """Invalidate every cached response tagged with any of ``tags``."""
+    tags = set(tags)
+    if not tags or defer_invalidation(invalidate_plp_tags, tags):
+        return
+    tag_keys = [plp_tag_key(tag) for tag in tags]
+
+    def _delete():
+        try:
+            cache.delete_many(tag_keys)
+        except Exception as e:
+            logger.warning(f"PLP cache invalidation failed: {e}")
+
+    _delete()
+    transaction.on_commit(_delete)
+
+
+def invalidate_plp_categories(category_ids: Iterable) -> None:
+    """Invalidate the responses of ``category_ids`` and all their ancestors."""
+    from .models import CategoryClosure
+
+    category_ids = {category_id for category_id in category_ids if category_id is not None}
+    if not category_ids:
+        return
+    ancestor_ids = set(
+        CategoryClosure.objects.filter(descendant_id__in=category_ids).values_list(
+            "ancestor_id", flat=True
+        )
+    )
+    invalidate_plp_tags(category_tag(category_id) for category_id in ancestor_ids | category_ids)
@@ -0,0 +1,294 @@
+"""
+Single-pass facet computation for the Product Listing Page.
+
+The facet inputs of a category subtree are loaded once as flat tuples:
+
+- one query for the active products (with their brand and series columns),
+- one aggregate over their listing rows for the price range,
+- one query for their indexed values of the facetable spec keys and one
+  grouped min/max aggregate over the numeric spec keys (ProductSpecValue,
+  see spec_index.py),
+
+and every remaining facet (brands, series, spec attributes and the
+subcategory counts) is counted from those tuples in memory. The number of
+queries is therefore fixed, independent of the number of brands, series,
+attribute keys or child categories. Which spec keys become facets, and how
+numeric values are bucketed, is configured on SpecKey.
+
+Facets describe the whole category subtree, before any PLP filter is
+applied, so the counts stay stable while the user narrows the listing.
+"""
+
+from collections import defaultdict
+from typing import Iterable, List, Optional
+
+from django.db.models import Max, Min, Q
+
+from .models import Category, CategoryClosure, Product, ProductListing, ProductSpecValue, SpecKey
+from .spec_index import bucket_label, bucket_ranges, bucket_value, indexed_spec_keys, spec_buckets
+
+
+PRODUCT_COLUMNS = (
+    "id",
+    "category_id",
+    "series__category_id",
+    "brand_id",
+    "brand__name",
+    "brand__slug",
+    "brand__logo_media_id",
+    "brand__is_active",
+    "series_id",
+    "series__name",
+    "series__slug",
+)
+
+
+def active_products_in(category_ids: Iterable):
+    """Active products whose category or series category is in ``category_ids``."""
+    category_ids = list(category_ids)
+    return Product.objects.filter(
+        Q(series__category_id__in=category_ids) | Q(category_id__in=category_ids),
+        status=Product.Status.ACTIVE,
+    )
+
+
+def _media_file_url(media_id) -> Optional[str]:
+    return f"/api/v1/media/{media_id}/file/" if media_id else None
+
+
+class PLPFacets:
+    """
+    Facet counts for a category subtree.
+
+    Usage:
+        facets = PLPFacets(category, category_ids).compute(selected_brands=["vital"])
+    """
+
+    def __init__(self, category: Category, category_ids: Iterable):
+        self.category = category
+        self.category_ids = set(category_ids)
+        # Categories listed in the category facet (children, or siblings of a leaf)
+        self.facet_category_ids = []
+        self.products = [
+            dict(zip(PRODUCT_COLUMNS, row))
+            for row in active_products_in(self.category_ids).values_list(*PRODUCT_COLUMNS)
+        ]
+        # Indexed spec keys by slug, in display order: facetable keys become
+        # attribute facets, numeric keys range facets
+        indexed = list(indexed_spec_keys().order_by("sort_order", "label_tr"))
+        self.spec_keys = {spec_key.slug: spec_key for spec_key in indexed if spec_key.is_facetable}
+        self.numeric_keys = {spec_key.slug: spec_key for spec_key in indexed if spec_key.is_numeric}
+
+    def compute(self, selected_brands: Optional[List[str]] = None) -> dict:
+        return {
+            "brands": self.brands(selected_brands or []),
+            "categories": self.categories(),
+            "price": self.price(),
+            "series": self.series(),
+            "attributes": self.attributes(),
+            "ranges": self.ranges(),
+        }
+
+    def brands(self, selected_brands: List[str]) -> list[dict]:
+        """Products per active brand, most frequent first."""
+        counts = defaultdict(int)
+        info = {}
+        for product in self.products:
+            if product["brand_id"] is None or not product["brand__is_active"]:
+                continue
+            counts[product["brand_id"]] += 1
+            info[product["brand_id"]] = product
+
+        ordered = sorted(counts, key=lambda b: (-counts[b], info[b]["brand__name"]))
+        return [
+            {
+                "id": str(brand_id),
+                "name": info[brand_id]["brand__name"],
+                "slug": info[brand_id]["brand__slug"],
+                "count": counts[brand_id],
+                "logo_url": _media_file_url(info[brand_id]["brand__logo_media_id"]),
+                "selected": info[brand_id]["brand__slug"] in selected_brands,
+            }
+            for brand_id in ordered
+        ]
+
+    def price(self) -> dict:
+        """Price range over all variants of the subtree."""
+        prices = ProductListing.objects.filter(
+            Q(category_id__in=self.category_ids) | Q(series_category_id__in=self.category_ids)
+        ).aggregate(low=Min("min_price"), high=Max("max_price"))
+        low, high = prices["low"], prices["high"]
+        return {
+            "min": float(low) if low else 0,
+            "max": float(high) if high else 0,
+        }
+
+    def series(self) -> list[dict]:
+        """Products per series, most frequent first."""
+        counts = defaultdict(int)
+        info = {}
+        for product in self.products:
+            if product["series_id"] is None:
+                continue
+            counts[product["series_id"]] += 1
+            info[product["series_id"]] = product
+
+        ordered = sorted(counts, key=lambda s: (-counts[s], info[s]["series__name"]))
+        return [
+            {
+                "id": str(series_id),
+                "name": info[series_id]["series__name"],
+                "slug": info[series_id]["series__slug"],
+                "count": counts[series_id],
+            }
+            for series_id in ordered
+        ]
+
+    def attributes(self) -> list[dict]:
+        """Products per spec value (or numeric bucket) for each facetable key."""
+        if not self.spec_keys:
+            return []
+        keys_by_id = {spec_key.id: spec_key for spec_key in self.spec_keys.values()}
+        values = {spec_key_id: defaultdict(set) for spec_key_id in keys_by_id}
+        numbers = {}
+        for spec_key_id, value, numeric_value, product_id in ProductSpecValue.objects.filter(
+            spec_key_id__in=keys_by_id,
+            product_id__in=active_products_in(self.category_ids).values("id"),
+        ).values_list("spec_key_id", "value", "numeric_value", "product_id"):
+            values[spec_key_id][value].add(product_id)
+            numbers[(spec_key_id, value)] = numeric_value
+
+        facets = []
+        for spec_key in self.spec_keys.values():
+            products_by_value = values[spec_key.id]
+            if not products_by_value:
+                continue
+            bounds = spec_buckets(spec_key)
+            if bounds:
+                options = self._bucket_options(spec_key, bounds, products_by_value, numbers)
+            else:
+                options = self._value_options(spec_key, products_by_value, numbers)
+            facets.append({"key": spec_key.slug, "label": spec_key.label_tr, "options": options})
+        return facets
+
+    def ranges(self) -> list[dict]:
+        """Min/max of every numeric spec key present in the subtree."""
+        if not self.numeric_keys:
+            return []
+        keys_by_id = {spec_key.id: spec_key for spec_key in self.numeric_keys.values()}
+        bounds = {
+            spec_key_id: (low, high)
+            for spec_key_id, low, high in ProductSpecValue.objects.filter(
+                spec_key_id__in=keys_by_id,
+                numeric_value__isnull=False,
+                product_id__in=active_products_in(self.category_ids).values("id"),
+            )
+            .values("spec_key_id")
+            .annotate(low=Min("numeric_value"), high=Max("numeric_value"))
+            .values_list("spec_key_id", "low", "high")
+        }
+        return [
+            {
+                "key": spec_key.slug,
+                "label": spec_key.label_tr,
+                "unit": spec_key.unit,
+                "min": float(bounds[spec_key.id][0]),
+                "max": float(bounds[spec_key.id][1]),
+            }
+            for spec_key in self.numeric_keys.values()
+            if spec_key.id in bounds
+        ]
+
+    @staticmethod
+    def _value_options(spec_key: SpecKey, products_by_value: dict, numbers: dict) -> list[dict]:
+        """One option per value; numbers ascending, text by product count."""
+        def number_of(value):
+            return numbers.get((spec_key.id, value))
+
+        if spec_key.is_numeric and all(number_of(v) is not None for v in products_by_value):
+            ordered = sorted(products_by_value, key=number_of)
+        else:
+            ordered = sorted(products_by_value, key=lambda v: (-len(products_by_value[v]), v))
+        suffix = f" {spec_key.unit}" if spec_key.unit and spec_key.is_numeric else ""
+        return [
+            {"value": value, "count": len(products_by_value[value]), "label": f"{value}{suffix}"}
+            for value in ordered
+        ]
+
+    @staticmethod
+    def _bucket_options(spec_key: SpecKey, bounds: list, products_by_value: dict, numbers: dict) -> list[dict]:
+        """One option per non-empty [low, high) bucket, in bucket order."""
+        options = []
+        for low, high in bucket_ranges(bounds):
+            products = set()
+            for value, product_ids in products_by_value.items():
+                number = numbers.get((spec_key.id, value))
+                if number is None:
+                    continue
+                if (low is None or number >= low) and (high is None or number < high):
+                    products |= product_ids
+            if products:
+                options.append({
+                    "value": bucket_value(low, high),
+                    "count": len(products),
+                    "label": bucket_label(low, high, spec_key.unit),
+                })
+        return options
+
+    def categories(self) -> list[dict]:
+        """
+        Products per child category (subtree counts).
+
+        Leaf categories show their siblings instead, and leaf root categories
+        the other roots; those counts come from one extra product query.
+        """
+        root = self.category
+        children = list(
+            Category.with_tree_depth(Category.objects.filter(parent=root)).order_by("order", "name")
+        )
+        in_subtree = bool(children)
+        if not children:
+            if root.parent_id:
+                alternatives = Category.objects.filter(parent_id=root.parent_id)
+            else:
+                alternatives = Category.objects.filter(parent_id__isnull=True)
+            children = list(
+                Category.with_tree_depth(alternatives.exclude(id=root.id)).order_by("order", "name")
+            )
+        self.facet_category_ids = [child.id for child in children]
+        if not children:
+            return []
+
+        # Map every category in the facet subtrees to its facet category
+        owner = {}
+        for ancestor_id, descendant_id in CategoryClosure.objects.filter(
+            ancestor_id__in=[child.id for child in children]
+        ).values_list("ancestor_id", "descendant_id"):
+            owner[descendant_id] = ancestor_id
+
+        if in_subtree:
+            products = [
+                (p["id"], p["category_id"], p["series__category_id"]) for p in self.products
+            ]
+        else:
+            products = active_products_in(owner).values_list(
+                "id", "category_id", "series__category_id"
+            )
+
+        counts = defaultdict(set)
+        for product_id, category_id, series_category_id in products:
+            for category in (category_id, series_category_id):
+                if category in owner:
+                    counts[owner[category]].add(product_id)
+
+        return [
+            {
+                "id": str(child.id),
+                "name": child.name,
+                "slug": child.slug,
+                "count": len(counts[child.id]),
+                "depth": child.depth,
+            }
+            for child in children
+            if counts[child.id]
+        ]
@@ -9,7 +9,7 @@ from __future__ import annotations
 
 from typing import Iterable, Optional, Set
 
-from .models import Category
+from .catalog_snapshot import get_catalog_snapshot
 
 
 TRUE_VALUES = {"1", "true", "yes", "y", "t"}
@@ -36,27 +36,16 @@ def resolve_category_ids(
     Resolve category IDs for the given slugs.
 
     If include_descendants is True, all descendant categories are included.
+    Both are resolved from the worker's catalog snapshot, without queries.
     """
     clean_slugs = [s.strip() for s in slugs if s and str(s).strip()]
     if not clean_slugs:
         return set()
 
-    category_ids = set(
-        Category.objects.filter(slug__in=clean_slugs).values_list("id", flat=True)
-    )
+    snapshot = get_catalog_snapshot()
+    category_ids = snapshot.category_ids(clean_slugs)
 
     if not include_descendants or not category_ids:
         return category_ids
 
-    pending = set(category_ids)
-    while pending:
-        child_ids = set(
-            Category.objects.filter(parent_id__in=pending).values_list("id", flat=True)
-        )
-        new_children = child_ids - category_ids
-        if not new_children:
-            break
-        category_ids.update(new_children)
-        pending = new_children
-
-    return category_ids
+    return snapshot.subtree_ids(category_ids)
@@ -0,0 +1,94 @@
+"""
+Product search over the ProductListing search document.
+
+Every listing row carries a ``search_text`` document: the title, name,
+variant model codes/SKUs/names, series and category names of the product,
+folded with ``canonical_text`` (lowercase, Turkish characters to ASCII) so
+"gazlı", "GAZLI" and "gazli" all match. On PostgreSQL the document is also
+kept as a ``search_vector`` tsvector; both are GIN indexed (full-text and
+trigram, see migration 0032) and results are ranked by ts_rank plus trigram
+word similarity. Other databases fall back to substring matching on
+``search_text`` with a constant rank.
+
+The document is maintained by ``listing._refresh_chunk`` together with the
+rest of the listing row.
+"""
+
+import re
+from typing import Iterable
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Cast
+
+from apps.common.canonical import canonical_text
+
+# Longest search input considered
+MAX_SEARCH_LENGTH = 200
+
+WORD_RE = re.compile(r"\w+")
+
+
+def uses_full_text() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def build_search_text(parts: Iterable) -> str:
+    """Canonical search document from its (possibly empty) parts."""
+    return canonical_text(" ".join(part for part in parts if part))
+
+
+def normalize_search(value: str | None) -> str:
+    """Canonical form of a search input ("" when nothing to search for)."""
+    if not value:
+        return ""
+    return canonical_text(value[:MAX_SEARCH_LENGTH])
+
+
+def search_vector_expression():
+    """tsvector of the listing search document (PostgreSQL only)."""
+    return SearchVector("search_text", config="simple")
+
+
+def search_listings(queryset, value: str, prefix: str = ""):
+    """
+    Filter ``queryset`` to rows whose search document matches ``value`` and
+    annotate their ``search_rank`` (higher is better).
+
+    ``prefix`` is the path from the queryset's model to ProductListing,
+    e.g. "listing__" for products.
+    """
+    text = normalize_search(value)
+    words = WORD_RE.findall(text)
+    if not words:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    if not uses_full_text():
+        matches = Q()
+        for word in words:
+            matches &= Q(**{f"{prefix}search_text__contains": word})
+        return queryset.filter(matches).annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+    # Every word must match, as a prefix so partial input already matches
+    query = SearchQuery(
+        " & ".join(f"{word}:*" for word in words), search_type="raw", config="simple"
+    )
+    return queryset.filter(
+        Q(**{f"{prefix}search_vector": query})
+        | Q(**{f"{prefix}search_text__contains": text})
+    ).annotate(
+        # Double precision, so cursors carrying the rank compare exactly
+        search_rank=Cast(
+            SearchRank(F(f"{prefix}search_vector"), query)
+            + TrigramWordSimilarity(Value(text), f"{prefix}search_text"),
+            FloatField(),
+        )
+    )
@@ -13,6 +13,8 @@ Provides clean serializers for:
 
 from rest_framework import serializers
 
+from .media_derivatives import card_image_url
+from .media_variants import build_srcset
 from .models import (
     Brand,
     BrandCategory,
@@ -44,6 +46,7 @@ class MediaMetadataSerializer(serializers.ModelSerializer):
     """
     
     file_url = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = Media
@@ -57,12 +60,17 @@ class MediaMetadataSerializer(serializers.ModelSerializer):
             "height",
             "checksum_sha256",
             "file_url",
+            "srcset",
         ]
     
     def get_file_url(self, obj):
         """Generate URL for file streaming endpoint."""
         return f"/api/v1/media/{obj.id}/file/"
 
+    def get_srcset(self, obj):
+        """Responsive variant URLs per format (images only)."""
+        return build_srcset(obj.id, obj.kind, obj.width)
+
 
 # =============================================================================
 # SpecKey Serializers
@@ -713,8 +721,12 @@ class VariantSerializer(serializers.ModelSerializer):
         """
         ret = super().to_representation(instance)
         
-        # Check global price visibility setting
-        if not get_show_prices():
+        # Check global price visibility setting (views may pass it in the
+        # context to read it once per request)
+        show_prices = self.context.get("show_prices")
+        if show_prices is None:
+            show_prices = get_show_prices()
+        if not show_prices:
             ret.pop("list_price", None)
             
         return ret
@@ -763,6 +775,7 @@ class ProductMediaSerializer(serializers.ModelSerializer):
     file_url = serializers.SerializerMethodField()
     width = serializers.IntegerField(source="media.width", read_only=True)
     height = serializers.IntegerField(source="media.height", read_only=True)
+    srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = ProductMedia
@@ -772,6 +785,7 @@ class ProductMediaSerializer(serializers.ModelSerializer):
             "kind",
             "filename",
             "file_url",
+            "srcset",
             "width",
             "height",
             "alt",
@@ -786,6 +800,12 @@ class ProductMediaSerializer(serializers.ModelSerializer):
             return f"/api/v1/media/{obj.media_id}/file/"
         return None
 
+    def get_srcset(self, obj):
+        """Responsive variant URLs per format (images only)."""
+        if not obj.media_id:
+            return None
+        return build_srcset(obj.media_id, obj.media.kind, obj.media.width)
+
 
 # =============================================================================
 # Product Serializers
@@ -828,22 +848,28 @@ class ProductListSerializer(serializers.ModelSerializer):
         ]
     
     def get_primary_image_url(self, obj):
-        """Return URL for primary product image."""
+        """Return card-sized URL for primary product image."""
+        # Hero image precomputed on the listing read model
+        if hasattr(obj, "_hero_media_id"):
+            if not obj._hero_media_id:
+                return None
+            return card_image_url(obj._hero_media_id, obj._hero_media_kind)
+
         # Try prefetched media first
         product_media = getattr(obj, "_prefetched_objects_cache", {}).get("product_media")
         if product_media is not None:
             for pm in product_media:
                 if pm.is_primary:
-                    return f"/api/v1/media/{pm.media_id}/file/"
+                    return card_image_url(pm.media_id, pm.media.kind)
             # Fallback to first
             if product_media:
                 first = min(product_media, key=lambda x: x.sort_order)
-                return f"/api/v1/media/{first.media_id}/file/"
+                return card_image_url(first.media_id, first.media.kind)
         
         # Fallback to property
         primary = obj.primary_image
         if primary:
-            return f"/api/v1/media/{primary.id}/file/"
+            return card_image_url(primary.id, primary.kind)
         return None
     
     def get_variants_count(self, obj):
@@ -915,9 +941,10 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         return None
     
     def get_spec_keys_resolved(self, obj):
-        """Return ordered SpecKey objects based on spec_layout."""
-        spec_keys = obj.get_spec_keys()
-        return SpecKeySerializer(spec_keys, many=True).data
+        """Return ordered SpecKeys of spec_layout, from the catalog snapshot."""
+        from .catalog_snapshot import get_catalog_snapshot
+
+        return get_catalog_snapshot().resolve_spec_keys(obj.spec_layout)
 
 
 # =============================================================================
@@ -925,11 +952,46 @@ class ProductDetailSerializer(serializers.ModelSerializer):
 # =============================================================================
 
 
+def resolve_single_products(series_list) -> dict:
+    """
+    Single active product of each series with exactly one, by series id.
+
+    Series need the ``_product_count`` annotation. Two queries for any
+    number of series: the products, then their media. Each product gets
+    ``_hero_media_id`` and ``_hero_media_kind`` (primary image, else the
+    first by sort order, as ``Product.primary_image``). Pass the result to NavSeriesSerializer as
+    the ``single_products`` context entry.
+    """
+    series_ids = [s.pk for s in series_list if getattr(s, "_product_count", None) == 1]
+    if not series_ids:
+        return {}
+
+    products = {}
+    for product in Product.objects.filter(series_id__in=series_ids, status="active").only(
+        "id", "series_id", "slug", "title_tr", "name"
+    ):
+        product._hero_media_id = None
+        product._hero_media_kind = None
+        products.setdefault(product.series_id, product)
+
+    by_id = {product.pk: product for product in products.values()}
+    # Same order as the listing's hero media (listing._hero_media_ids)
+    for product_id, media_id, kind in ProductMedia.objects.filter(product_id__in=by_id).order_by(
+        "product_id", "-is_primary", "sort_order", "id"
+    ).values_list("product_id", "media_id", "media__kind"):
+        if by_id[product_id]._hero_media_id is None:
+            by_id[product_id]._hero_media_id = media_id
+            by_id[product_id]._hero_media_kind = kind
+    return products
+
+
 class NavSeriesSerializer(serializers.ModelSerializer):
     """
     Minimal series serializer for navigation.
 
     Includes visibility flag so frontend can filter single-product series.
+    Single products are read from the ``single_products`` context entry
+    (see ``resolve_single_products``) when given, else queried per series.
     """
 
     products_count = serializers.SerializerMethodField()
@@ -971,6 +1033,10 @@ class NavSeriesSerializer(serializers.ModelSerializer):
         Caches the result on the serializer instance to avoid
         repeated queries for slug, name, and image URL fields.
         """
+        resolved = self.context.get("single_products")
+        if resolved is not None:
+            return resolved.get(obj.pk)
+
         cache_attr = f"_cached_single_product_{obj.pk}"
         if hasattr(self, cache_attr):
             return getattr(self, cache_attr)
@@ -1005,9 +1071,13 @@ class NavSeriesSerializer(serializers.ModelSerializer):
         """Return product primary image URL if series contains exactly one active product."""
         product = self._get_single_product(obj)
         if product:
-            img = product.primary_image
-            if img:
-                return f"/api/v1/media/{img.id}/file/"
+            if hasattr(product, "_hero_media_id"):
+                media_id, kind = product._hero_media_id, product._hero_media_kind
+            else:
+                img = product.primary_image
+                media_id, kind = (img.id, img.kind) if img else (None, None)
+            if media_id:
+                return card_image_url(media_id, kind)
         return None
 
 
@@ -1,7 +1,6 @@
 
 import json
 import logging
-import hashlib
 import requests
 import uuid
 from decimal import Decimal
@@ -11,6 +10,8 @@ from django.core.cache import cache
 from django.db import transaction
 from django.utils.text import slugify
 
+from apps.catalog.cache_keys import deferred_invalidation
+from apps.catalog.listing import deferred_listing_refresh
 from apps.catalog.models import (
     Product, 
     Variant, 
@@ -58,6 +59,7 @@ class JsonImportService:
             "variants_created": 0,
             "variants_updated": 0,
             "images_processed": 0,
+            "images_deduplicated": 0,
             "errors": [],
             "created_product_ids": [], # Track for undo
         }
@@ -69,7 +71,7 @@ class JsonImportService:
 
     def process(self) -> Dict[str, Any]:
         try:
-            with transaction.atomic():
+            with transaction.atomic(), deferred_invalidation(), deferred_listing_refresh():
                 for index, item in enumerate(self.data):
                     try:
                         self._process_product(item, index)
@@ -304,18 +306,25 @@ class JsonImportService:
             if not media_content:
                 continue
 
-            file_hash = hashlib.sha256(media_content).hexdigest()
-            media = Media.objects.filter(checksum_sha256=file_hash).first()
-            
-            if not media:
-                media = Media(
-                    kind=Media.Kind.IMAGE,
-                    filename=filename,
-                    content_type="image/jpeg", 
-                    bytes=media_content
-                )
-                media.save()
+            media, created = Media.get_or_create_by_content(
+                media_content,
+                kind=Media.Kind.IMAGE,
+                filename=filename,
+                content_type="image/jpeg",
+            )
+            if created:
                 self.stats["images_processed"] += 1
+            else:
+                self.stats["images_deduplicated"] += 1
+
+            # Same content already linked under another filename
+            linked = product.product_media.filter(media=media).first()
+            if linked:
+                linked.is_primary = is_primary
+                linked.sort_order = order
+                linked.alt = alt
+                linked.save()
+                continue
 
             ProductMedia.objects.create(
                 product=product,
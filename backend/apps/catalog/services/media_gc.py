@@ -0,0 +1,314 @@
+"""
+Mark-and-sweep garbage collection for unreferenced Media.
+
+Mark: every foreign key pointing at Media (discovered from the model, so
+catalog, blog, ops and common references are all covered) plus media URLs
+embedded in rich text and site settings.
+
+Sweep: Media rows that are not marked and are older than the grace period
+are deleted in bounded batches. References are re-checked per batch inside
+the delete transaction, so media linked while the collector runs is kept.
+Each removal is recorded in AuditLog; blobs are removed by the Media
+post_delete signal once no row shares their checksum.
+
+Import jobs keep their input and snapshot files alive. With
+``release_import_files_after`` set, files of finished import jobs older
+than that are no longer treated as references (the job keeps its row,
+the file link is cleared by on_delete=SET_NULL).
+"""
+
+import logging
+import re
+import uuid
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.catalog.cache_keys import MEDIA_UNREFERENCED_COUNT_TTL, media_unreferenced_count_key
+from apps.catalog.models import Media
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GRACE_PERIOD = timedelta(hours=24)
+DEFAULT_BATCH_SIZE = 100
+
+# /api/v1/media/<uuid>/file/ links inside free text
+MEDIA_URL_RE = re.compile(r"/media/([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})")
+
+# Text/JSON fields that may embed media URLs: (app_label.Model, fields)
+TEXT_REFERENCES = [
+    ("blog.BlogPost", ("content", "excerpt")),
+    ("catalog.Product", ("long_description",)),
+    ("common.SiteSetting", ("value",)),
+]
+
+# Import job files that may be released once the job is finished
+IMPORT_FILE_FIELDS = ("input_file", "snapshot_file")
+FINISHED_IMPORT_STATUSES = ("success", "failed", "partial")
+
+
+def media_foreign_keys():
+    """Return (model, field_name, nullable) for every FK that points at Media."""
+    relations = []
+    for rel in Media._meta.get_fields(include_hidden=True):
+        if not rel.auto_created or rel.concrete:
+            continue
+        if not (rel.one_to_many or rel.one_to_one):
+            continue
+        relations.append((rel.related_model, rel.field.name, rel.field.null))
+    return relations
+
+
+class MediaGarbageCollector:
+    """
+    Find and delete Media rows nothing refers to.
+
+    Usage:
+        gc = MediaGarbageCollector(grace_period=timedelta(hours=24))
+        report = gc.collect(dry_run=True)
+    """
+
+    def __init__(
+        self,
+        grace_period: timedelta = DEFAULT_GRACE_PERIOD,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_delete: int = 0,
+        release_import_files_after: Optional[timedelta] = None,
+        actor=None,
+        request=None,
+    ):
+        self.grace_period = grace_period
+        self.batch_size = max(1, batch_size)
+        self.max_delete = max_delete
+        self.release_import_files_after = release_import_files_after
+        self.actor = actor
+        self.request = request
+        self.run_id = str(uuid.uuid4())
+
+    # ------------------------------------------------------------------
+    # Mark
+    # ------------------------------------------------------------------
+
+    def _reference_querysets(self, media_ids: Optional[Iterable] = None):
+        """Yield (label, queryset of referenced media ids) for every FK."""
+        ImportJob = apps.get_model("ops", "ImportJob")
+        release_before = None
+        if self.release_import_files_after is not None:
+            release_before = timezone.now() - self.release_import_files_after
+
+        for model, field_name, _nullable in media_foreign_keys():
+            attname = model._meta.get_field(field_name).attname
+            qs = model._default_manager.exclude(**{f"{attname}__isnull": True})
+            if media_ids is not None:
+                qs = qs.filter(**{f"{attname}__in": media_ids})
+            if (
+                release_before is not None
+                and model is ImportJob
+                and field_name in IMPORT_FILE_FIELDS
+            ):
+                qs = qs.exclude(
+                    status__in=FINISHED_IMPORT_STATUSES, created_at__lt=release_before
+                )
+            label = f"{model._meta.label}.{field_name}"
+            yield label, qs.values_list(attname, flat=True).distinct()
+
+    def _text_references(self) -> Set[str]:
+        found = set()
+        for model_label, fields in TEXT_REFERENCES:
+            try:
+                model = apps.get_model(model_label)
+            except LookupError:
+                continue
+            for values in model._default_manager.values_list(*fields).iterator(chunk_size=500):
+                for value in values:
+                    if value:
+                        found.update(m.lower() for m in MEDIA_URL_RE.findall(str(value)))
+        return found
+
+    def mark(self) -> Dict[str, object]:
+        """Return the referenced media ids and per-reference counts."""
+        referenced: Set[str] = set()
+        counts = {}
+        for label, ids in self._reference_querysets():
+            ids = {str(media_id) for media_id in ids}
+            counts[label] = len(ids)
+            referenced |= ids
+
+        text_ids = self._text_references()
+        counts["text"] = len(text_ids)
+        referenced |= text_ids
+        return {"ids": referenced, "counts": counts}
+
+    # ------------------------------------------------------------------
+    # Sweep
+    # ------------------------------------------------------------------
+
+    def find_garbage(self, referenced: Set[str]) -> List[dict]:
+        """Unreferenced media older than the grace period, oldest first."""
+        cutoff = timezone.now() - self.grace_period
+        rows = (
+            Media.objects.filter(created_at__lt=cutoff)
+            .order_by("created_at")
+            .values("id", "filename", "kind", "size_bytes", "checksum_sha256", "created_at")
+        )
+        return [row for row in rows.iterator(chunk_size=1000) if str(row["id"]) not in referenced]
+
+    def _reclaimable_bytes(self, garbage: List[dict]) -> int:
+        """Bytes freed by deleting ``garbage``; blobs shared with kept rows stay."""
+        garbage_ids = {row["id"] for row in garbage}
+        kept_checksums = set()
+        for offset in range(0, len(garbage), 1000):
+            checksums = {row["checksum_sha256"] for row in garbage[offset:offset + 1000]}
+            for media_id, checksum in Media.objects.filter(
+                checksum_sha256__in=checksums
+            ).values_list("id", "checksum_sha256"):
+                if media_id not in garbage_ids:
+                    kept_checksums.add(checksum)
+
+        freed = {}
+        for row in garbage:
+            if row["checksum_sha256"] not in kept_checksums:
+                freed[row["checksum_sha256"]] = row["size_bytes"] or 0
+        return sum(freed.values())
+
+    def _still_referenced(self, ids: List) -> Set[str]:
+        referenced = set()
+        for _label, qs in self._reference_querysets(media_ids=ids):
+            referenced.update(str(media_id) for media_id in qs)
+        return referenced
+
+    def _delete_batch(self, batch: List[dict]) -> List[dict]:
+        from apps.ops.models import AuditLog
+
+        with transaction.atomic():
+            ids = [row["id"] for row in batch]
+            locked = set(
+                str(media_id)
+                for media_id in Media.objects.select_for_update()
+                .filter(id__in=ids)
+                .values_list("id", flat=True)
+            )
+            # Linked after the mark phase: keep
+            keep = self._still_referenced(ids)
+            doomed = [row for row in batch if str(row["id"]) in locked and str(row["id"]) not in keep]
+            if not doomed:
+                return []
+
+            Media.objects.filter(id__in=[row["id"] for row in doomed]).delete()
+            AuditLog.objects.bulk_create(
+                [self._audit_entry(AuditLog, row) for row in doomed]
+            )
+        return doomed
+
+    def _audit_entry(self, AuditLog, row):
+        ip_address = None
+        user_agent = ""
+        if self.request is not None:
+            forwarded = self.request.META.get("HTTP_X_FORWARDED_FOR")
+            ip_address = (
+                forwarded.split(",")[0].strip() if forwarded else self.request.META.get("REMOTE_ADDR")
+            )
+            user_agent = self.request.META.get("HTTP_USER_AGENT", "")[:512]
+
+        return AuditLog(
+            actor=self.actor,
+            actor_email=self.actor.email if self.actor else "",
+            action=AuditLog.Action.MEDIA_DELETE,
+            entity_type="media",
+            entity_id=str(row["id"]),
+            entity_label=row["filename"][:255],
+            before_json={
+                "kind": row["kind"],
+                "size_bytes": row["size_bytes"],
+                "checksum_sha256": row["checksum_sha256"],
+            },
+            metadata={"reason": "garbage_collection", "gc_run_id": self.run_id},
+            ip_address=ip_address,
+            user_agent=user_agent,
+        )
+
+    def collect(self, dry_run: bool = True) -> dict:
+        """
+        Run mark and (unless ``dry_run``) sweep. Returns a report dict.
+        """
+        marked = self.mark()
+        garbage = self.find_garbage(marked["ids"])
+        if self.max_delete:
+            garbage = garbage[: self.max_delete]
+
+        report = {
+            "run_id": self.run_id,
+            "dry_run": dry_run,
+            "grace_period_hours": self.grace_period.total_seconds() / 3600,
+            "referenced": len(marked["ids"]),
+            "references": marked["counts"],
+            "candidates": len(garbage),
+            "candidate_bytes": sum(row["size_bytes"] or 0 for row in garbage),
+            "reclaimable_bytes": self._reclaimable_bytes(garbage),
+            "deleted": 0,
+            "deleted_bytes": 0,
+            "batches": 0,
+        }
+        if dry_run:
+            report["sample"] = [
+                {
+                    "id": str(row["id"]),
+                    "filename": row["filename"],
+                    "kind": row["kind"],
+                    "size_bytes": row["size_bytes"],
+                    "created_at": row["created_at"].isoformat(),
+                }
+                for row in garbage[:50]
+            ]
+            return report
+
+        for offset in range(0, len(garbage), self.batch_size):
+            deleted = self._delete_batch(garbage[offset:offset + self.batch_size])
+            report["batches"] += 1
+            report["deleted"] += len(deleted)
+            report["deleted_bytes"] += sum(row["size_bytes"] or 0 for row in deleted)
+
+        if report["deleted"]:
+            try:
+                cache.delete(media_unreferenced_count_key())
+            except Exception as e:
+                logger.warning(f"Failed to reset unreferenced media count: {e}")
+
+        logger.info(
+            f"Media GC {self.run_id}: deleted {report['deleted']} of {report['candidates']} "
+            f"candidates ({report['deleted_bytes']} bytes) in {report['batches']} batches"
+        )
+        return report
+
+
+def unreferenced_media_count() -> int:
+    """
+    Number of Media rows nothing refers to, for the admin dashboard.
+
+    Counting takes a full mark, so the result is cached for
+    ``MEDIA_UNREFERENCED_COUNT_TTL`` and may lag behind recent changes.
+    """
+    key = media_unreferenced_count_key()
+    try:
+        count = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Unreferenced media count read failed: {e}")
+        count = None
+    if count is not None:
+        return count
+
+    referenced = MediaGarbageCollector().mark()["ids"]
+    count = sum(
+        1
+        for media_id in Media.objects.values_list("id", flat=True).iterator()
+        if str(media_id) not in referenced
+    )
+    try:
+        cache.set(key, count, MEDIA_UNREFERENCED_COUNT_TTL)
+    except Exception as e:
+        logger.warning(f"Unreferenced media count write failed: {e}")
+    return count
@@ -1,11 +1,14 @@
 """
 Django signals for catalog cache invalidation.
 
-Automatically clears relevant caches when models are saved or deleted.
+Automatically clears relevant caches when models are saved or deleted,
+and keeps the ProductListing read model in step with product changes.
 """
 
 import logging
 
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
@@ -13,6 +16,8 @@ from .cache_keys import (
     clear_nav_cache,
     clear_taxonomy_cache,
     clear_spec_keys_cache,
+    clear_product_detail_cache,
+    clear_product_details,
 )
 
 logger = logging.getLogger(__name__)
@@ -99,3 +104,260 @@ def invalidate_product_cache(sender, instance, **kwargs):
         clear_nav_cache()
     except Exception as e:
         logger.warning(f"Failed to clear cache after Product change: {e}")
+
+
+@receiver(post_save, sender="catalog.Media")
+@receiver(post_delete, sender="catalog.Media")
+def invalidate_media_hot_cache(sender, instance, **kwargs):
+    """Drop the hot-cache entry of a rewritten or deleted Media row."""
+    if not is_app_ready():
+        return
+
+    try:
+        from .media_cache import get_media_hot_cache
+
+        get_media_hot_cache().invalidate(instance.pk)
+    except Exception as e:
+        logger.warning(f"Failed to clear media hot cache for {instance.pk}: {e}")
+
+
+@receiver(post_delete, sender="catalog.Media")
+def delete_orphaned_media_blob(sender, instance, **kwargs):
+    """Remove the stored blob once no Media row references its checksum."""
+    if not is_app_ready() or not instance.is_in_blob_store:
+        return
+
+    from .media_storage import get_media_store, lock_blob_for_delete
+
+    store = get_media_store()
+    checksum = instance.checksum_sha256
+    if store is None or not checksum:
+        return
+    using = kwargs.get("using", DEFAULT_DB_ALIAS)
+
+    def _delete_blob():
+        try:
+            with transaction.atomic(using=using):
+                # An upload of the same content may have found the blob and
+                # not committed its row yet; it is left to that upload
+                if not lock_blob_for_delete(checksum, using):
+                    return
+                if not sender.objects.using(using).filter(checksum_sha256=checksum).exists():
+                    store.delete(checksum)
+                    logger.debug(f"Deleted orphaned media blob {checksum}")
+        except Exception as e:
+            logger.warning(f"Failed to delete media blob {checksum}: {e}")
+
+    # Only touch the filesystem once the delete is durable
+    transaction.on_commit(_delete_blob)
+
+
+# =============================================================================
+# ProductListing read model
+# =============================================================================
+# These handlers do not swallow errors: the listing row is written inside the
+# caller's transaction and must not drift from the product it describes.
+
+
+def _deleting_products(origin) -> bool:
+    """True when a delete cascades from Products (their listing rows go too)."""
+    from django.db.models import QuerySet
+
+    from .models import Product
+
+    if isinstance(origin, QuerySet):
+        return origin.model is Product
+    return isinstance(origin, Product)
+
+
+@receiver(post_save, sender="catalog.Product")
+def refresh_product_listing(sender, instance, **kwargs):
+    """Upsert (or drop, when no longer active) the product's listing row."""
+    if not is_app_ready():
+        return
+
+    from .listing import refresh_listings
+
+    refresh_listings([instance.pk])
+
+
+@receiver(post_save, sender="catalog.Variant")
+@receiver(post_delete, sender="catalog.Variant")
+@receiver(post_save, sender="catalog.ProductMedia")
+@receiver(post_delete, sender="catalog.ProductMedia")
+def refresh_parent_product_listing(sender, instance, origin=None, **kwargs):
+    """Recompute price, stock, variant count and hero image of the parent product."""
+    if not is_app_ready() or _deleting_products(origin):
+        return
+
+    from .listing import refresh_listings
+
+    refresh_listings([instance.product_id])
+
+
+@receiver(post_save, sender="catalog.Series")
+def refresh_series_product_listings(sender, instance, created=False, **kwargs):
+    """Series category and order are copied onto the listing rows."""
+    if not is_app_ready() or created:
+        return
+
+    from .listing import refresh_listings
+
+    refresh_listings(instance.products.values_list("id", flat=True))
+
+
+@receiver(post_save, sender="catalog.Category")
+def refresh_category_product_listings(sender, instance, created=False, **kwargs):
+    """Category names are part of the listing search document."""
+    if not is_app_ready() or created:
+        return
+
+    from .listing import refresh_listings
+    from .models import Product
+
+    refresh_listings(
+        Product.objects.filter(
+            Q(category=instance) | Q(series__category=instance)
+        ).values_list("id", flat=True)
+    )
+
+
+# =============================================================================
+# PLP response cache
+# =============================================================================
+# Product, variant and media changes invalidate their categories through
+# apps.catalog.listing; the handlers below cover what the listing does not see.
+
+
+@receiver(post_delete, sender="catalog.Product")
+def invalidate_plp_cache_for_product(sender, instance, **kwargs):
+    """A deleted product's listing row cascades away without a refresh."""
+    if not is_app_ready():
+        return
+
+    from .models import Series
+    from .plp_cache import invalidate_plp_categories
+
+    try:
+        category_ids = [instance.category_id]
+        category_ids += Series.objects.filter(id=instance.series_id).values_list(
+            "category_id", flat=True
+        )
+        invalidate_plp_categories(category_ids)
+    except Exception as e:
+        logger.warning(f"Failed to clear PLP cache after Product delete: {e}")
+
+
+@receiver(post_save, sender="catalog.Category")
+@receiver(post_delete, sender="catalog.Category")
+def invalidate_plp_cache_for_category(sender, instance, **kwargs):
+    """Tree changes move subtrees, facets and breadcrumbs: drop every PLP response."""
+    if not is_app_ready():
+        return
+
+    from .plp_cache import ALL_TAG, invalidate_plp_tags
+
+    invalidate_plp_tags([ALL_TAG])
+
+
+@receiver(post_save, sender="catalog.Brand")
+@receiver(post_delete, sender="catalog.Brand")
+def invalidate_plp_cache_for_brand(sender, instance, **kwargs):
+    """Brand name, logo and visibility appear in PLP facets and product cards."""
+    if not is_app_ready():
+        return
+
+    from .plp_cache import brand_tag, invalidate_plp_tags
+
+    invalidate_plp_tags([brand_tag(instance.pk)])
+
+
+@receiver(post_save, sender="catalog.CategoryCatalog")
+@receiver(post_delete, sender="catalog.CategoryCatalog")
+def invalidate_plp_cache_for_catalog(sender, instance, **kwargs):
+    """Catalog-mode PLP responses list the category's catalogs."""
+    if not is_app_ready():
+        return
+
+    from .plp_cache import category_tag, invalidate_plp_tags
+
+    invalidate_plp_tags([category_tag(instance.category_id)])
+
+
+@receiver(post_save, sender="catalog.SpecKey")
+def reindex_spec_key_facets(sender, instance, created=False, **kwargs):
+    """Facet flag, value type or buckets may have changed: rebuild the key's index rows."""
+    from .spec_index import is_indexed, reindex_spec_key
+
+    if not is_app_ready() or (created and not is_indexed(instance)):
+        return
+
+    from .plp_cache import ALL_TAG, invalidate_plp_tags
+
+    reindex_spec_key(instance)
+    invalidate_plp_tags([ALL_TAG])
+
+
+@receiver(post_delete, sender="catalog.SpecKey")
+def invalidate_plp_cache_for_spec_key(sender, instance, **kwargs):
+    """A deleted indexed key disappears from every PLP response."""
+    if not is_app_ready() or not (instance.is_facetable or instance.is_numeric):
+        return
+
+    from .plp_cache import ALL_TAG, invalidate_plp_tags
+
+    invalidate_plp_tags([ALL_TAG])
+
+
+# =============================================================================
+# Typeahead suggestions
+# =============================================================================
+# Product and variant changes retire the suggestion snapshot through
+# apps.catalog.listing; the handler below covers what the listing does not see.
+
+
+@receiver(post_delete, sender="catalog.Product")
+@receiver(post_save, sender="catalog.Series")
+@receiver(post_delete, sender="catalog.Series")
+@receiver(post_save, sender="catalog.Brand")
+@receiver(post_delete, sender="catalog.Brand")
+def invalidate_suggest_snapshot(sender, instance, **kwargs):
+    """Series and brand names, and deleted products, appear in suggestions."""
+    if not is_app_ready():
+        return
+
+    from .suggest import invalidate_suggest_index
+
+    invalidate_suggest_index()
+
+
+# =============================================================================
+# Product detail documents
+# =============================================================================
+# Product, variant, product media, series and category changes retire the
+# documents of the affected products through apps.catalog.listing; spec
+# key and taxonomy changes retire all of them through cache_keys. The
+# handlers below cover what neither sees.
+
+
+@receiver(post_save, sender="catalog.Brand")
+@receiver(post_delete, sender="catalog.Brand")
+def invalidate_product_detail_documents(sender, instance, **kwargs):
+    """Brand names and logos appear in product details."""
+    if not is_app_ready():
+        return
+
+    clear_product_detail_cache()
+
+
+@receiver(post_save, sender="catalog.Media")
+def invalidate_media_product_details(sender, instance, created, **kwargs):
+    """Media metadata appears in the details of the products showing it."""
+    if created or not is_app_ready():
+        return
+
+    from .models import ProductMedia
+
+    clear_product_details(
+        ProductMedia.objects.filter(media_id=instance.pk).values_list("product_id", flat=True)
+    )
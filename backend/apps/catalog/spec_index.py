@@ -0,0 +1,238 @@
+"""
+Spec value index behind the PLP attribute facets and range filters.
+
+Facetable spec keys (``SpecKey.is_facetable``) and numeric spec keys
+(``SpecKey.value_type`` int/decimal) are indexed per product in
+ProductSpecValue, so facet counts, attribute filters and numeric range
+filters are served by an index instead of scanning or casting
+``Variant.specs`` JSON per key and request.
+
+``index_product_specs`` is called from ``listing._refresh_chunk`` and so
+follows every Product/Variant change (saves and imports alike);
+``reindex_spec_key`` runs when a spec key's facet settings or value type
+change.
+"""
+
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, Optional
+
+from django.db.models import Q
+
+from .models import Product, ProductSpecValue, SpecKey, Variant
+
+# Leading number of a spec value such as "600", "600 mm" or "2,5 kW"
+NUMBER_RE = re.compile(r"^\s*(-?\d+(?:[.,]\d+)?)")
+
+BUCKET_SEPARATOR = ".."
+
+NUMERIC_VALUE_TYPES = (SpecKey.ValueType.INT, SpecKey.ValueType.DECIMAL)
+
+# ProductSpecValue.numeric_value is DecimalField(max_digits=18, decimal_places=4)
+NUMERIC_VALUE_PLACES = Decimal("0.0001")
+NUMERIC_VALUE_LIMIT = Decimal(10) ** 14
+
+
+def indexed_spec_keys():
+    """Spec keys whose values are kept in ProductSpecValue."""
+    return SpecKey.objects.filter(Q(is_facetable=True) | Q(value_type__in=NUMERIC_VALUE_TYPES))
+
+
+def is_indexed(spec_key: SpecKey) -> bool:
+    return spec_key.is_facetable or spec_key.is_numeric
+
+
+def parse_spec_number(raw) -> Optional[Decimal]:
+    """Parse the leading number of a spec value (decimal comma allowed)."""
+    if isinstance(raw, bool) or raw is None:
+        return None
+    if isinstance(raw, (int, float, Decimal)):
+        text = str(raw)
+    else:
+        match = NUMBER_RE.match(str(raw))
+        if not match:
+            return None
+        text = match.group(1).replace(",", ".")
+    try:
+        number = Decimal(text)
+    except InvalidOperation:
+        return None
+    return number if number.is_finite() else None
+
+
+def format_spec_number(number: Decimal) -> str:
+    """Canonical text of a number: no exponent, no trailing zeros."""
+    text = format(number, "f")
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return text
+
+
+def to_numeric_value(number: Decimal) -> Optional[Decimal]:
+    """
+    ``number`` rounded to the numeric_value column, or None if it does not fit.
+
+    Values such as barcodes entered under a numeric key would overflow the
+    column and fail the whole listing refresh; they are indexed as text only.
+    """
+    if abs(number) >= NUMERIC_VALUE_LIMIT:
+        return None
+    return number.quantize(NUMERIC_VALUE_PLACES)
+
+
+def normalize_spec_value(spec_key: SpecKey, raw) -> Optional[tuple[str, Optional[Decimal]]]:
+    """Return (value, numeric_value) for an indexed spec value, or None if empty."""
+    if raw is None or isinstance(raw, (dict, list)):
+        return None
+    if isinstance(raw, bool):
+        return ("true" if raw else "false"), None
+
+    if spec_key.is_numeric:
+        number = parse_spec_number(raw)
+        numeric_value = to_numeric_value(number) if number is not None else None
+        if numeric_value is not None:
+            return format_spec_number(numeric_value), numeric_value
+
+    text = str(raw).strip()
+    if not text:
+        return None
+    return text[:255], None
+
+
+def _spec_rows(spec_keys: list, variant_specs: Iterable) -> list:
+    rows = {}
+    for product_id, specs in variant_specs:
+        if not isinstance(specs, dict):
+            continue
+        for spec_key in spec_keys:
+            normalized = normalize_spec_value(spec_key, specs.get(spec_key.slug))
+            if normalized is None:
+                continue
+            value, numeric_value = normalized
+            rows[(spec_key.id, value, product_id)] = ProductSpecValue(
+                spec_key_id=spec_key.id,
+                product_id=product_id,
+                value=value,
+                numeric_value=numeric_value,
+            )
+    return list(rows.values())
+
+
+def index_product_specs(product_ids: list, active_ids: Iterable) -> None:
+    """Replace the indexed spec values of ``product_ids`` (active ones only)."""
+    ProductSpecValue.objects.filter(product_id__in=product_ids).delete()
+    active_ids = list(active_ids)
+    if not active_ids:
+        return
+    spec_keys = list(indexed_spec_keys())
+    if not spec_keys:
+        return
+
+    variant_specs = (
+        Variant.objects.filter(product_id__in=active_ids)
+        .exclude(Q(specs__isnull=True) | Q(specs={}))
+        .values_list("product_id", "specs")
+    )
+    ProductSpecValue.objects.bulk_create(_spec_rows(spec_keys, variant_specs), batch_size=1000)
+
+
+def reindex_spec_key(spec_key: SpecKey) -> int:
+    """Rebuild the index rows of one spec key. Returns the row count."""
+    ProductSpecValue.objects.filter(spec_key=spec_key).delete()
+    if not is_indexed(spec_key):
+        return 0
+
+    variant_specs = (
+        Variant.objects.filter(
+            product__status=Product.Status.ACTIVE,
+            specs__has_key=spec_key.slug,
+        )
+        .values_list("product_id", "specs")
+        .iterator(chunk_size=2000)
+    )
+    rows = _spec_rows([spec_key], variant_specs)
+    ProductSpecValue.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+# =============================================================================
+# Buckets
+# =============================================================================
+
+
+def spec_buckets(spec_key: SpecKey) -> list[Decimal]:
+    """Ascending numeric bucket boundaries of a spec key (empty: no buckets)."""
+    if not spec_key.is_numeric or not isinstance(spec_key.facet_buckets, list):
+        return []
+    bounds = [parse_spec_number(bound) for bound in spec_key.facet_buckets]
+    return sorted({bound for bound in bounds if bound is not None})
+
+
+def bucket_value(low: Optional[Decimal], high: Optional[Decimal]) -> str:
+    """Facet value of a bucket: "..600", "600..900" or "900.."."""
+    low_text = format_spec_number(low) if low is not None else ""
+    high_text = format_spec_number(high) if high is not None else ""
+    return f"{low_text}{BUCKET_SEPARATOR}{high_text}"
+
+
+def bucket_label(low: Optional[Decimal], high: Optional[Decimal], unit: str = "") -> str:
+    suffix = f" {unit}" if unit else ""
+    if low is None:
+        return f"< {format_spec_number(high)}{suffix}"
+    if high is None:
+        return f"≥ {format_spec_number(low)}{suffix}"
+    return f"{format_spec_number(low)} – {format_spec_number(high)}{suffix}"
+
+
+def bucket_ranges(bounds: list[Decimal]) -> list[tuple[Optional[Decimal], Optional[Decimal]]]:
+    """Half-open [low, high) ranges covering all numbers for ``bounds``."""
+    edges = [None, *bounds, None]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def parse_bucket_value(value: str) -> Optional[tuple[Optional[Decimal], Optional[Decimal]]]:
+    """
+    Parse "low..high" (either side optional) as used by buckets and range
+    filters; None when ``value`` is not a valid range.
+    """
+    if BUCKET_SEPARATOR not in value:
+        return None
+    low_text, high_text = value.split(BUCKET_SEPARATOR, 1)
+    low = parse_spec_number(low_text) if low_text else None
+    high = parse_spec_number(high_text) if high_text else None
+    if (low_text and low is None) or (high_text and high is None) or (low is None and high is None):
+        return None
+    return low, high
+
+
+def spec_filter_product_ids(spec_key: SpecKey, value: str):
+    """Product ids (subquery) whose indexed ``spec_key`` value matches ``value``."""
+    qs = ProductSpecValue.objects.filter(spec_key=spec_key)
+    bucket = parse_bucket_value(value) if spec_key.is_numeric else None
+    if bucket is not None:
+        low, high = bucket
+        if low is not None:
+            qs = qs.filter(numeric_value__gte=low)
+        if high is not None:
+            qs = qs.filter(numeric_value__lt=high)
+    else:
+        normalized = normalize_spec_value(spec_key, value)
+        if normalized is None:
+            return qs.none().values("product_id")
+        qs = qs.filter(value=normalized[0])
+    return qs.values("product_id")
+
+
+# =============================================================================
+# Range filters
+# =============================================================================
+
+
+def spec_range_product_ids(spec_key: SpecKey, low: Optional[Decimal], high: Optional[Decimal]):
+    """Product ids (subquery) with a ``spec_key`` value in [low, high] (inclusive)."""
+    qs = ProductSpecValue.objects.filter(spec_key=spec_key, numeric_value__isnull=False)
+    if low is not None:
+        qs = qs.filter(numeric_value__gte=low)
+    if high is not None:
+        qs = qs.filter(numeric_value__lte=high)
+    return qs.values("product_id")
@@ -0,0 +1,189 @@
+"""
+Stale-while-revalidate cache for expensive catalog trees.
+
+Navigation, the category tree, taxonomy trees and the spec key list are
+costly to build and are requested by every page. A plain cache entry makes
+every concurrent request rebuild them at once when it expires or when a
+catalog change moves its namespace to a new generation.
+
+Entries here store a soft expiry next to the value and live in Redis a
+while longer (``STALE_GRACE_TTL``). The last built value of each tree is
+also kept under a key that does not change with generations
+(``stale_copy_key``). A request that finds no fresh entry tries to take a
+short rebuild lock: the winner rebuilds, the others serve the stale copy.
+Without any stale copy (cold cache) they wait briefly for the winner and
+build themselves only if it does not finish in time.
+
+Hit, stale hit, miss and rebuild counters per key family are kept in Redis
+so they cover all workers (see ``cache_stats``).
+"""
+
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from django.core.cache import cache
+
+from .cache_keys import (
+    REBUILD_LOCK_TTL,
+    STALE_COPY_TTL,
+    STALE_GRACE_TTL,
+    cache_stats_key,
+    rebuild_lock_key,
+)
+
+logger = logging.getLogger(__name__)
+
+# Key families with counters
+NAV_FAMILY = "nav"
+CATEGORIES_TREE_FAMILY = "categories_tree"
+TAXONOMY_TREE_FAMILY = "taxonomy_tree"
+SPEC_KEYS_FAMILY = "spec_keys"
+FAMILIES = (NAV_FAMILY, CATEGORIES_TREE_FAMILY, TAXONOMY_TREE_FAMILY, SPEC_KEYS_FAMILY)
+
+COUNTERS = ("hits", "stale_hits", "misses", "rebuilds", "lock_waits", "rebuild_ms")
+
+# How long a request without a stale copy waits for another one's rebuild
+LOCK_WAIT_SECONDS = 2.0
+LOCK_POLL_SECONDS = 0.05
+
+
+def _count(family: str, counter: str, amount: int = 1) -> None:
+    key = cache_stats_key(family, counter)
+    try:
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            # Missing counter; a concurrent request may add it first
+            if not cache.add(key, amount, timeout=None):
+                cache.incr(key, amount)
+    except Exception as e:
+        logger.warning(f"Catalog cache counter {key} failed: {e}")
+
+
+def _read(key: str) -> Optional[dict]:
+    try:
+        entry = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Catalog cache read of {key} failed: {e}")
+        return None
+    return entry if isinstance(entry, dict) and "fresh_until" in entry else None
+
+
+def _acquire(lock_key: str) -> bool:
+    try:
+        return cache.add(lock_key, 1, timeout=REBUILD_LOCK_TTL)
+    except Exception as e:
+        # Without a cache there is nothing to coordinate on: build
+        logger.warning(f"Catalog cache lock {lock_key} failed: {e}")
+        return True
+
+
+def _release(lock_key: str) -> None:
+    try:
+        cache.delete(lock_key)
+    except Exception as e:
+        logger.warning(f"Catalog cache unlock {lock_key} failed: {e}")
+
+
+def _wait_for_rebuild(key: str) -> Optional[dict]:
+    deadline = time.monotonic() + LOCK_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_SECONDS)
+        entry = _read(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def get_or_build(
+    family: str,
+    key: str,
+    build: Callable[[], Any],
+    ttl: int,
+    stale_key: Optional[str] = None,
+) -> tuple[Any, bool]:
+    """
+    Value of ``key``, rebuilt by one request at a time once it is stale.
+
+    Returns ``(value, fresh)``; ``fresh`` is False when a stale copy was
+    served while another request rebuilds, so callers should not keep it.
+    ``build`` may return None (nothing to cache, e.g. an unknown series).
+    """
+    entry = _read(key)
+    if entry is not None and entry["fresh_until"] > time.time():
+        _count(family, "hits")
+        return entry["value"], True
+
+    stale = entry
+    if stale is None and stale_key is not None:
+        stale = _read(stale_key)
+
+    lock_key = rebuild_lock_key(key)
+    locked = _acquire(lock_key)
+    if not locked:
+        if stale is not None:
+            _count(family, "stale_hits")
+            return stale["value"], False
+        _count(family, "lock_waits")
+        entry = _wait_for_rebuild(key)
+        if entry is not None:
+            _count(family, "hits")
+            return entry["value"], True
+
+    _count(family, "misses")
+    try:
+        started = time.monotonic()
+        value = build()
+        _count(family, "rebuilds")
+        _count(family, "rebuild_ms", int((time.monotonic() - started) * 1000))
+        if value is not None:
+            entry = {"value": value, "fresh_until": time.time() + ttl}
+            try:
+                cache.set(key, entry, ttl + STALE_GRACE_TTL)
+                if stale_key is not None:
+                    cache.set(stale_key, entry, STALE_COPY_TTL)
+            except Exception as e:
+                logger.warning(f"Catalog cache write of {key} failed: {e}")
+        return value, True
+    finally:
+        if locked:
+            _release(lock_key)
+
+
+def cache_stats() -> dict:
+    """Counters per key family, with hit ratio and mean rebuild time."""
+    keys = {
+        cache_stats_key(family, counter): (family, counter)
+        for family in FAMILIES
+        for counter in COUNTERS
+    }
+    try:
+        found = cache.get_many(list(keys))
+    except Exception as e:
+        logger.warning(f"Catalog cache stats read failed: {e}")
+        found = {}
+
+    stats = {family: dict.fromkeys(COUNTERS, 0) for family in FAMILIES}
+    for key, value in found.items():
+        family, counter = keys[key]
+        stats[family][counter] = int(value)
+    for counters in stats.values():
+        lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+        counters["hit_ratio"] = (
+            round((counters["hits"] + counters["stale_hits"]) / lookups, 4) if lookups else 0.0
+        )
+        counters["rebuild_ms_avg"] = (
+            round(counters["rebuild_ms"] / counters["rebuilds"], 1) if counters["rebuilds"] else 0.0
+        )
+    return stats
+
+
+def reset_cache_stats() -> None:
+    """Zero all counters (tests)."""
+    try:
+        cache.delete_many([
+            cache_stats_key(family, counter) for family in FAMILIES for counter in COUNTERS
+        ])
+    except Exception as e:
+        logger.warning(f"Catalog cache stats reset failed: {e}")
@@ -6,6 +6,7 @@ Provides comprehensive statistics for the admin dashboard including:
 - Inquiry metrics with date ranges
 - Time-series data for charts
 - Recent activity lists
+- Catalog tree cache counters
 """
 
 from datetime import timedelta
@@ -19,7 +20,9 @@ from rest_framework.views import APIView
 
 from apps.api.permissions import IsAdminOrEditor
 from apps.inquiries.models import Inquiry, InquiryItem
-from .models import Category, Media, Product, ProductMedia, Series, TaxonomyNode, Variant
+from .models import Category, Media, Product, Series, TaxonomyNode, Variant
+from .services.media_gc import unreferenced_media_count
+from .stale_cache import cache_stats
 
 
 class StatsView(APIView):
@@ -125,6 +128,24 @@ class StatsView(APIView):
                             },
                         },
                     },
+                    # Cache metrics
+                    "catalog_cache": {
+                        "type": "object",
+                        "description": "Hit/miss/rebuild counters per cached catalog tree family",
+                        "additionalProperties": {
+                            "type": "object",
+                            "properties": {
+                                "hits": {"type": "integer"},
+                                "stale_hits": {"type": "integer"},
+                                "misses": {"type": "integer"},
+                                "rebuilds": {"type": "integer"},
+                                "lock_waits": {"type": "integer"},
+                                "rebuild_ms": {"type": "integer"},
+                                "hit_ratio": {"type": "number"},
+                                "rebuild_ms_avg": {"type": "number"},
+                            },
+                        },
+                    },
                 },
             }
         },
@@ -152,8 +173,8 @@ class StatsView(APIView):
         
         # Media metrics
         media_total = Media.objects.count()
-        referenced_media_ids = ProductMedia.objects.values_list("media_id", flat=True).distinct()
-        media_unreferenced_total = Media.objects.exclude(id__in=referenced_media_ids).count()
+        # Every FK and embedded media URL counts as a reference (see services.media_gc)
+        media_unreferenced_total = unreferenced_media_count()
         
         # Inquiry metrics
         inquiries_total = Inquiry.objects.count()
@@ -272,4 +293,6 @@ class StatsView(APIView):
             # Recent activity
             "recently_updated_products": recently_updated_products,
             "recently_updated_inquiries": recently_updated_inquiries,
+            # Cache metrics
+            "catalog_cache": cache_stats(),
         })
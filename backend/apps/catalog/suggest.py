@@ -0,0 +1,185 @@
+"""
+Typeahead suggestions served from an in-process prefix index.
+
+Suggestions cover variant model codes, product titles, series and brand
+names of the public catalog. Each worker keeps a ``PrefixIndex`` over them:
+a sorted list of canonical keys (``canonical_text``, plus the punctuation
+free form of model codes so "gko-60" finds "GKO6010"), searched with
+bisect, so a keystroke costs one cache read and no database query.
+
+The entries come from a snapshot shared through the cache under the
+generation of the ``suggest`` cache namespace (see cache_keys.py). Catalog
+changes bump the generation (see ``invalidate_suggest_index``); the first
+worker to see a new generation builds the snapshot from the database, the
+others load it from the cache. While one thread rebuilds, the worker's
+other threads keep serving the previous index.
+"""
+
+import logging
+import re
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Optional
+
+from django.core.cache import cache
+
+from apps.common.canonical import canonical_text
+
+from .cache_keys import (
+    SUGGEST,
+    SUGGEST_SNAPSHOT_TTL,
+    bump_generations,
+    get_generation,
+    suggest_snapshot_key,
+)
+
+logger = logging.getLogger(__name__)
+
+MIN_QUERY_LENGTH = 2
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+
+# Keys examined per lookup, bounds the cost of very short prefixes
+MAX_SCANNED_KEYS = 2000
+
+# Result order for equally good matches
+TYPE_RANK = {"model_code": 0, "product": 1, "series": 2, "brand": 3}
+
+WORD_START_RE = re.compile(r"\b\w")
+NON_ALNUM_RE = re.compile(r"[^0-9a-z]+")
+
+
+def compact(text: str) -> str:
+    """Canonical text without spaces and punctuation ("gko-6010" -> "gko6010")."""
+    return NON_ALNUM_RE.sub("", text)
+
+
+def build_snapshot() -> list[dict]:
+    """Suggestion entries of the public catalog, read from the database."""
+    from .models import Brand, ProductListing, Series, Variant
+
+    entries = []
+    for slug, title in ProductListing.objects.values_list(
+        "product__slug", "product__title_tr"
+    ).iterator():
+        entries.append({"type": "product", "label": title, "slug": slug})
+    for code, slug, title in (
+        Variant.objects.filter(product__listing__isnull=False)
+        .values_list("model_code", "product__slug", "product__title_tr")
+        .iterator()
+    ):
+        entries.append({
+            "type": "model_code", "label": code, "slug": slug, "product_title": title,
+        })
+    for name, slug, category_slug in (
+        Series.objects.filter(products__listing__isnull=False)
+        .values_list("name", "slug", "category__slug")
+        .distinct()
+    ):
+        entries.append({
+            "type": "series", "label": name, "slug": slug, "category_slug": category_slug,
+        })
+    for name, slug in Brand.objects.filter(is_active=True).values_list("name", "slug"):
+        entries.append({"type": "brand", "label": name, "slug": slug})
+    return entries
+
+
+class PrefixIndex:
+    """Sorted canonical keys of suggestion entries, for prefix lookups."""
+
+    def __init__(self, entries: list[dict]):
+        self.entries = entries
+        self._labels = [canonical_text(entry["label"]) for entry in entries]
+        keys = set()
+        for position, (entry, label) in enumerate(zip(entries, self._labels)):
+            # Every word start, so "ocak" also finds "gazli ocak 6010"
+            for match in WORD_START_RE.finditer(label):
+                keys.add((label[match.start():], position))
+            if entry["type"] == "model_code":
+                keys.add((compact(label), position))
+        keys = sorted(keys)
+        self._keys = [key for key, _ in keys]
+        self._positions = [position for _, position in keys]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, query: str, limit: int = DEFAULT_LIMIT) -> list[dict]:
+        """Entries with a key starting with canonical ``query``, best first."""
+        matches = set()
+        for prefix in {query, compact(query)}:
+            if not prefix:
+                continue
+            start = bisect_left(self._keys, prefix)
+            for i in range(start, min(start + MAX_SCANNED_KEYS, len(self._keys))):
+                if not self._keys[i].startswith(prefix):
+                    break
+                matches.add(self._positions[i])
+
+        def score(position):
+            label = self._labels[position]
+            starts = label.startswith(query) or compact(label).startswith(compact(query))
+            entry = self.entries[position]
+            return (not starts, TYPE_RANK[entry["type"]], len(label), label)
+
+        return [self.entries[position] for position in sorted(matches, key=score)[:limit]]
+
+
+class SuggestService:
+    """The worker's prefix index, kept at the current snapshot generation."""
+
+    def __init__(self):
+        self.version = None
+        self.index = None
+        self._lock = threading.Lock()
+
+    def suggest(self, query: str, limit: int = DEFAULT_LIMIT) -> list[dict]:
+        if len(query) < MIN_QUERY_LENGTH:
+            return []
+        return self.current_index().lookup(query, limit)
+
+    def current_index(self) -> PrefixIndex:
+        version = get_generation(SUGGEST)
+        if self.index is not None and version == self.version:
+            return self.index
+        # Only the first worker thread to notice rebuilds; the others keep
+        # serving the previous index (and wait only when there is none yet)
+        if not self._lock.acquire(blocking=self.index is None):
+            return self.index
+        try:
+            if self.index is None or version != self.version:
+                self.index = PrefixIndex(load_snapshot(version))
+                self.version = version
+            return self.index
+        finally:
+            self._lock.release()
+
+
+def load_snapshot(version: Optional[int]) -> list[dict]:
+    """Snapshot entries of generation ``version``, built and shared on first use."""
+    if version is not None:
+        try:
+            entries = cache.get(suggest_snapshot_key(version))
+            if entries is not None:
+                return entries
+        except Exception as e:
+            logger.warning(f"Suggest snapshot read failed: {e}")
+
+    entries = build_snapshot()
+    if version is not None:
+        try:
+            cache.set(suggest_snapshot_key(version), entries, SUGGEST_SNAPSHOT_TTL)
+        except Exception as e:
+            logger.warning(f"Suggest snapshot write failed: {e}")
+    return entries
+
+
+def invalidate_suggest_index() -> None:
+    """Retire the current snapshot (coalesced inside ``deferred_invalidation()``)."""
+    bump_generations([SUGGEST])
+
+
+@lru_cache(maxsize=1)
+def get_suggest_service() -> SuggestService:
+    return SuggestService()
@@ -208,3 +208,141 @@ class AdminMediaUploadTest(TestCase):
         self.assertEqual(pm.product, self.product)
         self.assertEqual(pm.alt, "Product image")
         self.assertTrue(pm.is_primary)
+
+    def test_media_upload_deduplicates_identical_content(self):
+        """Test that uploading the same file twice reuses the existing media."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        token = self.get_token_for_user(self.admin_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        url = "/api/v1/admin/media/upload/"
+        image_data = self.create_test_image().getvalue()
+
+        first = self.client.post(
+            url,
+            {"file": SimpleUploadedFile("a.png", image_data, content_type="image/png")},
+            format="multipart",
+        )
+        second = self.client.post(
+            url,
+            {"file": SimpleUploadedFile("b.png", image_data, content_type="image/png")},
+            format="multipart",
+        )
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(first.data["deduplicated"])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertTrue(second.data["deduplicated"])
+        self.assertEqual(second.data["id"], first.data["id"])
+        self.assertEqual(Media.objects.count(), 1)
+
+    def test_product_media_upload_reuses_existing_link(self):
+        """Test that re-uploading a product image does not add a second link."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        token = self.get_token_for_user(self.admin_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        url = f"/api/v1/admin/products/{self.product.id}/media/upload/"
+        image_data = self.create_test_image().getvalue()
+
+        first = self.client.post(
+            url,
+            {"file": SimpleUploadedFile("p1.png", image_data, content_type="image/png")},
+            format="multipart",
+        )
+        second = self.client.post(
+            url,
+            {"file": SimpleUploadedFile("p2.png", image_data, content_type="image/png")},
+            format="multipart",
+        )
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertTrue(second.data["deduplicated"])
+        self.assertEqual(second.data["id"], first.data["id"])
+        self.assertEqual(ProductMedia.objects.filter(product=self.product).count(), 1)
+
+
+class StreamingMediaIngestTest(TestCase):
+    """Test that media uploads are hashed and validated while streaming."""
+
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        from django.test import override_settings
+
+        self.client = APIClient()
+        self.admin_user = User.objects.create_user(
+            email="admin@gastrotech.com",
+            password="testpass123",
+            role="admin",
+        )
+        refresh = RefreshToken.for_user(self.admin_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+        blob_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, blob_root, ignore_errors=True)
+        override = override_settings(
+            MEDIA_BLOB_STORE={
+                "BACKEND": "apps.catalog.media_storage.FileSystemMediaStore",
+                "OPTIONS": {"root": blob_root},
+            },
+            MAX_MEDIA_UPLOAD_BYTES=256 * 1024,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _png(self, width, height):
+        from PIL import Image
+
+        buf = io.BytesIO()
+        Image.new("RGB", (width, height), (10, 20, 30)).save(buf, format="PNG")
+        return buf.getvalue()
+
+    def _upload(self, name, content, content_type):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        return self.client.post(
+            "/api/v1/admin/media/upload/",
+            {"file": SimpleUploadedFile(name, content, content_type=content_type)},
+            format="multipart",
+        )
+
+    def test_upload_is_stored_in_blob_store_with_checksum(self):
+        import hashlib
+
+        content = self._png(120, 80)
+        response = self._upload("photo.png", content, "image/png")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        media = Media.objects.get(id=response.data["id"])
+        self.assertEqual(media.checksum_sha256, hashlib.sha256(content).hexdigest())
+        self.assertEqual(media.size_bytes, len(content))
+        self.assertEqual((media.width, media.height), (120, 80))
+        self.assertEqual(media.storage_backend, "filesystem")
+        self.assertEqual(media.read_bytes(), content)
+
+    def test_oversized_upload_is_rejected(self):
+        content = b"\x89PNG\r\n\x1a\n" + b"\x00" * (300 * 1024)
+        response = self._upload("big.png", content, "image/png")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["code"], "FILE_TOO_LARGE")
+        self.assertFalse(Media.objects.exists())
+
+    def test_truncated_image_header_is_rejected(self):
+        content = self._png(50, 50)[:20]
+        response = self._upload("broken.png", content, "image/png")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["code"], "INVALID_IMAGE")
+
+    def test_pdf_upload_is_scanned_in_chunks(self):
+        content = b"%PDF-1.4\n" + b"0" * 2048 + b"/OpenAction\n%%EOF"
+        response = self._upload("doc.pdf", content, "application/pdf")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["kind"], "pdf")
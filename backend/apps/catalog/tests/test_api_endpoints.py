@@ -104,6 +104,84 @@ class MediaFileEndpointTest(TestCase):
         self.assertNotIn("bytes", data)
 
 
+class MediaFileRangeTest(TestCase):
+    """Test byte-range, If-Range, HEAD and streaming on the media file endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        # Larger than one streaming chunk so full responses are streamed
+        self.content = bytes(range(256)) * 1024
+        self.media = Media.objects.create(
+            kind="pdf",
+            filename="catalog.pdf",
+            content_type="application/pdf",
+            bytes=self.content,
+        )
+        self.url = f"/api/v1/media/{self.media.id}/file/"
+
+    def test_full_response_is_streamed(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(int(response["Content-Length"]), len(self.content))
+        self.assertEqual(b"".join(response.streaming_content), self.content)
+
+    def test_range_returns_partial_content(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(self.content)}")
+        self.assertEqual(int(response["Content-Length"]), 100)
+        self.assertEqual(response.content, self.content[100:200])
+
+    def test_open_ended_and_suffix_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.content) - 10}-")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, self.content[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-5")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, self.content[-5:])
+
+    def test_unsatisfiable_range_returns_416(self):
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.content)}-")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.content)}")
+
+    def test_if_range_mismatch_returns_full_content(self):
+        response = self.client.get(
+            self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale-etag"'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(
+            self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=f'"{self.media.checksum_sha256}"'
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, self.content[:10])
+
+    def test_if_range_requires_strong_match(self):
+        for if_range in (f'W/"{self.media.checksum_sha256}"', "*"):
+            response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=if_range)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(b"".join(response.streaming_content), self.content)
+
+    def test_multiple_ranges_fall_back_to_full_content(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-1,5-6")
+        self.assertEqual(response.status_code, 200)
+
+    def test_head_returns_headers_without_body(self):
+        response = self.client.head(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response["Content-Length"]), len(self.content))
+        self.assertEqual(response["ETag"], f'"{self.media.checksum_sha256}"')
+        self.assertEqual(response.content, b"")
+
+
 class NavEndpointTest(TestCase):
     """Test navigation endpoint returns categories with series."""
     
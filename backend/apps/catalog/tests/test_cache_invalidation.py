@@ -6,8 +6,19 @@ from django.core.cache import cache
 from django.test import TestCase
 from rest_framework.test import APIClient
 
-from apps.catalog.cache_keys import nav_key, categories_tree_key
-from apps.catalog.models import Category, Series
+from apps.catalog.cache_keys import (
+    NAV,
+    SPEC_KEYS,
+    TAXONOMY,
+    categories_tree_key,
+    clear_all_catalog_cache,
+    deferred_invalidation,
+    get_generations,
+    nav_key,
+    plp_tag_key,
+    taxonomy_tree_key,
+)
+from apps.catalog.models import Category, Product, Series
 
 
 class CacheInvalidationTest(TestCase):
@@ -112,3 +123,61 @@ class CacheInvalidationTest(TestCase):
         response2 = self.client.get("/api/v1/categories/tree/")
         data2 = response2.json()
         self.assertEqual(len(data2), 2)
+
+
+class GenerationInvalidationTest(TestCase):
+    """Test namespaced generations and deferred invalidation."""
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="Ocaklar", slug="ocaklar")
+        self.series = Series.objects.create(name="Seri", slug="seri", category=self.category)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_clear_all_drops_every_taxonomy_tree(self):
+        other = Series.objects.create(name="Diğer", slug="diger", category=self.category)
+        cache.set(taxonomy_tree_key(self.series.slug), ["tree"], 300)
+        cache.set(taxonomy_tree_key(other.slug), ["tree"], 300)
+        cache.set(plp_tag_key("all"), "version", None)
+
+        clear_all_catalog_cache()
+
+        self.assertIsNone(cache.get(taxonomy_tree_key(self.series.slug)))
+        self.assertIsNone(cache.get(taxonomy_tree_key(other.slug)))
+        self.assertIsNone(cache.get(plp_tag_key("all")))
+
+    def test_only_affected_namespaces_move(self):
+        before = get_generations([NAV, TAXONOMY, SPEC_KEYS])
+        Series.objects.create(name="Yeni", slug="yeni", category=self.category)
+        after = get_generations([NAV, TAXONOMY, SPEC_KEYS])
+
+        self.assertEqual(after[NAV], before[NAV] + 1)
+        self.assertEqual(after[TAXONOMY], before[TAXONOMY])
+        self.assertEqual(after[SPEC_KEYS], before[SPEC_KEYS])
+
+    def test_bulk_changes_invalidate_once(self):
+        before = get_generations([NAV])[NAV]
+        cache.set(nav_key(), ["nav"], 300)
+
+        with deferred_invalidation():
+            for index in range(20):
+                Product.objects.create(
+                    name=f"Ocak {index}", slug=f"ocak-{index}", title_tr=f"Ocak {index}",
+                    series=self.series, category=self.category, status="active",
+                )
+            # Nothing is invalidated until the block exits
+            self.assertEqual(get_generations([NAV])[NAV], before)
+            self.assertEqual(cache.get(nav_key()), ["nav"])
+
+        self.assertEqual(get_generations([NAV])[NAV], before + 1)
+        self.assertIsNone(cache.get(nav_key()))
+
+    def test_deferred_block_flushes_when_it_raises(self):
+        before = get_generations([NAV])[NAV]
+        with self.assertRaises(RuntimeError):
+            with deferred_invalidation():
+                self.category.save()
+                raise RuntimeError("import failed")
+        self.assertEqual(get_generations([NAV])[NAV], before + 1)
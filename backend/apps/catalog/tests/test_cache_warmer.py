@@ -0,0 +1,68 @@
+"""
+Tests for the catalog cache warmer and its management command.
+"""
+
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.catalog.cache_warmer import warm_catalog_cache
+from apps.catalog.catalog_snapshot import reset_catalog_snapshot
+from apps.catalog.models import Brand, Category, Product, Series, TaxonomyNode, Variant
+
+
+class CacheWarmerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_catalog_snapshot()
+        self.client = APIClient()
+        self.root = Category.objects.create(name="Pişirme", slug="pisirme", order=1)
+        self.child = Category.objects.create(name="Ocaklar", slug="ocaklar", parent=self.root)
+        self.brand = Brand.objects.create(name="VITAL", slug="vital", is_active=True)
+        self.series = Series.objects.create(name="Gazlı", slug="gazli", category=self.child)
+        TaxonomyNode.objects.create(series=self.series, name="Düğüm", slug="dugum")
+        product = Product.objects.create(
+            name="Ocak", slug="ocak", title_tr="Ocak", series=self.series,
+            category=self.child, brand=self.brand, status="active",
+        )
+        Variant.objects.create(
+            product=product, model_code="GKO1", name_tr="GKO1", list_price=Decimal("100.00"),
+        )
+
+    def tearDown(self):
+        cache.clear()
+        reset_catalog_snapshot()
+
+    def test_warmed_endpoints_are_served_without_queries(self):
+        report = warm_catalog_cache(workers=1)
+
+        self.assertEqual(report["taxonomy_tree"]["warmed"], 1)
+        self.assertEqual(report["plp"]["warmed"], 2)
+        # The brand's products are listed under the leaf and its ancestor
+        self.assertEqual(report["plp_brand"]["warmed"], 2)
+        self.assertFalse(any(stats["errors"] for stats in report.values()))
+
+        # A fresh worker finds everything in Redis
+        reset_catalog_snapshot()
+        with self.assertNumQueries(0):
+            for url in [
+                "/api/v1/nav/",
+                "/api/v1/categories/tree/",
+                "/api/v1/taxonomy/tree/?series=gazli",
+                "/api/v1/plp/?category=pisirme",
+                "/api/v1/plp/?category=ocaklar&brands=vital",
+            ]:
+                self.assertEqual(self.client.get(url).status_code, 200, url)
+
+    def test_command_reports_each_endpoint(self):
+        out = StringIO()
+        call_command("warm_catalog_cache", "--workers", "1", "--skip-brands", stdout=out)
+
+        output = out.getvalue()
+        for endpoint in ("nav", "categories_tree", "taxonomy_tree", "plp"):
+            self.assertIn(endpoint, output)
+        self.assertIn("Warmed catalog caches", output)
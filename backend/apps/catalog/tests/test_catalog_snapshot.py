@@ -0,0 +1,170 @@
+"""
+Tests for the per-worker catalog snapshot behind navigation endpoints.
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.catalog.cache_keys import categories_tree_key, rebuild_lock_key, spec_keys_key
+from apps.catalog.catalog_snapshot import build_nav, get_catalog_snapshot, reset_catalog_snapshot
+from apps.catalog.media_derivatives import card_image_url
+from apps.catalog.models import (
+    Category,
+    Media,
+    Product,
+    ProductMedia,
+    Series,
+    SpecKey,
+    TaxonomyNode,
+)
+from apps.catalog.query_utils import resolve_category_ids
+
+
+class CatalogSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_catalog_snapshot()
+        self.client = APIClient()
+        self.root = Category.objects.create(name="Pişirme", slug="pisirme", order=1)
+        self.child = Category.objects.create(name="Ocaklar", slug="ocaklar", parent=self.root)
+        self.leaf = Category.objects.create(name="Gazlı", slug="gazli", parent=self.child)
+        self.series = Series.objects.create(name="Seri", slug="seri", category=self.root)
+        TaxonomyNode.objects.create(series=self.series, name="Düğüm", slug="dugum")
+        SpecKey.objects.create(slug="genislik", label_tr="Genişlik", sort_order=2)
+        SpecKey.objects.create(slug="guc", label_tr="Güç", sort_order=1)
+
+    def tearDown(self):
+        cache.clear()
+        reset_catalog_snapshot()
+
+    def test_repeat_requests_are_served_from_memory(self):
+        urls = [
+            "/api/v1/nav/",
+            "/api/v1/categories/tree/",
+            "/api/v1/taxonomy/tree/?series=seri",
+            "/api/v1/spec-keys/",
+        ]
+        first = [self.client.get(url).json() for url in urls]
+
+        with self.assertNumQueries(0):
+            second = [self.client.get(url).json() for url in urls]
+        self.assertEqual(first, second)
+
+        # Another worker loads the payloads from Redis instead of the database
+        reset_catalog_snapshot()
+        with self.assertNumQueries(0):
+            third = [self.client.get(url).json() for url in urls]
+        self.assertEqual(first, third)
+
+    def test_unknown_series_is_not_found(self):
+        response = self.client.get("/api/v1/taxonomy/tree/?series=yok")
+        self.assertEqual(response.status_code, 404)
+
+    def test_category_lookups(self):
+        snapshot = get_catalog_snapshot()
+        self.assertEqual(
+            snapshot.subtree_ids([self.child.id]), {self.child.id, self.leaf.id}
+        )
+        self.assertEqual(
+            [crumb["slug"] for crumb in snapshot.breadcrumbs(self.leaf.id)],
+            ["pisirme", "ocaklar", "gazli"],
+        )
+        self.assertEqual(
+            resolve_category_ids(["ocaklar", "yok"], include_descendants=True),
+            {self.child.id, self.leaf.id},
+        )
+        self.assertEqual(
+            resolve_category_ids(["ocaklar"], include_descendants=False), {self.child.id}
+        )
+
+    def test_lookups_from_stale_payloads_are_not_kept(self):
+        get_catalog_snapshot().category_ids(["pisirme"])
+        get_catalog_snapshot().resolve_spec_keys(["guc"])
+
+        new = Category.objects.create(name="Soğutma", slug="sogutma")
+        SpecKey.objects.create(slug="hacim", label_tr="Hacim")
+        # Another request is rebuilding the new generations
+        locks = [rebuild_lock_key(categories_tree_key()), rebuild_lock_key(spec_keys_key())]
+        for lock in locks:
+            cache.add(lock, 1)
+
+        snapshot = get_catalog_snapshot()
+        self.assertEqual(snapshot.category_ids(["sogutma"]), set())
+        self.assertEqual(snapshot.resolve_spec_keys(["hacim"]), [])
+
+        cache.delete_many(locks)
+        self.assertEqual(snapshot.category_ids(["sogutma"]), {new.id})
+        self.assertEqual([key["slug"] for key in snapshot.resolve_spec_keys(["hacim"])], ["hacim"])
+
+    def test_changes_start_a_new_generation(self):
+        snapshot = get_catalog_snapshot()
+        self.assertIs(get_catalog_snapshot(), snapshot)
+
+        self.leaf.parent = self.root
+        self.leaf.save()
+
+        snapshot = get_catalog_snapshot()
+        self.assertEqual(snapshot.subtree_ids([self.child.id]), {self.child.id})
+        self.assertEqual(
+            [crumb["slug"] for crumb in snapshot.breadcrumbs(self.leaf.id)],
+            ["pisirme", "gazli"],
+        )
+
+        SpecKey.objects.create(slug="hacim", label_tr="Hacim", sort_order=0)
+        own_slugs = {"hacim", "guc", "genislik"}
+        self.assertEqual(
+            [
+                key["slug"]
+                for key in self.client.get("/api/v1/spec-keys/").json()["results"]
+                if key["slug"] in own_slugs
+            ],
+            ["hacim", "guc", "genislik"],
+        )
+
+    def test_resolve_spec_keys_keeps_layout_order(self):
+        resolved = get_catalog_snapshot().resolve_spec_keys(["genislik", "yok", "guc", "genislik"])
+        self.assertEqual([key["slug"] for key in resolved], ["genislik", "guc"])
+
+
+class NavBuildQueryBudgetTests(TestCase):
+    def _single_product_series(self, category, index):
+        series = Series.objects.create(name=f"Seri {index}", slug=f"seri-{index}", category=category)
+        product = Product.objects.create(
+            name=f"Ürün {index}", slug=f"urun-{index}", title_tr=f"Ürün {index}",
+            series=series, status="active",
+        )
+        first, primary = (
+            Media.objects.create(
+                kind="image", filename=f"{index}-{n}.png", content_type="image/png", bytes=b"x"
+            )
+            for n in range(2)
+        )
+        ProductMedia.objects.create(product=product, media=first, sort_order=0)
+        ProductMedia.objects.create(product=product, media=primary, sort_order=1, is_primary=True)
+        return series, primary
+
+    def test_single_product_series_are_resolved_in_one_batch(self):
+        expected = {}
+        for root_index in range(3):
+            root = Category.objects.create(name=f"Kök {root_index}", slug=f"kok-{root_index}")
+            child = Category.objects.create(
+                name=f"Alt {root_index}", slug=f"alt-{root_index}", parent=root
+            )
+            for category in (root, child):
+                for _ in range(2):
+                    series, media = self._single_product_series(category, len(expected))
+                    expected[series.slug] = card_image_url(media.id, media.kind)
+
+        # Categories, their series, single products and their media
+        with self.assertNumQueries(4):
+            nav = build_nav()
+
+        resolved = {}
+        stack = list(nav)
+        while stack:
+            category = stack.pop()
+            stack.extend(category["children"])
+            for series in category["series"]:
+                resolved[series["slug"]] = series["single_product_image_url"]
+        self.assertEqual(resolved, expected)
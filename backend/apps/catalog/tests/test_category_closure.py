@@ -0,0 +1,84 @@
+"""
+Tests for the category closure table and the tree helpers built on it.
+"""
+
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.catalog.catalog_snapshot import reset_catalog_snapshot
+from apps.catalog.models import Category, CategoryClosure
+from apps.catalog.query_utils import resolve_category_ids
+
+
+class CategoryClosureTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_catalog_snapshot()
+        self.root = Category.objects.create(name="Root", slug="root")
+        self.child = Category.objects.create(name="Child", slug="child", parent=self.root)
+        self.leaf = Category.objects.create(name="Leaf", slug="leaf", parent=self.child)
+        self.other = Category.objects.create(name="Other", slug="other")
+
+    def tearDown(self):
+        cache.clear()
+        reset_catalog_snapshot()
+
+    def test_rows_created_on_save(self):
+        self.assertEqual(
+            set(CategoryClosure.objects.filter(descendant=self.leaf).values_list("ancestor_id", "depth")),
+            {(self.leaf.id, 0), (self.child.id, 1), (self.root.id, 2)},
+        )
+
+    def test_tree_helpers_use_single_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                [c.id for c in self.root.get_descendants(include_self=True)],
+                [self.root.id, self.child.id, self.leaf.id],
+            )
+        with self.assertNumQueries(1):
+            self.assertEqual([c.slug for c in self.leaf.breadcrumbs], ["root", "child", "leaf"])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.leaf.depth, 2)
+        # Slugs and subtrees come from the catalog snapshot, loaded once
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                resolve_category_ids(["root"], include_descendants=True),
+                {self.root.id, self.child.id, self.leaf.id},
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                resolve_category_ids(["child"], include_descendants=True),
+                {self.child.id, self.leaf.id},
+            )
+
+    def test_reparent_moves_subtree(self):
+        self.child.parent = self.other
+        self.child.save()
+
+        self.assertEqual(
+            Category.subtree_ids([self.other.id]),
+            {self.other.id, self.child.id, self.leaf.id},
+        )
+        self.assertEqual(Category.subtree_ids([self.root.id]), {self.root.id})
+        self.assertEqual([c.slug for c in self.leaf.breadcrumbs], ["other", "child", "leaf"])
+
+    def test_delete_cascades(self):
+        self.child.delete()
+        self.assertEqual(Category.subtree_ids([self.root.id]), {self.root.id})
+        self.assertFalse(CategoryClosure.objects.filter(descendant_id=self.leaf.id).exists())
+
+    def test_rebuild_after_queryset_update(self):
+        Category.objects.filter(id=self.child.id).update(parent=self.other)
+        with self.assertRaises(Exception):
+            call_command("rebuild_category_closure", check=True, stdout=StringIO())
+
+        call_command("rebuild_category_closure", stdout=StringIO())
+        call_command("rebuild_category_closure", check=True, stdout=StringIO())
+        self.assertEqual(self.leaf.depth, 2)
+        self.assertEqual(
+            Category.subtree_ids([self.other.id]),
+            {self.other.id, self.child.id, self.leaf.id},
+        )
@@ -0,0 +1,84 @@
+"""
+Tests for the two-tier hot cache of small media files.
+"""
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.catalog.media_cache import LocalLRU, get_media_hot_cache
+from apps.catalog.models import Media
+
+
+@override_settings(MEDIA_HOT_CACHE_MAX_ITEM_BYTES=1024, MEDIA_HOT_CACHE_MAX_BYTES=4096)
+class MediaHotCacheTest(TestCase):
+    """Test hot-cache hits, misses and invalidation on the media file endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.hot_cache = get_media_hot_cache()
+        self.hot_cache.local.clear()
+        self.hot_cache.reset_stats()
+        self.media = Media.objects.create(
+            kind="image", filename="logo.png", content_type="image/png", bytes=b"tiny logo"
+        )
+        self.url = f"/api/v1/media/{self.media.id}/file/"
+
+    def test_second_request_is_served_without_queries(self):
+        self.client.get(self.url)
+        self.assertEqual(self.hot_cache.stats()["stores"], 1)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"tiny logo")
+        self.assertEqual(response["ETag"], f'"{self.media.checksum_sha256}"')
+        self.assertEqual(self.hot_cache.stats()["local_hits"], 1)
+
+    def test_redis_tier_refills_local_tier(self):
+        self.client.get(self.url)
+        self.hot_cache.local.clear()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.content, b"tiny logo")
+        stats = self.hot_cache.stats()
+        self.assertEqual(stats["redis_hits"], 1)
+        self.assertEqual(stats["local_items"], 1)
+
+    def test_rewrite_invalidates_entry(self):
+        self.client.get(self.url)
+
+        self.media.bytes = b"new logo"
+        self.media.save()
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.content, b"new logo")
+
+    def test_large_media_is_not_cached(self):
+        large = Media.objects.create(
+            kind="image", filename="big.png", content_type="image/png", bytes=b"x" * 2048
+        )
+        self.client.get(f"/api/v1/media/{large.id}/file/")
+        self.client.get(f"/api/v1/media/{large.id}/file/")
+
+        stats = self.hot_cache.stats()
+        self.assertEqual(stats["stores"], 0)
+        self.assertEqual(stats["misses"], 2)
+
+
+class LocalLRUTest(TestCase):
+    """Test the size-bounded in-process tier."""
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        lru = LocalLRU(max_bytes=10)
+        lru.put("a", b"aaaa")
+        lru.put("b", b"bbbb")
+        lru.get("a")
+        lru.put("c", b"cccc")
+
+        self.assertEqual(lru.get("a"), b"aaaa")
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.current_bytes, 8)
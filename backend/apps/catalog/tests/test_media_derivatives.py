@@ -0,0 +1,201 @@
+"""
+Tests for on-the-fly image derivatives served by the media file endpoint.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.catalog.media_derivatives import DerivativeCache, card_image_url, get_derivative_cache
+from apps.catalog.models import Media
+
+
+def make_png(width=800, height=600):
+    buf = io.BytesIO()
+    Image.new("RGBA", (width, height), (200, 30, 40, 255)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class MediaDerivativeEndpointTest(TestCase):
+    """Test ?w= / ?fmt= handling on /api/v1/media/<id>/file/."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        override = override_settings(
+            MEDIA_BLOB_STORE={
+                "BACKEND": "apps.catalog.media_storage.FileSystemMediaStore",
+                "OPTIONS": {"root": os.path.join(self.tmp, "blobs")},
+            },
+            MEDIA_DERIVATIVE_ROOT=os.path.join(self.tmp, "derivatives"),
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.media = Media.objects.create(
+            kind="image",
+            filename="photo.png",
+            content_type="image/png",
+            bytes=make_png(),
+        )
+        self.url = f"/api/v1/media/{self.media.id}/file/"
+
+    def _image(self, response):
+        return Image.open(io.BytesIO(b"".join(response)))
+
+    def test_resizes_and_transcodes(self):
+        response = self.client.get(self.url, {"w": 400, "fmt": "webp"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        img = self._image(response)
+        self.assertEqual(img.format, "WEBP")
+        self.assertEqual(img.size, (400, 300))
+        self.assertNotEqual(response["ETag"], f'"{self.media.checksum_sha256}"')
+
+    def test_derivative_is_cached_once(self):
+        self.client.get(self.url, {"w": 320, "fmt": "jpeg"})
+        key = DerivativeCache.key(self.media.checksum_sha256, 320, "jpeg")
+        path = get_derivative_cache().store.path(key)
+        self.assertTrue(path.is_file())
+        first_inode = path.stat().st_ino
+
+        response = self.client.get(self.url, {"w": 320, "fmt": "jpeg"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(path.stat().st_ino, first_inode)
+
+    def test_never_upscales(self):
+        response = self.client.get(self.url, {"w": 1280})
+
+        img = self._image(response)
+        self.assertEqual(img.size, (800, 600))
+        # Source format kept when fmt is omitted
+        self.assertEqual(response["Content-Type"], "image/png")
+
+    def test_rejects_sizes_outside_whitelist(self):
+        response = self.client.get(self.url, {"w": 401})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["code"], "INVALID_WIDTH")
+
+        response = self.client.get(self.url, {"fmt": "tiff"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["code"], "INVALID_FORMAT")
+
+    def test_rejects_non_image_media(self):
+        pdf = Media.objects.create(
+            kind="pdf", filename="a.pdf", content_type="application/pdf", bytes=b"%PDF-1.4"
+        )
+        response = self.client.get(f"/api/v1/media/{pdf.id}/file/", {"w": 400})
+        self.assertEqual(response.status_code, 400)
+
+    def test_card_image_url(self):
+        self.assertEqual(
+            card_image_url(self.media.id, "image"),
+            f"/api/v1/media/{self.media.id}/file/?w=400&fmt=webp",
+        )
+        # Documents and videos have no derivatives: the file itself is linked
+        self.assertEqual(card_image_url(self.media.id, "pdf"), f"/api/v1/media/{self.media.id}/file/")
+
+
+class DerivativeCacheEvictionTest(TestCase):
+    """Test the size-bounded LRU eviction of the derivative cache."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def test_sweep_evicts_least_recently_used(self):
+        cache = DerivativeCache(self.root, max_bytes=250)
+        keys = [DerivativeCache.key("a" * 64, w, "webp") for w in (1, 2, 3)]
+        for i, key in enumerate(keys):
+            cache.store.save(key, b"x" * 100)
+            stamp = time.time() - 100 + i
+            os.utime(cache.store.path(key), (stamp, stamp))
+
+        # Touch the oldest entry so it becomes the most recently used
+        cache.get(keys[0])
+        freed = cache.sweep()
+
+        self.assertEqual(freed, 100)
+        self.assertTrue(cache.store.exists(keys[0]))
+        self.assertFalse(cache.store.exists(keys[1]))
+        self.assertTrue(cache.store.exists(keys[2]))
+
+
+class ResponsiveVariantsTest(TestCase):
+    """Test precomputed srcset variants for image media."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        override = override_settings(
+            MEDIA_BLOB_STORE={
+                "BACKEND": "apps.catalog.media_storage.FileSystemMediaStore",
+                "OPTIONS": {"root": os.path.join(self.tmp, "blobs")},
+            },
+            MEDIA_DERIVATIVE_ROOT=os.path.join(self.tmp, "derivatives"),
+            MEDIA_RESPONSIVE_WIDTHS=(160, 320, 640, 1280),
+            MEDIA_RESPONSIVE_FORMATS=("webp",),
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.media = Media.objects.create(
+            kind="image",
+            filename="photo.png",
+            content_type="image/png",
+            bytes=make_png(800, 600),
+            width=800,
+            height=600,
+        )
+
+    def test_srcset_stops_at_source_width(self):
+        from apps.catalog.serializers import MediaMetadataSerializer
+
+        srcset = MediaMetadataSerializer(self.media).data["srcset"]
+        base = f"/api/v1/media/{self.media.id}/file/"
+        self.assertEqual(
+            srcset["webp"],
+            f"{base}?w=160&fmt=webp 160w, {base}?w=320&fmt=webp 320w, "
+            f"{base}?w=640&fmt=webp 640w, {base}?fmt=webp 800w",
+        )
+
+    def test_srcset_is_none_for_documents(self):
+        from apps.catalog.serializers import MediaMetadataSerializer
+
+        pdf = Media.objects.create(
+            kind="pdf", filename="a.pdf", content_type="application/pdf", bytes=b"%PDF-1.4"
+        )
+        self.assertIsNone(MediaMetadataSerializer(pdf).data["srcset"])
+
+    def test_generation_is_idempotent_per_checksum(self):
+        from apps.catalog.media_variants import generate_variants
+
+        self.assertEqual(generate_variants(self.media), 4)
+        cache = get_derivative_cache()
+        path = cache.store.path(DerivativeCache.key(self.media.checksum_sha256, 160, "webp"))
+        inode = path.stat().st_ino
+
+        twin = Media.objects.create(
+            kind="image", filename="copy.png", content_type="image/png",
+            bytes=make_png(800, 600), width=800, height=600,
+        )
+        generate_variants(twin)
+        self.assertEqual(path.stat().st_ino, inode)
+
+    def test_upload_schedules_generation_after_commit(self):
+        from unittest import mock
+
+        from apps.catalog.media_variants import schedule_variants
+
+        with mock.patch("apps.catalog.media_variants._get_executor") as executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                schedule_variants(self.media)
+        executor.return_value.submit.assert_called_once()
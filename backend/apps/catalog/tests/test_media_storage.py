@@ -0,0 +1,430 @@
+"""
+Tests for the content-addressed media blob store.
+"""
+
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.catalog.media_storage import FileSystemMediaStore, get_media_store
+from apps.catalog.models import Media
+
+
+def blob_store_settings(root):
+    return {
+        "BACKEND": "apps.catalog.media_storage.FileSystemMediaStore",
+        "OPTIONS": {"root": root},
+    }
+
+
+class BlobStoreTestMixin:
+    """Point MEDIA_BLOB_STORE at a temporary directory for each test."""
+
+    def setUp(self):
+        super().setUp()
+        self.blob_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.blob_root, ignore_errors=True)
+        override = override_settings(MEDIA_BLOB_STORE=blob_store_settings(self.blob_root))
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class FileSystemMediaStoreTest(TestCase):
+    """Test the filesystem store in isolation."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.store = FileSystemMediaStore(self.root)
+
+    def test_save_shards_by_checksum(self):
+        content = b"hello blob"
+        checksum = Media.compute_sha256(content)
+        self.store.save(checksum, content)
+
+        path = self.store.path(checksum)
+        self.assertEqual(path.parent.name, checksum[2:4])
+        self.assertEqual(path.parent.parent.name, checksum[:2])
+        self.assertTrue(self.store.exists(checksum))
+        self.assertEqual(self.store.read(checksum), content)
+        self.assertEqual(self.store.size(checksum), len(content))
+
+    def test_rejects_path_like_checksums(self):
+        with self.assertRaises(ValueError):
+            self.store.path("../../etc/passwd")
+
+    def test_delete_missing_blob_is_noop(self):
+        self.store.delete("a" * 64)
+
+
+class MediaBlobStorageTest(BlobStoreTestMixin, TestCase):
+    """Test Media reads and writes through the configured store."""
+
+    def test_create_writes_blob_and_empties_db_column(self):
+        media = Media.objects.create(
+            kind="image",
+            filename="a.jpg",
+            content_type="image/jpeg",
+            bytes=b"image content",
+        )
+
+        self.assertEqual(media.storage_backend, "filesystem")
+        self.assertTrue(get_media_store().exists(media.checksum_sha256))
+
+        stored = Media.objects.values_list("bytes", flat=True).get(id=media.id)
+        self.assertEqual(bytes(stored), b"")
+        self.assertEqual(Media.objects.get(id=media.id).read_bytes(), b"image content")
+
+    def test_legacy_rows_fall_back_to_db_column(self):
+        with override_settings(MEDIA_BLOB_STORE={"BACKEND": ""}):
+            media = Media.objects.create(
+                kind="file",
+                filename="legacy.csv",
+                content_type="text/csv",
+                bytes=b"a;b\n1;2\n",
+            )
+        self.assertEqual(media.storage_backend, "database")
+
+        reloaded = Media.objects.defer("bytes").get(id=media.id)
+        self.assertEqual(reloaded.read_bytes(), b"a;b\n1;2\n")
+
+    def test_media_file_view_reads_from_store(self):
+        media = Media.objects.create(
+            kind="image",
+            filename="b.jpg",
+            content_type="image/jpeg",
+            bytes=b"served from disk",
+        )
+        response = APIClient().get(f"/api/v1/media/{media.id}/file/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response), b"served from disk")
+
+    def test_delete_removes_unreferenced_blob(self):
+        media = Media.objects.create(
+            kind="image", filename="c.jpg", content_type="image/jpeg", bytes=b"shared"
+        )
+        twin = Media.objects.create(
+            kind="image", filename="d.jpg", content_type="image/jpeg", bytes=b"shared"
+        )
+        store = get_media_store()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            media.delete()
+        self.assertTrue(store.exists(twin.checksum_sha256))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            twin.delete()
+        self.assertFalse(store.exists(twin.checksum_sha256))
+
+    def test_delete_leaves_blob_shared_by_uncommitted_upload(self):
+        media = Media.objects.create(
+            kind="image", filename="e.jpg", content_type="image/jpeg", bytes=b"raced"
+        )
+
+        # Another connection holds the blob's lock for an upload of the same content
+        with mock.patch(
+            "apps.catalog.media_storage.lock_blob_for_delete", return_value=False
+        ) as lock:
+            with self.captureOnCommitCallbacks(execute=True):
+                media.delete()
+
+        lock.assert_called_once_with(media.checksum_sha256, "default")
+        self.assertTrue(get_media_store().exists(media.checksum_sha256))
+
+
+class MigrateMediaToBlobStoreCommandTest(BlobStoreTestMixin, TestCase):
+    """Test the resumable database-to-blob-store migration command."""
+
+    def setUp(self):
+        super().setUp()
+        with override_settings(MEDIA_BLOB_STORE={"BACKEND": ""}):
+            self.rows = [
+                Media.objects.create(
+                    kind="image",
+                    filename=f"legacy-{i}.jpg",
+                    content_type="image/jpeg",
+                    bytes=f"legacy content {i}".encode(),
+                )
+                for i in range(5)
+            ]
+
+    def test_migrates_in_batches_and_resumes(self):
+        call_command("migrate_media_to_blob_store", batch_size=2, limit=2, stdout=StringIO())
+        self.assertEqual(
+            Media.objects.filter(storage_backend="filesystem").count(), 2
+        )
+
+        call_command("migrate_media_to_blob_store", batch_size=2, stdout=StringIO())
+        self.assertFalse(Media.objects.filter(storage_backend="database").exists())
+
+        store = get_media_store()
+        for original in self.rows:
+            media = Media.objects.get(id=original.id)
+            self.assertTrue(store.exists(media.checksum_sha256))
+            self.assertEqual(bytes(Media.objects.values_list("bytes", flat=True).get(id=media.id)), b"")
+            self.assertEqual(media.read_bytes(), bytes(original.bytes))
+
+    def test_dry_run_changes_nothing(self):
+        call_command("migrate_media_to_blob_store", dry_run=True, stdout=StringIO())
+        self.assertEqual(Media.objects.filter(storage_backend="database").count(), 5)
+
+
+class DedupeMediaCommandTest(BlobStoreTestMixin, TestCase):
+    """Test merging Media rows that share a checksum."""
+
+    def setUp(self):
+        super().setUp()
+        from apps.catalog.models import Category, Product, ProductMedia, Series
+
+        self.ProductMedia = ProductMedia
+        category = Category.objects.create(name="Cat", slug="cat")
+        series = Series.objects.create(category=category, name="S", slug="s")
+        self.product = Product.objects.create(
+            name="P", slug="p", title_tr="P", series=series, category=category
+        )
+        self.keeper = Media.objects.create(
+            kind="image", filename="a.jpg", content_type="image/jpeg", bytes=b"same"
+        )
+        self.duplicate = Media.objects.create(
+            kind="image", filename="b.jpg", content_type="image/jpeg", bytes=b"same"
+        )
+        category.cover_media = self.duplicate
+        category.save()
+        self.category = category
+        ProductMedia.objects.create(product=self.product, media=self.keeper, sort_order=1)
+        ProductMedia.objects.create(
+            product=self.product, media=self.duplicate, sort_order=0, is_primary=True
+        )
+
+    def test_get_or_create_by_content_reuses_oldest(self):
+        media, created = Media.get_or_create_by_content(
+            b"same", kind="image", filename="c.jpg", content_type="image/jpeg"
+        )
+        self.assertFalse(created)
+        self.assertEqual(media.id, self.keeper.id)
+
+    def test_merges_duplicates_and_repoints_references(self):
+        call_command("dedupe_media", stdout=StringIO())
+
+        self.assertFalse(Media.objects.filter(id=self.duplicate.id).exists())
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.cover_media_id, self.keeper.id)
+
+        links = self.ProductMedia.objects.filter(product=self.product)
+        self.assertEqual(links.count(), 1)
+        self.assertTrue(links.get().is_primary)
+        self.assertEqual(links.get().media_id, self.keeper.id)
+        # Shared blob survives the delete of the duplicate row
+        self.assertEqual(Media.objects.get(id=self.keeper.id).read_bytes(), b"same")
+
+    def test_dry_run_changes_nothing(self):
+        out = StringIO()
+        call_command("dedupe_media", dry_run=True, stdout=out)
+        self.assertEqual(Media.objects.count(), 2)
+        self.assertIn("reclaimable", out.getvalue())
+
+
+class MediaAccelRedirectTest(BlobStoreTestMixin, TestCase):
+    """Test handing media transfers to nginx with X-Accel-Redirect."""
+
+    def setUp(self):
+        super().setUp()
+        override = override_settings(
+            MEDIA_ACCEL_MODE="x-accel-redirect",
+            MEDIA_ACCEL_ROOT=self.blob_root,
+            MEDIA_ACCEL_PREFIX="/_protected_media/",
+            MEDIA_HOT_CACHE_MAX_ITEM_BYTES=0,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client = APIClient()
+        self.media = Media.objects.create(
+            kind="image", filename="a.jpg", content_type="image/jpeg", bytes=b"offloaded"
+        )
+        self.url = f"/api/v1/media/{self.media.id}/file/"
+
+    def test_blob_is_handed_to_nginx(self):
+        checksum = self.media.checksum_sha256
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["X-Accel-Redirect"],
+            f"/_protected_media/{checksum[:2]}/{checksum[2:4]}/{checksum}",
+        )
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response["ETag"], f'"{checksum}"')
+        self.assertEqual(response.content, b"")
+
+    def test_etag_revalidation_stays_in_django(self):
+        response = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=f'"{self.media.checksum_sha256}"'
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn("X-Accel-Redirect", response)
+
+    def test_database_rows_are_streamed(self):
+        with override_settings(MEDIA_BLOB_STORE={"BACKEND": ""}):
+            legacy = Media.objects.create(
+                kind="image", filename="b.jpg", content_type="image/jpeg", bytes=b"in db"
+            )
+        response = self.client.get(f"/api/v1/media/{legacy.id}/file/")
+        self.assertNotIn("X-Accel-Redirect", response)
+        self.assertEqual(b"".join(response), b"in db")
+
+
+class MediaGarbageCollectTest(BlobStoreTestMixin, TestCase):
+    """Test mark-and-sweep collection of unreferenced media."""
+
+    def setUp(self):
+        super().setUp()
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from apps.blog.models import BlogPost
+        from apps.catalog.models import Category
+
+        def old_media(name, content):
+            media = Media.objects.create(
+                kind="image", filename=name, content_type="image/jpeg", bytes=content
+            )
+            Media.objects.filter(id=media.id).update(created_at=timezone.now() - timedelta(days=3))
+            return media
+
+        self.orphan = old_media("orphan.jpg", b"orphan")
+        self.cover = old_media("cover.jpg", b"cover")
+        self.inline = old_media("inline.jpg", b"inline")
+        self.fresh = Media.objects.create(
+            kind="image", filename="fresh.jpg", content_type="image/jpeg", bytes=b"fresh"
+        )
+        Category.objects.create(name="Cat", slug="cat", cover_media=self.cover)
+        BlogPost.objects.create(
+            title="Post",
+            slug="post",
+            content=f'<img src="/api/v1/media/{self.inline.id}/file/">',
+        )
+
+    def test_dry_run_reports_without_deleting(self):
+        out = StringIO()
+        call_command("gc_media", dry_run=True, stdout=out)
+
+        self.assertIn("orphan.jpg", out.getvalue())
+        self.assertEqual(Media.objects.count(), 4)
+
+    def test_deletes_only_unreferenced_media_past_grace(self):
+        from apps.ops.models import AuditLog
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("gc_media", stdout=StringIO())
+
+        self.assertEqual(
+            set(Media.objects.values_list("id", flat=True)),
+            {self.cover.id, self.inline.id, self.fresh.id},
+        )
+        entry = AuditLog.objects.get(entity_id=str(self.orphan.id))
+        self.assertEqual(entry.action, AuditLog.Action.MEDIA_DELETE)
+        self.assertEqual(entry.metadata["reason"], "garbage_collection")
+        self.assertFalse(get_media_store().exists(self.orphan.checksum_sha256))
+
+    def test_unreferenced_count_is_cached_until_collection(self):
+        from apps.catalog.services.media_gc import unreferenced_media_count
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.assertEqual(unreferenced_media_count(), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(unreferenced_media_count(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("gc_media", stdout=StringIO())
+        self.assertEqual(unreferenced_media_count(), 1)
+
+    def test_admin_endpoint(self):
+        from apps.accounts.models import User
+
+        client = APIClient()
+        editor = User.objects.create_user(email="e@example.com", password="x", role="editor")
+        client.force_authenticate(editor)
+
+        report = client.get("/api/v1/admin/media/gc/").json()
+        self.assertEqual(report["candidates"], 1)
+        self.assertEqual(report["reclaimable_bytes"], len(b"orphan"))
+        self.assertEqual(client.post("/api/v1/admin/media/gc/").status_code, 403)
+
+        admin = User.objects.create_user(email="a@example.com", password="x", role="admin")
+        client.force_authenticate(admin)
+        report = client.post("/api/v1/admin/media/gc/", {"grace_hours": 0}, format="json").json()
+        # With no grace period the fresh upload is collected too
+        self.assertEqual(report["deleted"], 2)
+        self.assertFalse(Media.objects.filter(id=self.fresh.id).exists())
+
+
+class MigrateMediaBytesCommandTest(BlobStoreTestMixin, TestCase):
+    """Test filling in media content from a SQLite source database."""
+
+    def setUp(self):
+        super().setUp()
+        import os
+        import sqlite3
+
+        self.sqlite_path = os.path.join(self.blob_root, "source.sqlite3")
+        src = sqlite3.connect(self.sqlite_path)
+        src.execute("CREATE TABLE catalog_media (id TEXT, filename TEXT, bytes BLOB)")
+        src.executemany(
+            "INSERT INTO catalog_media VALUES (?, ?, ?)",
+            [(str(i), f"img{i}.jpg", f"content {i}".encode()) for i in range(5)],
+        )
+        src.commit()
+        src.close()
+
+        for i in range(4):
+            Media.objects.create(
+                kind="image", filename=f"img{i}.jpg", content_type="image/jpeg",
+                size_bytes=0, checksum_sha256="",
+            )
+
+    def migrate(self, **options):
+        call_command(
+            "migrate_media_bytes", sqlite_path=self.sqlite_path, workers=1,
+            batch_size=2, stdout=StringIO(), stderr=StringIO(), **options,
+        )
+
+    def test_fills_content_into_blob_store(self):
+        self.migrate()
+
+        for i in range(4):
+            media = Media.objects.get(filename=f"img{i}.jpg")
+            self.assertEqual(media.storage_backend, "filesystem")
+            self.assertEqual(media.size_bytes, len(f"content {i}"))
+            self.assertEqual(media.read_bytes(), f"content {i}".encode())
+
+    def test_resumes_from_checkpoint(self):
+        import json
+
+        self.migrate()
+        with open(f"{self.sqlite_path}.migrate_media_bytes.json") as fh:
+            self.assertEqual(json.load(fh)["last_rowid"], 5)
+
+        # Rows before the checkpoint are not read again
+        Media.objects.create(
+            kind="image", filename="img4.jpg", content_type="image/jpeg",
+            size_bytes=0, checksum_sha256="",
+        )
+        self.migrate()
+        self.assertEqual(Media.objects.get(filename="img4.jpg").size_bytes, 0)
+
+        self.migrate(restart=True)
+        self.assertEqual(Media.objects.get(filename="img4.jpg").read_bytes(), b"content 4")
+
+    def test_dry_run_changes_nothing(self):
+        self.migrate(dry_run=True)
+        self.assertEqual(Media.objects.filter(size_bytes=0).count(), 4)
@@ -0,0 +1,116 @@
+"""
+Tests for the PLP response cache and its tag-based invalidation.
+"""
+
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Brand, Category, CategoryCatalog, Media, Product, Series, Variant
+from apps.catalog.plp import PLPView
+from apps.catalog.plp_cache import category_tag, invalidate_plp_tags
+from apps.common.utils import CACHE_KEY_CATALOG_MODE
+
+
+class PLPResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.root = Category.objects.create(name="Pişirme", slug="pisirme")
+        self.child = Category.objects.create(name="Ocaklar", slug="ocaklar", parent=self.root)
+        self.other = Category.objects.create(name="Soğutma", slug="sogutma")
+        self.other_child = Category.objects.create(name="Dolaplar", slug="dolaplar", parent=self.other)
+        self.brand = Brand.objects.create(name="VITAL", slug="vital", is_active=True)
+        self.series = Series.objects.create(name="Gazlı", slug="gazli", category=self.child)
+        self.other_series = Series.objects.create(name="Dolap", slug="dolap", category=self.other_child)
+        self.product = Product.objects.create(
+            name="Ocak", slug="ocak", title_tr="Ocak", series=self.series,
+            category=self.child, brand=self.brand, status="active",
+        )
+        Variant.objects.create(
+            product=self.product, model_code="GKO1", name_tr="GKO1", list_price=Decimal("100.00"),
+        )
+        self.other_product = Product.objects.create(
+            name="Dolap", slug="dolap", title_tr="Dolap", series=self.other_series,
+            category=self.other_child, status="active",
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def _get(self, query):
+        return self.client.get(f"/api/v1/plp/?{query}")
+
+    def test_equivalent_queries_share_entry(self):
+        first = self._get("category=pisirme&brands=vital,cgf&sort=bogus").json()
+        self.assertEqual(first["selected_filters"]["brands"], ["cgf", "vital"])
+        self.assertEqual(first["sort"], "name_asc")
+
+        with self.assertNumQueries(0):
+            second = self._get("brands=cgf,vital,vital&category=pisirme&page=1")
+        self.assertEqual(second.json(), first)
+
+    def test_product_change_invalidates_only_affected_categories(self):
+        self._get("category=pisirme")
+        self._get("category=sogutma")
+
+        self.product.title_tr = "Ocak 2"
+        self.product.save()
+
+        with self.assertNumQueries(0):
+            self._get("category=sogutma")
+        data = self._get("category=pisirme").json()
+        self.assertEqual(data["products"][0]["title_tr"], "Ocak 2")
+
+    def test_variant_and_brand_changes_invalidate(self):
+        self._get("category=ocaklar")
+        Variant.objects.create(
+            product=self.product, model_code="GKO2", name_tr="GKO2", list_price=Decimal("50.00"),
+        )
+        self.assertEqual(self._get("category=ocaklar").json()["products"][0]["price"]["min"], 50.0)
+
+        self.brand.name = "Vital Pro"
+        self.brand.save()
+        data = self._get("category=ocaklar").json()
+        self.assertEqual(data["facets"]["brands"][0]["name"], "Vital Pro")
+
+    def test_deleted_product_invalidates(self):
+        self._get("category=sogutma")
+        self.other_product.delete()
+        self.assertEqual(self._get("category=sogutma").json()["pagination"]["total"], 0)
+
+    def test_catalog_mode_is_cached_and_invalidated(self):
+        cache.set(CACHE_KEY_CATALOG_MODE, True)
+        self.assertEqual(self._get("category=ocaklar&brands=vital").json()["catalogs"], [])
+
+        with self.assertNumQueries(0):
+            self._get("category=ocaklar")
+
+        media = Media.objects.create(
+            kind="document", filename="k.pdf", content_type="application/pdf", bytes=b"%PDF",
+        )
+        CategoryCatalog.objects.create(category=self.child, title_tr="Katalog", media=media)
+        catalogs = self._get("category=ocaklar").json()["catalogs"]
+        self.assertEqual([c["title_tr"] for c in catalogs], ["Katalog"])
+
+    def test_change_during_build_is_not_cached(self):
+        build = PLPView._product_response
+
+        def build_then_change(view, category, params):
+            result = build(view, category, params)
+            # A product save commits while this response is being built
+            invalidate_plp_tags([category_tag(self.child.id)])
+            return result
+
+        with mock.patch.object(PLPView, "_product_response", build_then_change):
+            self._get("category=ocaklar")
+
+        with mock.patch.object(PLPView, "_product_response", autospec=True, side_effect=build) as rebuild:
+            self._get("category=ocaklar")
+        self.assertEqual(rebuild.call_count, 1)
+
+        with self.assertNumQueries(0):
+            self._get("category=ocaklar")
@@ -0,0 +1,109 @@
+"""
+Tests for PLP keyset (cursor) pagination.
+"""
+
+import base64
+import json
+import uuid
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Brand, Category, Product, Series, Variant
+
+
+class PLPCursorPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Ocaklar", slug="ocaklar")
+        self.series = Series.objects.create(name="Gazlı", slug="gazli", category=self.category)
+        self.brand = Brand.objects.create(name="VITAL", slug="vital", is_active=True)
+        # Ties on price and one product without variants (no price)
+        prices = ["300.00", "100.00", "200.00", "100.00", None, "200.00", "100.00"]
+        for index, price in enumerate(prices):
+            product = Product.objects.create(
+                name=f"Ocak {index}", slug=f"ocak-{index}", title_tr=f"Ocak {index}",
+                series=self.series, category=self.category, status="active",
+                brand=self.brand if index % 2 else None,
+            )
+            if price is not None:
+                Variant.objects.create(
+                    product=product, model_code=f"OC{index}", name_tr=f"Ocak {index}",
+                    list_price=Decimal(price),
+                )
+
+    def tearDown(self):
+        cache.clear()
+
+    def _get(self, query):
+        return self.client.get(f"/api/v1/plp/?category=ocaklar&{query}")
+
+    def _walk(self, query):
+        slugs, cursor, pages = [], "", 0
+        while True:
+            data = self._get(f"{query}&cursor={cursor}").json()
+            slugs += [p["slug"] for p in data["products"]]
+            pages += 1
+            if not data["pagination"]["has_next"]:
+                return slugs, pages, data["pagination"]
+            cursor = data["pagination"]["next_cursor"]
+
+    def test_cursor_walk_matches_page_mode(self):
+        for sort in ("price_asc", "price_desc", "name_desc", "newest"):
+            expected = [
+                p["slug"] for p in self._get(f"sort={sort}&page_size=100").json()["products"]
+            ]
+            slugs, pages, pagination = self._walk(f"sort={sort}&page_size=2")
+            self.assertEqual(slugs, expected, sort)
+            self.assertEqual(pages, 4)
+            self.assertEqual(pagination["mode"], "cursor")
+            self.assertIsNone(pagination["next_cursor"])
+
+    def test_unpriced_products_sort_last(self):
+        for sort in ("price_asc", "price_desc"):
+            slugs, _, _ = self._walk(f"sort={sort}&page_size=3")
+            self.assertEqual(slugs[-1], "ocak-4")
+
+    def test_total_comes_from_facet_pass(self):
+        data = self._get("cursor=&brands=vital&page_size=2").json()
+        self.assertEqual(data["pagination"]["total"], 3)
+        self.assertFalse(data["pagination"]["total_is_estimate"])
+        self.assertNotIn("page", data["pagination"])
+
+        data = self._get("cursor=&price_min=150").json()
+        self.assertEqual(data["pagination"]["total"], 3)
+
+    def test_invalid_or_foreign_cursor_is_rejected(self):
+        response = self._get("cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["code"], "INVALID_CURSOR")
+
+        cursor = self._get("cursor=&sort=price_asc&page_size=2").json()["pagination"]["next_cursor"]
+        response = self._get(f"cursor={cursor}&sort=name_asc")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["code"], "INVALID_CURSOR")
+
+    def test_tampered_cursor_values_are_rejected(self):
+        def cursor(sort_key, value, pk):
+            payload = json.dumps({"s": sort_key, "v": value, "k": pk})
+            return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+        pk = str(uuid.uuid4())
+        cases = [
+            ("name_asc", cursor("name_asc", "Ocak 1", "not-a-uuid")),
+            ("price_asc", cursor("price_asc", "cheap", pk)),
+            ("price_asc", cursor("price_asc", "NaN", pk)),
+            ("newest", cursor("newest", "yesterday", pk)),
+            ("newest", cursor("newest", "2026-01-01T10:00:00", pk)),
+        ]
+        for sort_key, value in cases:
+            response = self._get(f"sort={sort_key}&cursor={value}")
+            self.assertEqual(response.status_code, 400, (sort_key, value))
+            self.assertEqual(response.json()["code"], "INVALID_CURSOR")
+
+        # Well-formed values are still accepted
+        response = self._get(f"sort=newest&cursor={cursor('newest', '2026-01-01T10:00:00+00:00', pk)}")
+        self.assertEqual(response.status_code, 200)
@@ -9,7 +9,16 @@ from decimal import Decimal
 from django.test import TestCase
 from rest_framework.test import APIClient
 
-from apps.catalog.models import Brand, Category, Product, Series, Variant
+from apps.catalog.models import (
+    Brand,
+    Category,
+    Media,
+    Product,
+    ProductMedia,
+    Series,
+    SpecKey,
+    Variant,
+)
 
 
 class PLPEndpointTests(TestCase):
@@ -93,6 +102,32 @@ class PLPEndpointTests(TestCase):
             stock_qty=None,  # Unlimited stock
         )
     
+    def test_card_images_of_non_image_media_link_the_file(self):
+        pdf = Media.objects.create(
+            kind="pdf", filename="brosur.pdf", content_type="application/pdf", bytes=b"%PDF-1.4"
+        )
+        image = Media.objects.create(
+            kind="image", filename="ocak.png", content_type="image/png", bytes=b"png"
+        )
+        ProductMedia.objects.create(product=self.product1, media=pdf, is_primary=True)
+        ProductMedia.objects.create(product=self.product2, media=image, is_primary=True)
+
+        products = {
+            p["slug"]: p for p in self.client.get("/api/v1/plp/?category=ocaklar").json()["products"]
+        }
+        self.assertEqual(products["gazli-ocak-6010"]["hero_image_url"], f"/api/v1/media/{pdf.id}/file/")
+        self.assertIsNone(products["gazli-ocak-6010"]["hero_image_srcset"])
+        self.assertEqual(
+            products["gazli-ocak-6020"]["hero_image_url"],
+            f"/api/v1/media/{image.id}/file/?w=400&fmt=webp",
+        )
+
+        listed = {
+            p["slug"]: p["primary_image_url"]
+            for p in self.client.get("/api/v1/products/").json()["results"]
+        }
+        self.assertEqual(listed["gazli-ocak-6010"], f"/api/v1/media/{pdf.id}/file/")
+
     def test_plp_requires_category(self):
         """Test that category parameter is required."""
         response = self.client.get("/api/v1/plp/")
@@ -316,3 +351,68 @@ class PLPEndpointTests(TestCase):
         
         # Should be capped at 100
         self.assertLessEqual(data["pagination"]["page_size"], 100)
+
+    def test_plp_attribute_facets(self):
+        """Test spec attribute facets count products per value."""
+        SpecKey.objects.update_or_create(
+            slug="width", defaults={"label_tr": "Genişlik", "is_facetable": True}
+        )
+        SpecKey.objects.update_or_create(
+            slug="capacity", defaults={"label_tr": "Kapasite", "is_facetable": True}
+        )
+        specs = {
+            self.product1: {"width": "600"},
+            self.product2: {"width": 600, "capacity": ""},
+            self.product3: {"width": "900"},
+        }
+        for product, product_specs in specs.items():
+            for variant in product.variants.all():
+                variant.specs = product_specs
+                variant.save()
+
+        response = self.client.get("/api/v1/plp/?category=pisirme-ekipmanlari")
+        attributes = {a["key"]: a for a in response.json()["facets"]["attributes"]}
+
+        self.assertEqual(list(attributes), ["width"])
+        self.assertEqual(
+            [(o["value"], o["count"]) for o in attributes["width"]["options"]],
+            [("600", 2), ("900", 1)],
+        )
+
+    def test_plp_sibling_category_facets(self):
+        """Leaf categories list their siblings with subtree counts."""
+        response = self.client.get("/api/v1/plp/?category=ocaklar")
+        cat_facets = {c["slug"]: c for c in response.json()["facets"]["categories"]}
+
+        self.assertEqual(list(cat_facets), ["firinlar"])
+        self.assertEqual(cat_facets["firinlar"]["count"], 1)
+        self.assertEqual(cat_facets["firinlar"]["depth"], 1)
+
+    def test_plp_query_count_is_bounded(self):
+        """Facet queries do not grow with brands, series or child categories."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        url = "/api/v1/plp/?category=pisirme-ekipmanlari"
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(url)
+
+        for i in range(5):
+            child = Category.objects.create(name=f"Extra {i}", slug=f"extra-{i}", parent=self.root)
+            brand = Brand.objects.create(name=f"Brand {i}", slug=f"brand-{i}", is_active=True)
+            series = Series.objects.create(name=f"Series {i}", slug=f"series-{i}", category=child)
+            product = Product.objects.create(
+                name=f"Extra {i}", slug=f"extra-product-{i}", title_tr=f"Extra {i}",
+                series=series, category=child, brand=brand, status="active",
+            )
+            Variant.objects.create(
+                product=product, model_code=f"EX{i}", name_tr=f"Extra {i}",
+                list_price=Decimal("100.00"), specs={"width": str(i), "power_type": "gas"},
+            )
+
+        with CaptureQueriesContext(connection) as after:
+            response = self.client.get(url)
+
+        self.assertEqual(len(response.json()["facets"]["categories"]), 7)
+        self.assertEqual(len(after), len(before))
+        self.assertLessEqual(len(after), 12)
@@ -0,0 +1,132 @@
+"""
+Tests for the cached product detail document.
+"""
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.catalog.cache_keys import rebuild_lock_key, spec_keys_key
+from apps.catalog.catalog_snapshot import reset_catalog_snapshot
+from apps.catalog.models import (
+    Brand,
+    Category,
+    Media,
+    Product,
+    ProductMedia,
+    Series,
+    SpecKey,
+    Variant,
+)
+from apps.common.utils import CACHE_KEY_SHOW_PRICES
+
+
+class ProductDetailCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_catalog_snapshot()
+        self.client = APIClient()
+        category = Category.objects.create(name="Pişirme", slug="pisirme")
+        self.series = series = Series.objects.create(name="Gazlı", slug="gazli", category=category)
+        self.brand = Brand.objects.create(name="VITAL", slug="vital", is_active=True)
+        SpecKey.objects.create(slug="guc", label_tr="Güç")
+        self.product = Product.objects.create(
+            name="Ocak", slug="ocak", title_tr="Ocak", series=series, brand=self.brand,
+            status="active", spec_layout=["guc"],
+        )
+        self.variants = [
+            Variant.objects.create(
+                product=self.product, model_code=f"GKO{i}", name_tr=f"GKO{i}",
+                list_price=Decimal("100.00"), specs={"guc": f"{i} kW"},
+            )
+            for i in range(3)
+        ]
+        self.url = "/api/v1/products/ocak/"
+
+    def tearDown(self):
+        cache.clear()
+        reset_catalog_snapshot()
+
+    def test_repeat_view_is_one_lookup(self):
+        first = self.client.get(self.url).json()
+        self.assertEqual(len(first["variants"]), 3)
+        self.assertEqual([key["slug"] for key in first["spec_keys_resolved"]], ["guc"])
+
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url).json()
+        self.assertEqual(second, first)
+
+    def test_changes_are_visible_on_next_view(self):
+        self.client.get(self.url)
+
+        self.variants[0].name_tr = "Yeni"
+        self.variants[0].save()
+        names = [v["name_tr"] for v in self.client.get(self.url).json()["variants"]]
+        self.assertIn("Yeni", names)
+
+        self.brand.name = "VITAL PRO"
+        self.brand.save()
+        self.assertEqual(self.client.get(self.url).json()["brand_name"], "VITAL PRO")
+
+        spec_key = SpecKey.objects.get(slug="guc")
+        spec_key.label_tr = "Güç (kW)"
+        spec_key.save()
+        resolved = self.client.get(self.url).json()["spec_keys_resolved"]
+        self.assertEqual(resolved[0]["label_tr"], "Güç (kW)")
+
+    def test_document_with_stale_spec_keys_is_not_cached(self):
+        self.client.get(self.url)
+        spec_key = SpecKey.objects.get(slug="guc")
+        spec_key.label_tr = "Güç (kW)"
+        spec_key.save()
+        # Another request is rebuilding the spec key list
+        cache.add(rebuild_lock_key(spec_keys_key()), 1)
+
+        resolved = self.client.get(self.url).json()["spec_keys_resolved"]
+        self.assertEqual(resolved[0]["label_tr"], "Güç")
+
+        cache.delete(rebuild_lock_key(spec_keys_key()))
+        resolved = self.client.get(self.url).json()["spec_keys_resolved"]
+        self.assertEqual(resolved[0]["label_tr"], "Güç (kW)")
+
+    def test_product_changes_keep_other_documents(self):
+        other = Product.objects.create(
+            name="Fritöz", slug="fritoz", title_tr="Fritöz", series=self.series,
+            status="active",
+        )
+        image = Media.objects.create(
+            kind="image", filename="ocak.jpg", content_type="image/jpeg", bytes=b"ocak"
+        )
+        ProductMedia.objects.create(product=self.product, media=image)
+        self.client.get(self.url)
+        self.client.get("/api/v1/products/fritoz/")
+
+        Variant.objects.create(
+            product=other, model_code="FR1", name_tr="FR1", list_price=Decimal("50.00"),
+        )
+        Media.objects.create(
+            kind="image", filename="yeni.jpg", content_type="image/jpeg", bytes=b"yeni"
+        )
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+        self.assertEqual(len(self.client.get("/api/v1/products/fritoz/").json()["variants"]), 1)
+
+        image.filename = "ocak-on.jpg"
+        image.save()
+        media = self.client.get(self.url).json()["product_media"]
+        self.assertEqual(media[0]["filename"], "ocak-on.jpg")
+
+    def test_price_visibility_is_part_of_the_key(self):
+        self.assertIn("list_price", self.client.get(self.url).json()["variants"][0])
+
+        cache.set(CACHE_KEY_SHOW_PRICES, False)
+        variants = self.client.get(self.url).json()["variants"]
+        self.assertFalse(any("list_price" in variant for variant in variants))
+
+    def test_inactive_product_is_not_found(self):
+        self.client.get(self.url)
+        Product.objects.filter(pk=self.product.pk).update(status="draft")
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
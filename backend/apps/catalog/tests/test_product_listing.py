@@ -0,0 +1,150 @@
+"""
+Tests for the ProductListing read model and the listing views built on it.
+"""
+
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.catalog.listing import deferred_listing_refresh, refresh_listings
+from apps.catalog.models import (
+    Brand,
+    Category,
+    Media,
+    Product,
+    ProductListing,
+    ProductMedia,
+    Series,
+    Variant,
+)
+
+
+class ProductListingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Ocaklar", slug="ocaklar")
+        self.other = Category.objects.create(name="Fırınlar", slug="firinlar")
+        self.brand = Brand.objects.create(name="VITAL", slug="vital", is_active=True)
+        self.series = Series.objects.create(
+            name="Gazlı Ocaklar", slug="gazli-ocaklar", category=self.category, order=3
+        )
+        self.product = Product.objects.create(
+            name="Ocak 6010",
+            slug="ocak-6010",
+            title_tr="Ocak 6010",
+            series=self.series,
+            category=self.category,
+            brand=self.brand,
+            status="active",
+        )
+
+    def _listing(self):
+        return ProductListing.objects.get(product=self.product)
+
+    def _add_variant(self, code, price, stock_qty=None):
+        return Variant.objects.create(
+            product=self.product,
+            model_code=code,
+            name_tr=code,
+            list_price=Decimal(price),
+            stock_qty=stock_qty,
+        )
+
+    def test_row_follows_product_and_variants(self):
+        listing = self._listing()
+        self.assertEqual(listing.series_category_id, self.category.id)
+        self.assertEqual(listing.series_order, 3)
+        self.assertEqual(listing.variant_count, 0)
+        self.assertTrue(listing.in_stock)
+
+        self._add_variant("GKO1", "150.00", stock_qty=0)
+        variant = self._add_variant("GKO2", "90.00", stock_qty=0)
+        listing = self._listing()
+        self.assertEqual((listing.min_price, listing.max_price), (Decimal("90.00"), Decimal("150.00")))
+        self.assertEqual(listing.variant_count, 2)
+        self.assertFalse(listing.in_stock)
+
+        variant.stock_qty = 4
+        variant.save()
+        self.assertTrue(self._listing().in_stock)
+
+        variant.delete()
+        listing = self._listing()
+        self.assertEqual(listing.variant_count, 1)
+        self.assertEqual(listing.min_price, Decimal("150.00"))
+
+    def test_hero_media_and_series_changes(self):
+        first = Media.objects.create(kind="image", filename="a.jpg", content_type="image/jpeg", bytes=b"a")
+        second = Media.objects.create(kind="image", filename="b.jpg", content_type="image/jpeg", bytes=b"b")
+        ProductMedia.objects.create(product=self.product, media=first, sort_order=0)
+        self.assertEqual(self._listing().hero_media_id, first.id)
+        ProductMedia.objects.create(product=self.product, media=second, sort_order=1, is_primary=True)
+        self.assertEqual(self._listing().hero_media_id, second.id)
+
+        self.series.category = self.other
+        self.series.order = 7
+        self.series.save()
+        listing = self._listing()
+        self.assertEqual(listing.series_category_id, self.other.id)
+        self.assertEqual(listing.series_order, 7)
+
+    def test_row_removed_when_inactive_or_deleted(self):
+        self._add_variant("GKO1", "10.00")
+        self.product.status = "draft"
+        self.product.save()
+        self.assertFalse(ProductListing.objects.exists())
+
+        self.product.status = "active"
+        self.product.save()
+        self.assertTrue(ProductListing.objects.exists())
+
+        self.product.delete()
+        self.assertFalse(ProductListing.objects.exists())
+
+    def test_deferred_refresh_runs_once(self):
+        with deferred_listing_refresh():
+            self._add_variant("GKO1", "10.00")
+            self._add_variant("GKO2", "20.00")
+            self.assertEqual(self._listing().variant_count, 0)
+            with self.assertNumQueries(0):
+                self.assertEqual(refresh_listings([self.product.id]), 0)
+        self.assertEqual(self._listing().variant_count, 2)
+
+    def test_rebuild_command_repairs_bulk_changes(self):
+        Variant.objects.bulk_create([
+            Variant(product=self.product, model_code="B1", name_tr="B1", list_price=Decimal("5.00")),
+        ])
+        ProductListing.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_product_listing", stdout=out)
+        self.assertIn("1 rows", out.getvalue())
+        self.assertEqual(self._listing().min_price, Decimal("5.00"))
+
+    def test_views_read_listing_rows(self):
+        self._add_variant("GKO1", "10.00")
+        second = Product.objects.create(
+            name="Ocak 6020", slug="ocak-6020", title_tr="Ocak 6020",
+            series=self.series, category=self.category, brand=self.brand, status="active",
+        )
+        Product.objects.create(
+            name="Taslak", slug="taslak", title_tr="Taslak",
+            series=self.series, category=self.category, status="draft",
+        )
+        # Listing rows are the source of truth for listings
+        ProductListing.objects.filter(product=second).delete()
+
+        plp = self.client.get("/api/v1/plp/", {"category": "ocaklar"}).json()
+        self.assertEqual([p["slug"] for p in plp["products"]], ["ocak-6010"])
+        self.assertEqual(plp["products"][0]["price"]["min"], 10.0)
+
+        browse = self.client.get("/api/v1/browse/", {"category": "ocaklar"}).json()
+        self.assertEqual([p["slug"] for p in browse["products"]], ["ocak-6010"])
+        self.assertEqual(browse["products"][0]["variants_count"], 1)
+        self.assertEqual(browse["series"], [])
+        self.assertEqual(browse["singleton_series_count"], 1)
+
+        products = self.client.get("/api/v1/products/").json()
+        self.assertEqual([p["slug"] for p in products["results"]], ["ocak-6010"])
@@ -0,0 +1,118 @@
+"""
+Tests for product search over the ProductListing search document.
+"""
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Category, Product, ProductListing, Series, Variant
+from apps.catalog.search import build_search_text, normalize_search
+
+
+class SearchDocumentTests(TestCase):
+    def test_normalization_folds_turkish(self):
+        self.assertEqual(normalize_search("  GAZLI  Ocak "), "gazli ocak")
+        self.assertEqual(normalize_search("Şişirme Ünitesi"), "sisirme unitesi")
+        self.assertEqual(normalize_search(None), "")
+        self.assertEqual(build_search_text(["Gazlı", None, "", "GKO6010"]), "gazli gko6010")
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Pişirme Üniteleri", slug="pisirme")
+        self.other = Category.objects.create(name="Fırınlar", slug="firinlar")
+        self.series = Series.objects.create(
+            name="Gazlı Ocaklar", slug="gazli-ocaklar", category=self.category
+        )
+        self.ocak = Product.objects.create(
+            name="Ocak 6010", slug="ocak-6010", title_tr="Ocak 6010",
+            series=self.series, category=self.category, status="active",
+        )
+        Variant.objects.create(
+            product=self.ocak, model_code="GKO6010", sku="SKU-991",
+            name_tr="Gazlı Ocak", list_price=Decimal("100.00"),
+        )
+        self.other_series = Series.objects.create(
+            name="Konveksiyon", slug="konveksiyon", category=self.other
+        )
+        self.firin = Product.objects.create(
+            name="Konveksiyonlu Fırın", slug="konveksiyonlu-firin",
+            title_tr="Konveksiyonlu Fırın", series=self.other_series,
+            category=self.other, status="active",
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def _search(self, value):
+        response = self.client.get("/api/v1/products/", {"search": value})
+        self.assertEqual(response.status_code, 200)
+        return [p["slug"] for p in response.json()["results"]]
+
+    def test_document_covers_variants_series_and_category(self):
+        text = ProductListing.objects.get(product=self.ocak).search_text
+        for part in ("ocak 6010", "gko6010", "sku-991", "gazli ocaklar", "pisirme uniteleri"):
+            self.assertIn(part, text)
+
+    def test_products_search_folds_turkish_and_case(self):
+        self.assertEqual(self._search("GAZLI"), ["ocak-6010"])
+        self.assertEqual(self._search("gazlı ocak"), ["ocak-6010"])
+        self.assertEqual(self._search("gko6010"), ["ocak-6010"])
+        self.assertEqual(self._search("firin"), ["konveksiyonlu-firin"])
+        self.assertEqual(self._search("kazan"), [])
+
+    def test_document_follows_variant_and_category_changes(self):
+        Variant.objects.create(
+            product=self.firin, model_code="KF-400", name_tr="Fırın", list_price=Decimal("50.00"),
+        )
+        self.assertEqual(self._search("kf-400"), ["konveksiyonlu-firin"])
+
+        self.other.name = "Fırın Grupları"
+        self.other.save()
+        self.assertEqual(self._search("gruplari"), ["konveksiyonlu-firin"])
+
+    def test_plp_search_mode(self):
+        response = self.client.get("/api/v1/plp/", {"category": "pisirme", "search": "Gazlı"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([p["slug"] for p in data["products"]], ["ocak-6010"])
+        self.assertEqual(data["sort"], "relevance")
+        self.assertEqual(data["selected_filters"]["search"], "gazli")
+        self.assertEqual(data["sort_options"][0]["key"], "relevance")
+
+        # Outside the category subtree nothing matches
+        data = self.client.get(
+            "/api/v1/plp/", {"category": "pisirme", "search": "firin"}
+        ).json()
+        self.assertEqual(data["products"], [])
+        self.assertEqual(data["pagination"]["total"], 0)
+
+    def test_plp_relevance_requires_search(self):
+        data = self.client.get(
+            "/api/v1/plp/", {"category": "pisirme", "sort": "relevance"}
+        ).json()
+        self.assertEqual(data["sort"], "name_asc")
+        self.assertNotIn("relevance", [option["key"] for option in data["sort_options"]])
+
+    def test_plp_search_cursor_walk(self):
+        for index in range(3):
+            Product.objects.create(
+                name=f"Ocak {index}", slug=f"ocak-{index}", title_tr=f"Gazlı Ocak {index}",
+                series=self.series, category=self.category, status="active",
+            )
+        slugs, cursor = [], ""
+        while True:
+            data = self.client.get(
+                "/api/v1/plp/",
+                {"category": "pisirme", "search": "ocak", "page_size": 2, "cursor": cursor},
+            ).json()
+            slugs += [p["slug"] for p in data["products"]]
+            if not data["pagination"]["has_next"]:
+                break
+            cursor = data["pagination"]["next_cursor"]
+        self.assertEqual(sorted(slugs), ["ocak-0", "ocak-1", "ocak-2", "ocak-6010"])
@@ -0,0 +1,214 @@
+"""
+Tests for SpecKey-driven PLP attribute facets, numeric range filters and
+the spec value index.
+"""
+
+from decimal import Decimal
+from importlib import import_module
+
+from django.apps import apps as django_apps
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.catalog.admin_serializers import AdminSpecKeySerializer
+from apps.catalog.models import Category, Product, ProductSpecValue, Series, SpecKey, Variant
+
+
+class SpecFacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Ocaklar", slug="ocaklar")
+        self.series = Series.objects.create(name="Gazlı", slug="gazli", category=self.category)
+        self.width = SpecKey.objects.create(
+            slug="genislik", label_tr="Genişlik", unit="mm",
+            value_type=SpecKey.ValueType.INT, is_facetable=True,
+        )
+        self.fuel = SpecKey.objects.create(slug="yakit", label_tr="Yakıt")
+        self.products = [
+            self._product("ocak-1", {"genislik": "600 mm", "yakit": "gaz"}),
+            self._product("ocak-2", {"genislik": 600, "yakit": "elektrik"}),
+            self._product("ocak-3", {"genislik": "900,0", "yakit": "gaz"}),
+        ]
+
+    def tearDown(self):
+        cache.clear()
+
+    def _product(self, slug, specs):
+        product = Product.objects.create(
+            name=slug, slug=slug, title_tr=slug, series=self.series,
+            category=self.category, status="active",
+        )
+        Variant.objects.create(
+            product=product, model_code=slug.upper(), name_tr=slug,
+            list_price=Decimal("100.00"), specs=specs,
+        )
+        return product
+
+    def _plp(self, query=""):
+        return self.client.get(f"/api/v1/plp/?category=ocaklar{query}").json()
+
+    def _attributes(self, data):
+        return {a["key"]: a for a in data["facets"]["attributes"]}
+
+    def test_numeric_values_are_normalized(self):
+        self.assertEqual(
+            sorted(ProductSpecValue.objects.filter(spec_key=self.width).values_list("value", flat=True)),
+            ["600", "600", "900"],
+        )
+        attributes = self._attributes(self._plp())
+        self.assertNotIn("yakit", attributes)
+        self.assertEqual(
+            [(o["value"], o["count"], o["label"]) for o in attributes["genislik"]["options"]],
+            [("600", 2, "600 mm"), ("900", 1, "900 mm")],
+        )
+        self.assertEqual(self._plp("&attrs=genislik:600")["pagination"]["total"], 2)
+
+    def test_numbers_beyond_the_column_are_indexed_as_text(self):
+        product = self._product("ocak-4", {"genislik": "8691234567890123"})
+        Variant.objects.create(
+            product=product, model_code="OCAK-4B", name_tr="ocak-4b",
+            list_price=Decimal("100.00"), specs={"genislik": "2,123456"},
+        )
+
+        values = ProductSpecValue.objects.filter(spec_key=self.width, product=product)
+        self.assertEqual(
+            sorted(values.values_list("value", "numeric_value")),
+            [("2.1235", Decimal("2.1235")), ("8691234567890123", None)],
+        )
+
+    def test_buckets_and_bucket_filter(self):
+        self.width.facet_buckets = [700]
+        self.width.save()
+
+        options = self._attributes(self._plp())["genislik"]["options"]
+        self.assertEqual(
+            [(o["value"], o["count"], o["label"]) for o in options],
+            [("..700", 2, "< 700 mm"), ("700..", 1, "≥ 700 mm")],
+        )
+        data = self._plp("&attrs=genislik:700..")
+        self.assertEqual([p["slug"] for p in data["products"]], ["ocak-3"])
+
+    def test_enabling_facet_reindexes_key(self):
+        self.assertFalse(ProductSpecValue.objects.filter(spec_key=self.fuel).exists())
+
+        self.fuel.is_facetable = True
+        self.fuel.save()
+        options = self._attributes(self._plp())["yakit"]["options"]
+        self.assertEqual([(o["value"], o["count"]) for o in options], [("gaz", 2), ("elektrik", 1)])
+        self.assertEqual(self._plp("&attrs=yakit:gaz")["pagination"]["total"], 2)
+
+        self.products[0].status = "draft"
+        self.products[0].save()
+        self.assertFalse(ProductSpecValue.objects.filter(product=self.products[0]).exists())
+
+    def test_admin_bucket_validation(self):
+        serializer = AdminSpecKeySerializer(self.fuel, data={"facet_buckets": [1, 2]}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        serializer = AdminSpecKeySerializer(self.width, data={"facet_buckets": [900, 600]}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        serializer = AdminSpecKeySerializer(self.width, data={"facet_buckets": [600, 900]}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+class SpecRangeFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Ocaklar", slug="ocaklar")
+        self.series = Series.objects.create(name="Gazlı", slug="gazli", category=self.category)
+        # Numeric but not facetable: indexed for range filters only
+        self.power = SpecKey.objects.create(
+            slug="guc", label_tr="Güç", unit="kW", value_type=SpecKey.ValueType.DECIMAL,
+        )
+        self.fuel = SpecKey.objects.create(slug="yakit", label_tr="Yakıt", is_facetable=True)
+        for slug, power in [("ocak-1", "2,5 kW"), ("ocak-2", 6), ("ocak-3", "12.0"), ("ocak-4", None)]:
+            product = Product.objects.create(
+                name=slug, slug=slug, title_tr=slug, series=self.series,
+                category=self.category, status="active",
+            )
+            Variant.objects.create(
+                product=product, model_code=slug.upper(), name_tr=slug,
+                list_price=Decimal("100.00"), specs={"guc": power, "yakit": "gaz"},
+            )
+
+    def tearDown(self):
+        cache.clear()
+
+    def _plp(self, query=""):
+        return self.client.get(f"/api/v1/plp/?category=ocaklar{query}")
+
+    def _slugs(self, query):
+        return [p["slug"] for p in self._plp(query).json()["products"]]
+
+    def test_range_facet_reports_min_and_max(self):
+        data = self._plp().json()
+        self.assertEqual(
+            data["facets"]["ranges"],
+            [{"key": "guc", "label": "Güç", "unit": "kW", "min": 2.5, "max": 12.0}],
+        )
+        self.assertNotIn("guc", {a["key"] for a in data["facets"]["attributes"]})
+
+    def test_range_bounds_are_inclusive(self):
+        self.assertEqual(self._slugs("&range=guc:2.5..6"), ["ocak-1", "ocak-2"])
+        self.assertEqual(self._slugs("&range=guc:6.."), ["ocak-2", "ocak-3"])
+        self.assertEqual(self._slugs("&range=guc:..2.5"), ["ocak-1"])
+
+        data = self._plp("&range=guc:6.00..12").json()
+        self.assertEqual(data["selected_filters"]["range"], "guc:6..12")
+
+    def test_range_on_unknown_or_text_key_is_rejected(self):
+        for query in ("&range=agirlik:1..2", "&range=yakit:1..2"):
+            response = self._plp(query)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()["code"], "INVALID_RANGE_KEY")
+
+    def test_value_type_change_reindexes_key(self):
+        self.power.value_type = SpecKey.ValueType.TEXT
+        self.power.save()
+        self.assertFalse(ProductSpecValue.objects.filter(spec_key=self.power).exists())
+        self.assertEqual(self._plp().json()["facets"]["ranges"], [])
+
+
+class LegacyFacetMigrationTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Fırınlar", slug="firinlar")
+        self.series = Series.objects.create(name="Konveksiyon", slug="konveksiyon", category=self.category)
+        # Not indexed yet, as before the migration
+        self.width = SpecKey.objects.create(slug="width", label_tr="Genişlik")
+        for slug, specs in [
+            ("firin-1", {"capacity": "10 tepsi", "width": "900 mm", "depth": ""}),
+            ("firin-2", {"capacity": "6 tepsi", "width": 600}),
+        ]:
+            product = Product.objects.create(
+                name=slug, slug=slug, title_tr=slug, series=self.series,
+                category=self.category, status="active",
+            )
+            Variant.objects.create(
+                product=product, model_code=slug.upper(), name_tr=slug,
+                list_price=Decimal("100.00"), specs=specs,
+            )
+
+    def _migrate(self):
+        migration = import_module("apps.catalog.migrations.0029_spec_facets")
+        migration.enable_legacy_facets(django_apps, None)
+
+    def test_keys_with_values_are_created_and_indexed(self):
+        self._migrate()
+
+        capacity = SpecKey.objects.get(slug="capacity")
+        self.assertTrue(capacity.is_facetable)
+        self.assertEqual(capacity.label_tr, "Kapasite")
+        self.assertEqual(
+            sorted(ProductSpecValue.objects.filter(spec_key=capacity).values_list("value", flat=True)),
+            ["10 tepsi", "6 tepsi"],
+        )
+        self.width.refresh_from_db()
+        self.assertTrue(self.width.is_facetable)
+        self.assertEqual(
+            sorted(ProductSpecValue.objects.filter(spec_key=self.width).values_list("value", flat=True)),
+            ["600", "900 mm"],
+        )
+        # Blank or absent everywhere: no key and no empty facet
+        self.assertFalse(SpecKey.objects.filter(slug__in=["depth", "power_type", "series_type"]).exists())
@@ -0,0 +1,119 @@
+"""
+Tests for stale-while-revalidate caching of catalog trees.
+"""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.catalog import stale_cache
+from apps.catalog.cache_keys import clear_nav_cache, nav_key, rebuild_lock_key
+from apps.catalog.catalog_snapshot import get_catalog_snapshot, reset_catalog_snapshot
+from apps.catalog.models import Category
+from apps.catalog.stale_cache import cache_stats, get_or_build, reset_cache_stats
+
+User = get_user_model()
+
+
+class StaleCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+        self.builds = []
+
+    def tearDown(self):
+        cache.clear()
+
+    def build(self, value="tree"):
+        def _build():
+            self.builds.append(value)
+            return value
+        return _build
+
+    def test_fresh_entry_is_built_once(self):
+        self.assertEqual(get_or_build("nav", "k", self.build(), 60), ("tree", True))
+        self.assertEqual(get_or_build("nav", "k", self.build(), 60), ("tree", True))
+
+        self.assertEqual(self.builds, ["tree"])
+        stats = cache_stats()["nav"]
+        self.assertEqual((stats["hits"], stats["misses"], stats["rebuilds"]), (1, 1, 1))
+        self.assertEqual(stats["hit_ratio"], 0.5)
+
+    def test_soft_expired_entry_is_served_while_another_request_rebuilds(self):
+        cache.set("k", {"value": "old", "fresh_until": 0})
+        cache.add(rebuild_lock_key("k"), 1)
+
+        value, fresh = get_or_build("nav", "k", self.build("new"), 60)
+
+        self.assertEqual((value, fresh), ("old", False))
+        self.assertEqual(self.builds, [])
+        self.assertEqual(cache_stats()["nav"]["stale_hits"], 1)
+
+    def test_soft_expired_entry_is_rebuilt_by_the_lock_holder(self):
+        cache.set("k", {"value": "old", "fresh_until": 0})
+
+        value, fresh = get_or_build("nav", "k", self.build("new"), 60)
+
+        self.assertEqual((value, fresh), ("new", True))
+        self.assertIsNone(cache.get(rebuild_lock_key("k")))
+
+    def test_stale_copy_survives_new_keys(self):
+        get_or_build("nav", "k1", self.build("old"), 60, stale_key="stale")
+        cache.add(rebuild_lock_key("k2"), 1)
+
+        self.assertEqual(
+            get_or_build("nav", "k2", self.build("new"), 60, stale_key="stale"), ("old", False)
+        )
+
+    def test_cold_cache_waits_then_builds(self):
+        cache.add(rebuild_lock_key("k"), 1)
+
+        with mock.patch.object(stale_cache, "LOCK_WAIT_SECONDS", 0.1):
+            self.assertEqual(get_or_build("nav", "k", self.build(), 60), ("tree", True))
+
+        self.assertEqual(cache_stats()["nav"]["lock_waits"], 1)
+
+
+class SnapshotStaleCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+        reset_catalog_snapshot()
+        self.client = APIClient()
+        Category.objects.create(name="Pişirme", slug="pisirme", order=1)
+
+    def tearDown(self):
+        cache.clear()
+        reset_catalog_snapshot()
+
+    def test_stale_nav_is_served_but_not_kept(self):
+        self.client.get("/api/v1/nav/")
+        Category.objects.create(name="Soğutma", slug="sogutma", order=2)
+        clear_nav_cache()
+        # Another request is rebuilding the new generation
+        cache.add(rebuild_lock_key(nav_key()), 1)
+
+        with self.assertNumQueries(0):
+            stale = self.client.get("/api/v1/nav/").json()
+        self.assertEqual([c["slug"] for c in stale], ["pisirme"])
+
+        cache.delete(rebuild_lock_key(nav_key()))
+        fresh = self.client.get("/api/v1/nav/").json()
+        self.assertEqual([c["slug"] for c in fresh], ["pisirme", "sogutma"])
+        self.assertIs(get_catalog_snapshot().nav, get_catalog_snapshot().nav)
+
+    def test_stats_endpoint_reports_families(self):
+        user = User.objects.create_user(
+            email="admin@test.com", password="testpassword123", role="admin"
+        )
+        self.client.force_authenticate(user)
+        self.client.get("/api/v1/nav/")
+
+        response = self.client.get("/api/v1/admin/stats/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["catalog_cache"]["nav"]["rebuilds"], 1)
+        self.assertIn("taxonomy_tree", response.data["catalog_cache"])
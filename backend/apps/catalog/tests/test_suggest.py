@@ -0,0 +1,94 @@
+"""
+Tests for the typeahead suggestion endpoint and its prefix index.
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Brand, Category, Product, Series, Variant
+from apps.catalog.suggest import PrefixIndex, get_suggest_service
+
+
+class PrefixIndexTests(TestCase):
+    def setUp(self):
+        self.index = PrefixIndex([
+            {"type": "product", "label": "Gazlı Ocak 6010", "slug": "gazli-ocak"},
+            {"type": "model_code", "label": "GKO-6010", "slug": "gazli-ocak", "product_title": "Gazlı Ocak 6010"},
+            {"type": "series", "label": "Ocaklar", "slug": "ocaklar", "category_slug": "pisirme"},
+            {"type": "brand", "label": "Vital", "slug": "vital"},
+        ])
+
+    def _labels(self, query):
+        return [entry["label"] for entry in self.index.lookup(query)]
+
+    def test_matches_word_starts_and_folds_turkish(self):
+        self.assertEqual(self._labels("gazli"), ["Gazlı Ocak 6010"])
+        # Label prefixes rank before inner word matches
+        self.assertEqual(self._labels("ocak"), ["Ocaklar", "Gazlı Ocak 6010"])
+        self.assertEqual(self._labels("vit"), ["Vital"])
+        self.assertEqual(self._labels("kazan"), [])
+
+    def test_model_codes_match_without_punctuation(self):
+        self.assertEqual(self._labels("gko60"), ["GKO-6010"])
+        self.assertEqual(self._labels("gko-60"), ["GKO-6010"])
+        self.assertEqual(self._labels("6010"), ["GKO-6010", "Gazlı Ocak 6010"])
+
+    def test_limit(self):
+        self.assertEqual(len(self.index.lookup("o", limit=1)), 1)
+
+
+class SuggestEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_suggest_service.cache_clear()
+        self.client = APIClient()
+        category = Category.objects.create(name="Pişirme", slug="pisirme")
+        self.series = Series.objects.create(name="Gazlı Ocaklar", slug="gazli-ocaklar", category=category)
+        Brand.objects.create(name="VITAL", slug="vital", is_active=True)
+        Brand.objects.create(name="Gizli", slug="gizli", is_active=False)
+        self.product = Product.objects.create(
+            name="Ocak", slug="ocak-6010", title_tr="Ocak 6010",
+            series=self.series, category=category, status="active",
+        )
+        Variant.objects.create(product=self.product, model_code="GKO6010", name_tr="Ocak")
+        draft = Product.objects.create(
+            name="Taslak", slug="taslak", title_tr="Taslak Ocak",
+            series=self.series, category=category, status="draft",
+        )
+        Variant.objects.create(product=draft, model_code="GKO9999", name_tr="Taslak")
+
+    def tearDown(self):
+        cache.clear()
+        get_suggest_service.cache_clear()
+
+    def _get(self, q):
+        response = self.client.get("/api/v1/suggest/", {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_suggests_public_catalog_only(self):
+        results = self._get("GKO")
+        self.assertEqual([r["label"] for r in results], ["GKO6010"])
+        self.assertEqual(results[0]["slug"], "ocak-6010")
+        self.assertEqual([r["type"] for r in self._get("gazli")], ["series"])
+        self.assertEqual(self._get("gizli"), [])
+        self.assertEqual(self._get("g"), [])
+
+    def test_repeat_requests_make_no_queries(self):
+        self._get("ocak")
+        with self.assertNumQueries(0):
+            self._get("ocak 60")
+
+    def test_catalog_changes_refresh_the_index(self):
+        self.assertEqual(self._get("yeni"), [])
+
+        Variant.objects.create(product=self.product, model_code="YENI-100", name_tr="Yeni")
+        self.assertEqual([r["label"] for r in self._get("yeni")], ["YENI-100"])
+
+        self.series.name = "Elektrikli Ocaklar"
+        self.series.save()
+        self.assertEqual([r["label"] for r in self._get("elektrik")], ["Elektrikli Ocaklar"])
+
+        self.product.delete()
+        self.assertEqual(self._get("gko"), [])
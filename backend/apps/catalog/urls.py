@@ -25,6 +25,7 @@ from .views import (
     ProductListView,
     SeriesListView,
     SpecKeyListView,
+    SuggestView,
     TaxonomyTreeView,
     VariantByCodesView,
 )
@@ -64,6 +65,9 @@ urlpatterns = [
     path("products/", ProductListView.as_view(), name="product-list"),
     path("products/<slug:slug>/", ProductDetailView.as_view(), name="product-detail"),
     
+    # Typeahead
+    path("suggest/", SuggestView.as_view(), name="suggest"),
+
     # Media
     path("media/<uuid:id>/", MediaMetadataView.as_view(), name="media-metadata"),
     path("media/<uuid:id>/file/", MediaFileView.as_view(), name="media-file"),
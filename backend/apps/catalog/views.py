@@ -5,10 +5,12 @@ All endpoints are public (AllowAny permission).
 Implements caching for navigation and tree endpoints.
 """
 
+import logging
+
 from django.conf import settings
 from django.core.cache import cache
-from django.db.models import Count, Prefetch, Q
-from django.http import HttpResponse
+from django.db.models import Count, F, Prefetch, Q
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
@@ -27,15 +29,16 @@ from drf_spectacular.utils import (
 )
 
 from .cache_keys import (
-    nav_key,
-    categories_tree_key,
-    taxonomy_tree_key,
-    spec_keys_key,
-    NAV_CACHE_TTL,
-    TREE_CACHE_TTL,
-    SPEC_KEYS_CACHE_TTL,
+    PRODUCT_DETAIL_CACHE_TTL,
+    SPEC_KEYS,
+    get_product_detail_version,
+    product_detail_key,
 )
+from .catalog_snapshot import get_catalog_snapshot
 from .filters import ProductFilter
+from .media_cache import get_media_hot_cache, max_item_bytes as max_hot_item_bytes
+from .media_delivery import build_media_response
+from .media_derivatives import DerivativeError, get_derivative, parse_derivative_params
 from .query_utils import parse_bool_param, resolve_category_ids
 from .models import (
     Brand,
@@ -45,6 +48,7 @@ from .models import (
     CategoryCatalog,
     Media,
     Product,
+    ProductListing,
     ProductMedia,
     Series,
     SpecKey,
@@ -52,6 +56,11 @@ from .models import (
     Variant,
 )
 from .pagination import ProductCursorPagination
+from .suggest import (
+    DEFAULT_LIMIT as SUGGEST_DEFAULT_LIMIT,
+    MAX_LIMIT as SUGGEST_MAX_LIMIT,
+    get_suggest_service,
+)
 from .serializers import (
     BrandDetailSerializer,
     BrandListSerializer,
@@ -73,8 +82,10 @@ from .serializers import (
     TaxonomyNodeTreeSerializer,
     VariantLookupSerializer,
 )
-from apps.common.utils import get_catalog_mode
+from apps.common.canonical import canonical_text
+from apps.common.utils import get_catalog_mode, get_show_prices
 
+logger = logging.getLogger(__name__)
 
 # =============================================================================
 # Cache Configuration (legacy, use cache_keys module)
@@ -100,44 +111,14 @@ class NavView(APIView):
     GET /api/v1/nav
     
     Returns categories with nested series for navigation.
-    Cached in Redis for 5 minutes.
+    Served from the worker's catalog snapshot (backed by Redis).
     """
     
     authentication_classes = []
     permission_classes = [AllowAny]
     
     def get(self, request):
-        cache_key = nav_key()
-        cached_data = cache.get(cache_key)
-
-        if cached_data is not None:
-            return Response(cached_data)
-
-        # Fetch only root categories with prefetched series
-        # Series are annotated with product counts for visibility calculation
-        # Subcategories are no longer nested; they appear as filters in PLP
-        root_categories = list(
-            Category.objects.filter(parent__isnull=True)
-            .prefetch_related(
-                Prefetch(
-                    "series",
-                    queryset=Series.objects.annotate(
-                        _product_count=Count(
-                            'products',
-                            filter=Q(products__status='active')
-                        )
-                    ).order_by("order", "name"),
-                )
-            )
-            .order_by("order", "name")
-        )
-
-        serializer = NavCategorySerializer(root_categories, many=True)
-        data = serializer.data
-
-        cache.set(cache_key, data, NAV_CACHE_TTL)
-        return Response(data)
-
+        return Response(get_catalog_snapshot().nav)
 
 
 # =============================================================================
@@ -207,50 +188,7 @@ class CategoryTreeView(APIView):
     permission_classes = [AllowAny]
     
     def get(self, request):
-        cache_key = categories_tree_key()
-        cached_data = cache.get(cache_key)
-        
-        if cached_data is not None:
-            return Response(cached_data)
-        
-        # Fetch root categories
-        categories = Category.objects.filter(parent__isnull=True).order_by("order", "name")
-        
-        # Prefetch all categories to avoid N+1 with counts
-        all_categories = list(
-            Category.objects
-            .select_related("parent")
-            .annotate(
-                products_count=Count(
-                    'series__products',
-                    filter=Q(series__products__status='active'),
-                    distinct=True
-                ),
-                subcategory_count=Count('children', distinct=True)
-            )
-        )
-
-        # Build children map
-        children_map = {}
-        for cat in all_categories:
-            if cat.parent_id:
-                if cat.parent_id not in children_map:
-                    children_map[cat.parent_id] = []
-                children_map[cat.parent_id].append(cat)
-
-        # Attach children to categories
-        for cat in all_categories:
-            cat._prefetched_children = children_map.get(cat.id, [])
-        
-        # Filter root categories with attached children
-        root_categories = [c for c in all_categories if c.parent_id is None]
-        root_categories.sort(key=lambda x: (x.order, x.name))
-        
-        serializer = CategoryTreeSerializer(root_categories, many=True)
-        data = serializer.data
-        
-        cache.set(cache_key, data, TREE_CACHE_TTL)
-        return Response(data)
+        return Response(get_catalog_snapshot().category_tree)
 
 
 @extend_schema(
@@ -606,41 +544,9 @@ class TaxonomyTreeView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         
-        cache_key = taxonomy_tree_key(series_slug)
-        cached_data = cache.get(cache_key)
-        
-        if cached_data is not None:
-            return Response(cached_data)
-        
-        # Get series
-        series = get_object_or_404(Series, slug=series_slug)
-        
-        # Fetch all nodes for this series
-        all_nodes = list(
-            TaxonomyNode.objects.filter(series=series)
-            .select_related("parent")
-            .order_by("order", "name")
-        )
-        
-        # Build children map
-        children_map = {}
-        for node in all_nodes:
-            if node.parent_id:
-                if node.parent_id not in children_map:
-                    children_map[node.parent_id] = []
-                children_map[node.parent_id].append(node)
-        
-        # Attach children and compute depth
-        for node in all_nodes:
-            node._prefetched_children = children_map.get(node.id, [])
-        
-        # Filter root nodes
-        root_nodes = [n for n in all_nodes if n.parent_id is None]
-        
-        serializer = TaxonomyNodeTreeSerializer(root_nodes, many=True)
-        data = serializer.data
-        
-        cache.set(cache_key, data, TREE_CACHE_TTL)
+        data = get_catalog_snapshot().taxonomy_tree(series_slug)
+        if data is None:
+            raise Http404("No Series matches the given query.")
         return Response(data)
 
 
@@ -666,7 +572,14 @@ class SpecKeyListView(generics.ListAPIView):
     authentication_classes = []
     permission_classes = [AllowAny]
     serializer_class = SpecKeySerializer
-    queryset = SpecKey.objects.order_by("sort_order", "label_tr")
+
+    def list(self, request, *args, **kwargs):
+        # Serialized once per catalog generation (see catalog_snapshot)
+        data = get_catalog_snapshot().spec_keys
+        page = self.paginate_queryset(data)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(data)
 
 
 # =============================================================================
@@ -753,9 +666,22 @@ class ProductListView(generics.ListAPIView):
         if get_catalog_mode():
             return Product.objects.none()
 
-        queryset = (
-            Product.objects
-            .select_related("series", "series__category", "primary_node", "brand")
+        queryset = Product.objects.select_related(
+            "series", "series__category", "primary_node", "brand"
+        )
+
+        # Default to active only if status not specified. Active products
+        # are read through their listing row, which carries the variant
+        # count and hero image, so no aggregation or media prefetch is needed.
+        if "status" not in self.request.query_params:
+            return queryset.filter(listing__isnull=False).annotate(
+                _variants_count=F("listing__variant_count"),
+                _hero_media_id=F("listing__hero_media_id"),
+                _hero_media_kind=F("listing__hero_media__kind"),
+            )
+
+        return (
+            queryset
             .prefetch_related(
                 # Only prefetch media metadata, not bytes
                 Prefetch(
@@ -775,10 +701,6 @@ class ProductListView(generics.ListAPIView):
             .annotate(_variants_count=Count("variants"))
         )
 
-        # Default to active only if status not specified
-        if "status" not in self.request.query_params:
-            queryset = queryset.filter(status=Product.Status.ACTIVE)
-
         return queryset
 
 
@@ -798,6 +720,10 @@ class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
     DELETE /api/v1/products/{slug}
 
     Returns 404 when catalog_mode is ON.
+
+    Public reads are cached as whole documents keyed by product id,
+    ``updated_at`` and the product detail generation (see cache_keys.py),
+    so a repeat view costs one indexed lookup and one cache read.
     """
 
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -830,6 +756,43 @@ class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
 
         return queryset
 
+    def retrieve(self, request, *args, **kwargs):
+        if "status" in request.query_params or get_catalog_mode():
+            return super().retrieve(request, *args, **kwargs)
+
+        row = (
+            Product.objects.filter(slug=kwargs[self.lookup_field], status=Product.Status.ACTIVE)
+            .values_list("id", "updated_at")
+            .first()
+        )
+        if row is None:
+            raise Http404("No Product matches the given query.")
+
+        # Read once per request instead of once per variant
+        show_prices = get_show_prices()
+        versions = get_product_detail_version(row[0])
+        key = product_detail_key(*row, show_prices, *versions) if versions is not None else None
+        if key is not None:
+            try:
+                data = cache.get(key)
+                if data is not None:
+                    return Response(data)
+            except Exception as e:
+                logger.warning(f"Product detail cache read failed: {e}")
+
+        serializer = self.get_serializer(
+            self.get_object(),
+            context={**self.get_serializer_context(), "show_prices": show_prices},
+        )
+        data = serializer.data
+        # Not kept if resolved from a stale spec key list (being rebuilt)
+        if key is not None and get_catalog_snapshot().is_fresh(SPEC_KEYS):
+            try:
+                cache.set(key, data, PRODUCT_DETAIL_CACHE_TTL)
+            except Exception as e:
+                logger.warning(f"Product detail cache write failed: {e}")
+        return Response(data)
+
 
 # =============================================================================
 # Media Views
@@ -867,63 +830,66 @@ class MediaMetadataView(generics.RetrieveAPIView):
     summary="Stream media file",
     description=(
         "Streams binary content with proper headers. "
-        "Supports ETag caching with If-None-Match header."
+        "Supports ETag caching with If-None-Match, single byte ranges "
+        "(Range / If-Range) and HEAD requests. Images can be resized and "
+        "transcoded with the w and fmt query parameters."
     ),
     tags=["Media"],
+    parameters=[
+        OpenApiParameter("w", int, description="Derivative width in pixels (whitelisted sizes)"),
+        OpenApiParameter("fmt", str, description="Derivative format: webp, jpeg or png"),
+    ],
     responses={
         200: OpenApiResponse(
             description="Binary file content",
         ),
+        400: OpenApiResponse(description="Unsupported derivative width or format"),
+        206: OpenApiResponse(description="Partial content for a Range request"),
         304: OpenApiResponse(description="Not Modified (ETag match)"),
         404: OpenApiResponse(description="Media not found"),
+        416: OpenApiResponse(description="Requested range not satisfiable"),
     },
     auth=[],  # Public endpoint - no authentication required
 )
 class MediaFileView(APIView):
     """
-    GET /api/v1/media/{id}/file
+    GET/HEAD /api/v1/media/{id}/file
     
-    Stream binary content with caching headers.
+    Stream binary content with caching headers and byte-range support.
     """
     
     authentication_classes = []
     permission_classes = [AllowAny]
     
     def get(self, request, id):
-        # Get media object
-        media = get_object_or_404(Media, id=id)
-        
-        # Check If-None-Match header for 304 response
-        if_none_match = request.headers.get("If-None-Match")
-        if if_none_match:
-            # Strip quotes if present
-            etag = if_none_match.strip('"')
-            if etag == media.checksum_sha256:
-                response = HttpResponse(status=304)
-                response["ETag"] = f'"{media.checksum_sha256}"'
-                return response
-        
-        # Build response with binary content
-        response = HttpResponse(
-            media.bytes,
-            content_type=media.content_type,
-        )
-        
-        # Set caching headers
-        response["Content-Length"] = media.size_bytes
-        response["ETag"] = f'"{media.checksum_sha256}"'
-        
-        # Cache for 7 days for images/PDFs
-        if media.kind in ["image", "pdf"]:
-            response["Cache-Control"] = "public, max-age=604800"
-        else:
-            response["Cache-Control"] = "public, max-age=3600"
-        
-        # Content-Disposition for downloads
-        if media.kind == "pdf":
-            response["Content-Disposition"] = f'inline; filename="{media.filename}"'
-        
-        return response
+        # Small media (logos, icons) is served from the hot cache without a query
+        hot_cache = get_media_hot_cache()
+        media = hot_cache.get(id) if max_hot_item_bytes() else None
+        if media is None:
+            # Get media metadata; content is streamed from the blob store
+            media = get_object_or_404(Media.objects.defer("bytes"), id=id)
+            if max_hot_item_bytes():
+                media = hot_cache.remember(media) or media
+
+        # Resized/transcoded derivative (?w=400&fmt=webp)
+        try:
+            params = parse_derivative_params(request.query_params, media)
+        except DerivativeError as e:
+            return Response(
+                {"error": str(e), "code": e.code},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if params:
+            try:
+                return build_media_response(request, get_derivative(media, *params))
+            except Exception as e:
+                # Undecodable source: serve the original rather than a broken image
+                logger.warning(f"Derivative generation failed for media {media.id}: {e}")
+
+        return build_media_response(request, media)
+
+    def head(self, request, id):
+        return self.get(request, id)
 
 
 # =============================================================================
@@ -1089,6 +1055,60 @@ class VariantByCodesView(APIView):
         return Response(result, status=status.HTTP_200_OK)
 
 
+# =============================================================================
+# Suggest View
+# =============================================================================
+
+
+@extend_schema(
+    summary="Typeahead suggestions",
+    description=(
+        "Returns model codes, product titles, series and brand names starting "
+        "with the query (at any word, Turkish characters folded). Served from "
+        "an in-memory prefix index, without database queries."
+    ),
+    tags=["Search"],
+    parameters=[
+        OpenApiParameter(
+            name="q",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description="Typed prefix (at least 2 characters), e.g. GKO60",
+            required=True,
+        ),
+        OpenApiParameter(
+            name="limit",
+            type=int,
+            location=OpenApiParameter.QUERY,
+            description=f"Max suggestions (default: {SUGGEST_DEFAULT_LIMIT}, max: {SUGGEST_MAX_LIMIT})",
+        ),
+    ],
+    responses={200: OpenApiResponse(description="Query and suggestions")},
+    auth=[],  # Public endpoint - no authentication required
+)
+class SuggestView(APIView):
+    """
+    GET /api/v1/suggest?q=GKO60
+
+    Returns {"query": ..., "results": [{"type", "label", "slug", ...}]},
+    type being model_code, product, series or brand.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        query = canonical_text(request.query_params.get("q", "")[:100])
+        try:
+            limit = int(request.query_params.get("limit", SUGGEST_DEFAULT_LIMIT))
+        except (TypeError, ValueError):
+            limit = SUGGEST_DEFAULT_LIMIT
+        limit = max(1, min(limit, SUGGEST_MAX_LIMIT))
+
+        results = get_suggest_service().suggest(query, limit)
+        return Response({"query": query, "results": results})
+
+
 # =============================================================================
 # Brand Views
 # =============================================================================
@@ -1337,24 +1357,28 @@ class BrowseCategoryView(APIView):
         include_singletons = request.query_params.get("include_singletons", "").lower() == "true"
         include_empty = request.query_params.get("include_empty", "").lower() == "true"
 
-        # Base product filter
-        product_filter = Q(products__status="active")
+        # Active products of the category, read from the listing model
+        listings = ProductListing.objects.filter(series_category=category)
         if brand_slug:
-            product_filter &= Q(products__brand__slug=brand_slug)
+            listings = listings.filter(brand__slug=brand_slug)
 
-        # Get series with product counts
+        # Get series with product counts (one grouped listing query)
+        series_counts = dict(
+            listings.values("series_id")
+            .annotate(n=Count("product_id"))
+            .values_list("series_id", "n")
+        )
         series_qs = (
             Series.objects
             .filter(category=category)
-            .annotate(
-                products_count=Count("products", filter=product_filter, distinct=True)
-            )
             .select_related("category")
             .order_by("order", "name")
         )
+        all_series = list(series_qs)
+        for s in all_series:
+            s.products_count = series_counts.get(s.id, 0)
 
         # Determine visible series based on options
-        all_series = list(series_qs)
         visible_series = []
         singleton_series = []
 
@@ -1379,24 +1403,16 @@ class BrowseCategoryView(APIView):
         # Get products (all active products in category)
         products_qs = (
             Product.objects
-            .filter(series__category=category, status=Product.Status.ACTIVE)
+            .filter(listing__in=listings)
             .select_related("series", "series__category", "brand")
-            .prefetch_related(
-                Prefetch(
-                    "product_media",
-                    queryset=ProductMedia.objects.select_related("media").only(
-                        "id", "product_id", "media_id", "sort_order", "is_primary",
-                        "media__id", "media__kind", "media__filename",
-                    ).order_by("sort_order"),
-                ),
+            .annotate(
+                _variants_count=F("listing__variant_count"),
+                _hero_media_id=F("listing__hero_media_id"),
+                _hero_media_kind=F("listing__hero_media__kind"),
             )
-            .annotate(_variants_count=Count("variants"))
-            .order_by("series__order", "is_featured", "title_tr")
+            .order_by("listing__series_order", "listing__is_featured", "listing__title_tr")
         )
 
-        if brand_slug:
-            products_qs = products_qs.filter(brand__slug=brand_slug)
-
         products = list(products_qs)
 
         # Serialize data
@@ -180,7 +180,7 @@ class SecurityLogger:
             f"Upload rejected: {filename} - {reason} (from {ip})",
             extra={
                 "event": "upload_rejected",
-                "filename": filename,
+                "upload_filename": filename,
                 "reason": reason,
                 "ip": ip,
             },
@@ -26,6 +26,9 @@ from django.db import transaction
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+from apps.catalog.cache_keys import deferred_invalidation
+from apps.catalog.cache_warmer import schedule_catalog_cache_warm
+from apps.catalog.listing import deferred_listing_refresh
 from apps.catalog.models import (
     Category, Series, Brand, BrandCategory, Product, Variant, SpecKey, Media
 )
@@ -311,7 +314,7 @@ class UnifiedImportService:
             )
 
         # Verify snapshot integrity
-        snapshot_content = job.snapshot_file.bytes.decode('utf-8')
+        snapshot_content = job.snapshot_file.read_bytes().decode('utf-8')
         actual_hash = hashlib.sha256(snapshot_content.encode('utf-8')).hexdigest()
 
         if actual_hash != job.snapshot_hash:
@@ -340,7 +343,8 @@ class UnifiedImportService:
             raise ValueError(f"Job {job_id} has no valid data to import")
 
         try:
-            with transaction.atomic():
+            # One cache invalidation per namespace for the whole import
+            with transaction.atomic(), deferred_invalidation(), deferred_listing_refresh():
                 job.status = 'running'
                 job.started_at = timezone.now()
                 job.save(update_fields=['status', 'started_at'])
@@ -428,7 +432,7 @@ class UnifiedImportService:
                         f"Some created entities not found in DB. Details: {db_verify['verification_details']}"
                     )
 
-                return {
+                result = {
                     'status': 'success',
                     'job_id': str(job.id),
                     'counts': {
@@ -443,6 +447,10 @@ class UnifiedImportService:
                     'db_verify': db_verify,
                 }
 
+            # Prefill the caches the import invalidated, once it is committed
+            schedule_catalog_cache_warm()
+            return result
+
         except Exception as e:
             logger.exception(f"[COMMIT] Error during commit for job {job_id}")
             job.status = 'failed'
@@ -387,7 +387,7 @@ class ImportJobViewSet(viewsets.ReadOnlyModelViewSet):
     
     def _execute_variants_import(self, job, user, request):
         """Execute variants import (create/update)."""
-        file_content = job.input_file.bytes
+        file_content = job.input_file.read_bytes()
         text = file_content.decode("utf-8-sig")
         reader = csv.DictReader(io.StringIO(text), delimiter=";")
         
@@ -474,7 +474,7 @@ class ImportJobViewSet(viewsets.ReadOnlyModelViewSet):
         """Execute products import (create/update)."""
         # from apps.catalog.models import Series # Moved to top level
         
-        file_content = job.input_file.bytes
+        file_content = job.input_file.read_bytes()
         text = file_content.decode("utf-8-sig")
         reader = csv.DictReader(io.StringIO(text), delimiter=";")
         
@@ -25,9 +25,12 @@ env = environ.Env(
     MAX_MEDIA_UPLOAD_BYTES=(int, 100 * 1024 * 1024),  # 100MB default
 )
 
-# Django Body Limit (for large uploads)
-DATA_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100 MB
-FILE_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100 MB
+# Django Body Limits
+# Non-file request bodies (JSON, form fields) are held in memory; keep this bounded.
+DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10 MB
+# Uploaded files larger than this are spooled to a temp file instead of memory.
+# Media uploads always stream to disk (apps.catalog.media_ingest).
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440  # 2.5 MB (Django default)
 
 # Read .env file if it exists
 environ.Env.read_env(os.path.join(BASE_DIR, ".env"))
@@ -111,6 +114,9 @@ TEMPLATES = [
 WSGI_APPLICATION = "config.wsgi.application"
 ASGI_APPLICATION = "config.asgi.application"
 
+# Tests write media to a temporary directory instead of MEDIA_ROOT
+TEST_RUNNER = "config.test_runner.TempMediaTestRunner"
+
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 DATABASES = {
@@ -170,6 +176,46 @@ MEDIA_ROOT = BASE_DIR / "media"
 # Media upload settings
 MAX_MEDIA_UPLOAD_BYTES = env("MAX_MEDIA_UPLOAD_BYTES")  # Default 100MB
 
+# Media blob store (content-addressed by SHA-256, see apps.catalog.media_storage)
+# Set MEDIA_BLOB_STORE_BACKEND="" to keep media content in the database (legacy).
+MEDIA_BLOB_STORE = {
+    "BACKEND": env(
+        "MEDIA_BLOB_STORE_BACKEND",
+        default="apps.catalog.media_storage.FileSystemMediaStore",
+    ),
+    "OPTIONS": {
+        "root": env("MEDIA_BLOB_ROOT", default=str(MEDIA_ROOT / "blobs")),
+    },
+}
+
+# Image derivatives (/api/v1/media/<id>/file/?w=400&fmt=webp, see apps.catalog.media_derivatives)
+MEDIA_DERIVATIVE_ROOT = env("MEDIA_DERIVATIVE_ROOT", default=str(MEDIA_ROOT / "derivatives"))
+MEDIA_DERIVATIVE_CACHE_MAX_BYTES = env.int(
+    "MEDIA_DERIVATIVE_CACHE_MAX_BYTES", default=1024 * 1024 * 1024  # 1 GB
+)
+MEDIA_DERIVATIVE_WIDTHS = (160, 320, 400, 640, 800, 1280)
+MEDIA_DERIVATIVE_FORMATS = ("webp", "jpeg", "png", "avif")  # avif only if Pillow supports it
+
+# Responsive variants precomputed after upload and listed as srcset (apps.catalog.media_variants).
+# Widths/formats must also be allowed above; formats are listed in order of preference.
+MEDIA_RESPONSIVE_WIDTHS = (160, 320, 640, 1280)
+MEDIA_RESPONSIVE_FORMATS = ("avif", "webp")
+MEDIA_VARIANT_WORKERS = env.int("MEDIA_VARIANT_WORKERS", default=1)
+
+# Hot cache for small media (logos, covers, icons; see apps.catalog.media_cache).
+# Set MEDIA_HOT_CACHE_MAX_ITEM_BYTES=0 to disable.
+MEDIA_HOT_CACHE_MAX_ITEM_BYTES = env.int("MEDIA_HOT_CACHE_MAX_ITEM_BYTES", default=64 * 1024)
+MEDIA_HOT_CACHE_MAX_BYTES = env.int(
+    "MEDIA_HOT_CACHE_MAX_BYTES", default=32 * 1024 * 1024  # per worker process
+)
+
+# Hand media file transfers to the reverse proxy instead of streaming from Python.
+# "x-accel-redirect" (nginx, see docker/nginx/conf.d/default.conf), "x-sendfile"
+# (Apache/lighttpd) or "" to stream from Django. Only blob-store files are offloaded.
+MEDIA_ACCEL_MODE = env("MEDIA_ACCEL_MODE", default="")
+MEDIA_ACCEL_ROOT = env("MEDIA_ACCEL_ROOT", default=str(MEDIA_ROOT))
+MEDIA_ACCEL_PREFIX = env("MEDIA_ACCEL_PREFIX", default="/_protected_media/")
+
 # App version (for health checks and debugging)
 APP_VERSION = env("APP_VERSION", default="dev")
 
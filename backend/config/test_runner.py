@@ -0,0 +1,37 @@
+"""
+Test runner that keeps media files written by tests out of MEDIA_ROOT.
+
+Media uploads go to the blob store and image derivatives to their disk
+cache. Under the default settings both live below ``backend/media``, so
+every test run would leave hundreds of files there. This runner points
+them at a temporary directory for the run and removes it afterwards.
+Tests that override these settings themselves are unaffected.
+"""
+
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TempMediaTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._media_root = tempfile.mkdtemp(prefix="gastrotech-test-media-")
+        blob_store = dict(settings.MEDIA_BLOB_STORE)
+        blob_store["OPTIONS"] = {
+            **blob_store.get("OPTIONS", {}),
+            "root": f"{self._media_root}/blobs",
+        }
+        self._media_override = override_settings(
+            MEDIA_BLOB_STORE=blob_store,
+            MEDIA_DERIVATIVE_ROOT=f"{self._media_root}/derivatives",
+        )
+        self._media_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._media_override.disable()
+        shutil.rmtree(self._media_root, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)